@@ -1,3 +1,3 @@
-from .client import ClownPeanutsAdapter
+from .client import CONDITIONAL_REQUEST_HEADERS, ClownPeanutsAdapter, ClownPeanutsStream
 
-__all__ = ["ClownPeanutsAdapter"]
+__all__ = ["CONDITIONAL_REQUEST_HEADERS", "ClownPeanutsAdapter", "ClownPeanutsStream"]
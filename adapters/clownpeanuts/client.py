@@ -1,12 +1,72 @@
 from __future__ import annotations
 
-from typing import Any, Mapping
+import asyncio
+from dataclasses import dataclass
+import importlib.util
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, Mapping
 
 import httpx
 
+logger = logging.getLogger("adapters.clownpeanuts")
+
+# Response headers forwarded verbatim when the body is streamed byte-for-byte.
+STREAM_PASSTHROUGH_HEADERS = (
+    "content-type",
+    "content-length",
+    "content-encoding",
+    "content-disposition",
+    "etag",
+    "last-modified",
+    "cache-control",
+    "expires",
+    "vary",
+)
+
+# Request validators forwarded upstream so ClownPeanuts can answer 304 itself.
+CONDITIONAL_REQUEST_HEADERS = ("if-none-match", "if-modified-since")
+
+# Buffered responses are decoded by httpx, so length/encoding must be recomputed.
+BUFFERED_PASSTHROUGH_HEADERS = tuple(
+    name for name in STREAM_PASSTHROUGH_HEADERS if name not in {"content-length", "content-encoding"}
+)
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _select_headers(headers: httpx.Headers, names: tuple[str, ...]) -> dict[str, str]:
+    return {name: headers[name] for name in names if name in headers}
+
+
+@dataclass(frozen=True)
+class ClownPeanutsStream:
+    """Open upstream response whose body has not been read yet."""
+
+    status_code: int
+    headers: dict[str, str]
+    response: httpx.Response
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self.response.aiter_raw():
+                yield chunk
+        finally:
+            await self.response.aclose()
+
+    async def aclose(self) -> None:
+        await self.response.aclose()
+
 
 class ClownPeanutsAdapter:
-    """HTTP adapter for talking to ClownPeanuts API endpoints."""
+    """HTTP adapter for talking to ClownPeanuts API endpoints.
+
+    The adapter owns one pooled ``httpx.AsyncClient`` that is created lazily on
+    first use and reused for every request until ``aclose()`` is called. The
+    client belongs to the event loop that created it (one app lifespan) and
+    must be closed there; using it from another live loop is an error.
+    """
 
     def __init__(
         self,
@@ -14,10 +74,65 @@ class ClownPeanutsAdapter:
         base_url: str,
         api_token: str | None = None,
         timeout_seconds: float = 5.0,
+        connect_timeout_seconds: float | None = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry_seconds: float = 30.0,
+        http2: bool = False,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.api_token = (api_token or "").strip()
         self.timeout_seconds = timeout_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry_seconds = keepalive_expiry_seconds
+        self.http2 = http2 and _http2_available()
+        if http2 and not self.http2:
+            logger.warning("CLOWNPEANUTS_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        connect_timeout = self.connect_timeout_seconds
+        if connect_timeout is None:
+            connect_timeout = self.timeout_seconds
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout_seconds, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry_seconds,
+            ),
+            http2=self.http2,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._client
+        if client is not None and not client.is_closed and self._client_loop is not loop:
+            previous_loop = self._client_loop
+            if previous_loop is not None and not previous_loop.is_closed():
+                raise RuntimeError(
+                    "ClownPeanutsAdapter client belongs to another running event loop; aclose() it there first"
+                )
+            # Its loop is gone, so the pool can no longer be closed; only happens
+            # when a loop shuts down without aclose() (e.g. tests without a lifespan).
+            logger.warning("discarding a ClownPeanuts client whose event loop closed without aclose()")
+            client = None
+        if client is None or client.is_closed:
+            client = self._build_client()
+            self._client = client
+            self._client_loop = loop
+        return client
+
+    async def aclose(self) -> None:
+        client = self._client
+        self._client = None
+        self._client_loop = None
+        if client is not None and not client.is_closed:
+            await client.aclose()
 
     def _headers(self, *, content_type: str | None = None) -> dict[str, str]:
         headers: dict[str, str] = {}
@@ -27,6 +142,12 @@ class ClownPeanutsAdapter:
             headers["Content-Type"] = content_type
         return headers
 
+    def _url(self, path: str, query_string: str = "") -> str:
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        if query_string:
+            url = f"{url}?{query_string}"
+        return url
+
     async def request_json(
         self,
         *,
@@ -36,14 +157,13 @@ class ClownPeanutsAdapter:
         json_body: Any | None = None,
     ) -> dict[str, Any]:
         url = f"{self.base_url}/{path.lstrip('/')}"
-        async with httpx.AsyncClient(timeout=self.timeout_seconds) as client:
-            response = await client.request(
-                method.upper(),
-                url,
-                params=params,
-                json=json_body,
-                headers=self._headers(),
-            )
+        response = await self.client.request(
+            method.upper(),
+            url,
+            params=params,
+            json=json_body,
+            headers=self._headers(),
+        )
         response.raise_for_status()
         payload = response.json()
         if not isinstance(payload, dict):
@@ -61,18 +181,56 @@ class ClownPeanutsAdapter:
         query_string: str,
         body: bytes,
         content_type: str | None,
+        forward_headers: Mapping[str, str] | None = None,
     ) -> tuple[int, dict[str, str], bytes]:
-        url = f"{self.base_url}/{path.lstrip('/')}"
-        if query_string:
-            url = f"{url}?{query_string}"
-
-        async with httpx.AsyncClient(timeout=self.timeout_seconds) as client:
-            response = await client.request(
-                method.upper(),
-                url,
-                content=body,
-                headers=self._headers(content_type=content_type),
-            )
+        headers = self._headers(content_type=content_type)
+        if forward_headers:
+            headers.update(forward_headers)
+        response = await self.client.request(
+            method.upper(),
+            self._url(path, query_string),
+            content=body,
+            headers=headers,
+        )
 
-        headers = {"content-type": response.headers.get("content-type", "application/json")}
+        headers = _select_headers(response.headers, BUFFERED_PASSTHROUGH_HEADERS)
+        headers.setdefault("content-type", "application/json")
         return response.status_code, headers, response.content
+
+    async def proxy_stream(
+        self,
+        *,
+        method: str,
+        path: str,
+        query_string: str,
+        body: AsyncIterable[bytes] | None,
+        content_type: str | None,
+        content_length: str | None = None,
+        forward_headers: Mapping[str, str] | None = None,
+    ) -> ClownPeanutsStream:
+        """Send a request and return as soon as upstream response headers arrive.
+
+        The caller must drain ``aiter_bytes()`` or call ``aclose()`` so the pooled
+        connection is released. The body is relayed without decoding, so unless
+        ``forward_headers`` carries the caller's ``accept-encoding`` the request
+        asks upstream for ``identity`` rather than httpx's default encodings.
+        """
+        headers = self._headers(content_type=content_type)
+        headers["accept-encoding"] = "identity"
+        if forward_headers:
+            headers.update({name.lower(): value for name, value in forward_headers.items()})
+        if content_length:
+            # An explicit length keeps httpx from switching the upload to chunked encoding.
+            headers["Content-Length"] = content_length
+        request = self.client.build_request(
+            method.upper(),
+            self._url(path, query_string),
+            content=body,
+            headers=headers,
+        )
+        response = await self.client.send(request, stream=True)
+        return ClownPeanutsStream(
+            status_code=response.status_code,
+            headers=_select_headers(response.headers, STREAM_PASSTHROUGH_HEADERS),
+            response=response,
+        )
@@ -1,3 +1,4 @@
 from .client import PingTingAdapter
+from .db import ReadOnlyConnectionPool
 
-__all__ = ["PingTingAdapter"]
+__all__ = ["PingTingAdapter", "ReadOnlyConnectionPool"]
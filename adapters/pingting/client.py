@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import Executor
 from dataclasses import dataclass
+import base64
+from datetime import datetime, timezone
+import functools
 from pathlib import Path
 import json
+import os
 import shutil
-import sqlite3
 import subprocess
 import time
-from typing import Any
+from typing import Any, Iterator
+
+from .db import ReadOnlyConnectionPool
+from .replica import PingTingReplica
 
 
 @dataclass(frozen=True)
@@ -15,6 +23,15 @@ class PingTingStatusSnapshot:
     payload: dict[str, Any]
     source: str
     age_seconds: float | None
+    highlights: dict[str, Any] | None = None
+
+
+@dataclass(frozen=True)
+class _StatusFileEntry:
+    signature: tuple[int, int, int, int]
+    payload: dict[str, Any] | None
+    highlights: dict[str, Any]
+    mtime: float
 
 
 def _safe_int(value: Any) -> int:
@@ -50,8 +67,76 @@ def _safe_json_loads(raw: Any, default: Any) -> Any:
         return default
 
 
+FINDING_COLUMNS = (
+    "id, created_at, severity, agent, title, description, device_ip, device_mac, "
+    "acknowledged, false_positive, during_learning"
+)
+AGENT_RUN_COLUMNS = "id, agent, started_at, completed_at, status, findings_count, raw_data_summary, error_message"
+
+# Backoff after failed CLI refreshes: doubles from the base up to the cap.
+CLI_RETRY_BASE_SECONDS = 5.0
+CLI_RETRY_MAX_SECONDS = 300.0
+
+# Rows fetched per keyset step when streaming an export.
+EXPORT_PAGE_SIZE = 1000
+
+
+def _encode_cursor(sort_value: str, row_id: int) -> str:
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(sort_value), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor") from None
+
+
+def _finding_from_row(row: Any) -> dict[str, Any]:
+    return {
+        "id": int(row["id"]),
+        "created_at": str(row["created_at"]),
+        "severity": str(row["severity"]),
+        "agent": str(row["agent"]),
+        "title": str(row["title"]),
+        "description": str(row["description"] or ""),
+        "device_ip": str(row["device_ip"] or ""),
+        "device_mac": str(row["device_mac"] or ""),
+        "acknowledged": bool(row["acknowledged"]),
+        "false_positive": bool(row["false_positive"]),
+        "during_learning": bool(row["during_learning"]),
+    }
+
+
+def _agent_run_from_row(row: Any) -> dict[str, Any]:
+    return {
+        "id": int(row["id"]),
+        "agent": str(row["agent"]),
+        "started_at": str(row["started_at"]),
+        "completed_at": str(row["completed_at"] or ""),
+        "status": str(row["status"]),
+        "findings_count": _safe_int(row["findings_count"]),
+        "raw_data_summary": _safe_json_loads(row["raw_data_summary"], default={}),
+        "error_message": str(row["error_message"] or ""),
+    }
+
+
+def _consume_task_result(task: asyncio.Task[Any]) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
 class PingTingAdapter:
-    """Loads PingTing status from status.json or CLI fallback."""
+    """Loads PingTing status from status.json or CLI fallback.
+
+    The CLI fallback runs as a single background subprocess per adapter:
+    callers are answered from the current (possibly stale) snapshot with
+    ``refreshing`` set while it runs, concurrent refreshes share it, and
+    failures back off exponentially before the CLI is tried again.
+    """
 
     def __init__(
         self,
@@ -62,6 +147,10 @@ class PingTingAdapter:
         max_age_seconds: int = 120,
         python_bin: str | None = None,
         command_timeout_seconds: int = 20,
+        db_pool_size: int = 4,
+        db_idle_timeout_seconds: float = 300.0,
+        replica_path: Path | None = None,
+        executor: Executor | None = None,
     ) -> None:
         self.repo_path = repo_path
         self.status_path = status_path
@@ -69,6 +158,67 @@ class PingTingAdapter:
         self.max_age_seconds = max_age_seconds
         self.python_bin = python_bin
         self.command_timeout_seconds = command_timeout_seconds
+        self._status_file_entry: _StatusFileEntry | None = None
+        self._status_file_counters = {"hits": 0, "parses": 0}
+        self._cli_task: asyncio.Task[PingTingStatusSnapshot] | None = None
+        self._cli_snapshot: tuple[PingTingStatusSnapshot, float] | None = None
+        self._cli_failures = 0
+        self._cli_retry_at = 0.0
+        self._cli_retry_at_iso: str | None = None
+        self._cli_last_error: str | None = None
+        self._cli_counters = {"runs": 0, "failures": 0, "coalesced": 0, "skipped_backoff": 0}
+        self.executor = executor
+        self.db_path = repo_path / "data" / "pingting.db"
+        self.db_pool = ReadOnlyConnectionPool(
+            self.db_path,
+            size=db_pool_size,
+            idle_timeout_seconds=db_idle_timeout_seconds,
+        )
+        self.replica = (
+            PingTingReplica(
+                replica_path,
+                read_pool_size=db_pool_size,
+                read_idle_timeout_seconds=db_idle_timeout_seconds,
+            )
+            if replica_path is not None
+            else None
+        )
+
+    def close(self) -> None:
+        self.db_pool.close()
+        if self.replica is not None:
+            self.replica.close()
+
+    def sync_replica(self, *, changed: bool = True, sweep: bool = True) -> bool:
+        """Advance the local replica from pingting.db; return False while rows remain to copy."""
+        if self.replica is None or not self.db_path.is_file():
+            return True
+        return self.replica.sync(self.db_pool, changed=changed, sweep=sweep)
+
+    async def _run_blocking(self, func: Any, /, **kwargs: Any) -> Any:
+        # SQLite reads and replica syncs run on the executor (the loop's default
+        # one when none was given) so they never stall the event loop.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, **kwargs))
+
+    async def arefresh_replica(self, *, changed: bool = True, sweep: bool = True) -> bool:
+        return await self._run_blocking(self.sync_replica, changed=changed, sweep=sweep)
+
+    async def aload_recent_findings(self, **kwargs: Any) -> dict[str, Any]:
+        return await self._run_blocking(self.load_recent_findings, **kwargs)
+
+    async def aload_findings_since(self, **kwargs: Any) -> dict[str, Any]:
+        return await self._run_blocking(self.load_findings_since, **kwargs)
+
+    async def aload_recent_agent_runs(self, **kwargs: Any) -> dict[str, Any]:
+        return await self._run_blocking(self.load_recent_agent_runs, **kwargs)
+
+    def _page_pool(self) -> ReadOnlyConnectionPool:
+        # Listing pages and exports read the replica once its first copy is
+        # complete; until then (or with no replica configured) they read pingting.db.
+        if self.replica is not None and self.replica.ready():
+            return self.replica.read_pool
+        return self.db_pool
 
     def _resolve_python_bin(self) -> str:
         if self.python_bin:
@@ -85,51 +235,174 @@ class PingTingAdapter:
         return "python3"
 
     def _read_status_file(self) -> PingTingStatusSnapshot | None:
-        if not self.status_path.is_file():
+        # status.json is re-parsed only when its (device, inode, mtime, size)
+        # changes; otherwise the parsed payload and highlights are reused and
+        # only the age is recomputed.
+        try:
+            stat = os.stat(self.status_path)
+        except OSError:
             return None
+        signature = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
-        try:
-            raw = self.status_path.read_text(encoding="utf-8")
-            payload = _extract_json_payload(raw)
-        except Exception:
+        entry = self._status_file_entry
+        if entry is not None and entry.signature == signature:
+            self._status_file_counters["hits"] += 1
+        else:
+            self._status_file_counters["parses"] += 1
+            try:
+                payload: dict[str, Any] | None = _extract_json_payload(self.status_path.read_text(encoding="utf-8"))
+            except Exception:
+                payload = None
+            entry = _StatusFileEntry(
+                signature=signature,
+                payload=payload,
+                highlights=self._highlights(payload) if payload is not None else {},
+                mtime=stat.st_mtime,
+            )
+            self._status_file_entry = entry
+
+        if entry.payload is None:
             return None
+        return PingTingStatusSnapshot(
+            payload=entry.payload,
+            source="file",
+            age_seconds=max(0.0, time.time() - entry.mtime),
+            highlights=entry.highlights,
+        )
 
-        try:
-            mtime = self.status_path.stat().st_mtime
-            age_seconds = max(0.0, time.time() - mtime)
-        except OSError:
-            age_seconds = None
-
-        return PingTingStatusSnapshot(payload=payload, source="file", age_seconds=age_seconds)
-
-    def _run_status_cli(self) -> PingTingStatusSnapshot:
-        cmd = [
-            self._resolve_python_bin(),
-            "-m",
-            "pingting",
-            "--config",
-            str(self.config_path),
-            "status",
-            "--json",
-        ]
-
-        completed = subprocess.run(
-            cmd,
+    def status_file_cache_stats(self) -> dict[str, Any]:
+        return {**self._status_file_counters, "path": str(self.status_path)}
+
+    def _status_cli_command(self) -> list[str]:
+        return [self._resolve_python_bin(), "-m", "pingting", "--config", str(self.config_path), "status", "--json"]
+
+    def _snapshot_from_cli(self, returncode: int | None, stdout: str, stderr: str) -> PingTingStatusSnapshot:
+        if returncode != 0:
+            detail = stderr.strip() or stdout.strip() or f"exit={returncode}"
+            raise RuntimeError(f"pingting status command failed: {detail}")
+
+        payload = _extract_json_payload(stdout)
+        return PingTingStatusSnapshot(
+            payload=payload,
+            source="cli",
+            age_seconds=0.0,
+            highlights=self._highlights(payload),
+        )
+
+    async def _run_status_cli(self) -> PingTingStatusSnapshot:
+        process = await asyncio.create_subprocess_exec(
+            *self._status_cli_command(),
             cwd=str(self.repo_path),
-            capture_output=True,
-            text=True,
-            timeout=self.command_timeout_seconds,
-            check=False,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout_bytes, stderr_bytes = await asyncio.wait_for(
+                process.communicate(),
+                timeout=self.command_timeout_seconds,
+            )
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        return self._snapshot_from_cli(
+            process.returncode,
+            stdout_bytes.decode("utf-8", errors="replace"),
+            stderr_bytes.decode("utf-8", errors="replace"),
         )
 
-        if completed.returncode != 0:
-            stderr = (completed.stderr or "").strip()
-            stdout = (completed.stdout or "").strip()
-            detail = stderr or stdout or f"exit={completed.returncode}"
-            raise RuntimeError(f"pingting status command failed: {detail}")
+    def _run_status_cli_sync(self) -> PingTingStatusSnapshot:
+        self._cli_counters["runs"] += 1
+        try:
+            completed = subprocess.run(
+                self._status_cli_command(),
+                cwd=str(self.repo_path),
+                capture_output=True,
+                text=True,
+                timeout=self.command_timeout_seconds,
+                check=False,
+            )
+            snapshot = self._snapshot_from_cli(completed.returncode, completed.stdout or "", completed.stderr or "")
+        except subprocess.TimeoutExpired:
+            self._note_cli_failure(f"pingting status command timed out after {self.command_timeout_seconds}s")
+            raise RuntimeError(self._cli_last_error) from None
+        except Exception as exc:
+            self._note_cli_failure(str(exc))
+            raise
+        self._note_cli_success(snapshot)
+        return snapshot
 
-        payload = _extract_json_payload(completed.stdout)
-        return PingTingStatusSnapshot(payload=payload, source="cli", age_seconds=0.0)
+    async def _refresh_status_cli(self) -> PingTingStatusSnapshot:
+        self._cli_counters["runs"] += 1
+        try:
+            snapshot = await self._run_status_cli()
+        except asyncio.TimeoutError:
+            self._note_cli_failure(f"pingting status command timed out after {self.command_timeout_seconds}s")
+            raise RuntimeError(self._cli_last_error) from None
+        except Exception as exc:
+            self._note_cli_failure(str(exc))
+            raise
+        self._note_cli_success(snapshot)
+        return snapshot
+
+    def _note_cli_success(self, snapshot: PingTingStatusSnapshot) -> None:
+        self._cli_failures = 0
+        self._cli_retry_at = 0.0
+        self._cli_retry_at_iso = None
+        self._cli_last_error = None
+        self._cli_snapshot = (snapshot, time.time())
+
+    def _note_cli_failure(self, error: str) -> None:
+        self._cli_counters["failures"] += 1
+        self._cli_failures += 1
+        delay = min(CLI_RETRY_MAX_SECONDS, CLI_RETRY_BASE_SECONDS * 2 ** (self._cli_failures - 1))
+        self._cli_retry_at = time.monotonic() + delay
+        # Wall-clock twin of _cli_retry_at for payloads; fixed for the whole backoff.
+        self._cli_retry_at_iso = datetime.fromtimestamp(time.time() + delay, timezone.utc).isoformat()
+        self._cli_last_error = error
+
+    def _cli_backing_off(self) -> bool:
+        return time.monotonic() < self._cli_retry_at
+
+    def _cli_refresh_task(self, *, force: bool = False) -> asyncio.Task[PingTingStatusSnapshot] | None:
+        """Return the in-flight CLI refresh, starting one unless backing off."""
+        loop = asyncio.get_running_loop()
+        task = self._cli_task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self._cli_counters["coalesced"] += 1
+            return task
+        if not force and self._cli_backing_off():
+            self._cli_counters["skipped_backoff"] += 1
+            return None
+        # The subprocess runs as its own task so a caller going away does not
+        # kill a refresh other callers are waiting on.
+        task = loop.create_task(self._refresh_status_cli(), name="pingting-status-cli")
+        task.add_done_callback(_consume_task_result)
+        self._cli_task = task
+        return task
+
+    def _latest_cli_snapshot(self) -> PingTingStatusSnapshot | None:
+        if self._cli_snapshot is None:
+            return None
+        snapshot, ran_at = self._cli_snapshot
+        return PingTingStatusSnapshot(
+            payload=snapshot.payload,
+            source="cli",
+            age_seconds=max(0.0, time.time() - ran_at),
+            highlights=snapshot.highlights,
+        )
+
+    def status_cli_stats(self) -> dict[str, Any]:
+        task = self._cli_task
+        return {
+            **self._cli_counters,
+            "running": task is not None and not task.done(),
+            "consecutive_failures": self._cli_failures,
+            "retry_in_seconds": round(max(0.0, self._cli_retry_at - time.monotonic()), 3),
+            "retry_at": self._cli_retry_at_iso if self._cli_backing_off() else None,
+            "last_error": self._cli_last_error,
+        }
 
     def _highlights(self, payload: dict[str, Any]) -> dict[str, Any]:
         findings_24h = payload.get("findings_24h")
@@ -171,27 +444,20 @@ class PingTingAdapter:
             },
         }
 
-    def load_recent_findings(
+    def _findings_filters(
         self,
         *,
-        limit: int = 30,
-        severity: str | None = None,
-        include_acknowledged: bool = True,
-        include_learning: bool = True,
-    ) -> dict[str, Any]:
-        normalized_limit = max(1, min(int(limit), 200))
+        severity: str | None,
+        include_acknowledged: bool,
+        include_learning: bool,
+    ) -> tuple[list[str], list[Any]]:
         where_clauses = ["false_positive = 0"]
         params: list[Any] = []
 
         normalized_severity = (severity or "").strip().lower()
         if normalized_severity:
             if normalized_severity not in {"low", "medium", "high", "critical"}:
-                return {
-                    "ok": False,
-                    "count": 0,
-                    "findings": [],
-                    "errors": [f"invalid severity: {normalized_severity}"],
-                }
+                raise ValueError(f"invalid severity: {normalized_severity}")
             where_clauses.append("severity = ?")
             params.append(normalized_severity)
 
@@ -199,31 +465,120 @@ class PingTingAdapter:
             where_clauses.append("acknowledged = 0")
         if not include_learning:
             where_clauses.append("during_learning = 0")
+        return where_clauses, params
 
-        query = (
-            "SELECT id, created_at, severity, agent, title, description, device_ip, device_mac, "
-            "acknowledged, false_positive, during_learning "
-            "FROM findings "
-            f"WHERE {' AND '.join(where_clauses)} "
-            "ORDER BY created_at DESC LIMIT ?"
-        )
-        params.append(normalized_limit)
+    @staticmethod
+    def _runs_filters(*, agent: str | None, status: str | None) -> tuple[list[str], list[Any]]:
+        where_clauses: list[str] = []
+        params: list[Any] = []
 
-        db_path = self.repo_path / "data" / "pingting.db"
-        if not db_path.is_file():
+        normalized_agent = (agent or "").strip()
+        if normalized_agent:
+            where_clauses.append("agent = ?")
+            params.append(normalized_agent)
+
+        normalized_status = (status or "").strip().lower()
+        if normalized_status:
+            where_clauses.append("status = ?")
+            params.append(normalized_status)
+        return where_clauses, params
+
+    def _fetch_page(
+        self,
+        *,
+        columns: str,
+        table: str,
+        order_column: str,
+        where_clauses: list[str],
+        params: list[Any],
+        after: tuple[str, int] | None,
+        limit: int,
+    ) -> list[Any]:
+        clauses = list(where_clauses)
+        page_params = list(params)
+        if after is not None:
+            # Keyset seek on (order_column, id): cost does not grow with depth.
+            clauses.append(f"({order_column} < ? OR ({order_column} = ? AND id < ?))")
+            page_params.extend([after[0], after[0], after[1]])
+        query = f"SELECT {columns} FROM {table} "
+        if clauses:
+            query += f"WHERE {' AND '.join(clauses)} "
+        query += f"ORDER BY {order_column} DESC, id DESC LIMIT ?"
+        page_params.append(limit)
+        with self._page_pool().connection() as connection:
+            return connection.execute(query, tuple(page_params)).fetchall()
+
+    def _iter_rows(
+        self,
+        *,
+        columns: str,
+        table: str,
+        order_column: str,
+        where_clauses: list[str],
+        params: list[Any],
+        after: tuple[str, int] | None,
+    ) -> Iterator[Any]:
+        # Pages are read in short keyset chunks rather than from one long-lived
+        # cursor so an export never pins a read transaction (and PingTing's WAL)
+        # for the whole download.
+        while True:
+            rows = self._fetch_page(
+                columns=columns,
+                table=table,
+                order_column=order_column,
+                where_clauses=where_clauses,
+                params=params,
+                after=after,
+                limit=EXPORT_PAGE_SIZE,
+            )
+            yield from rows
+            if len(rows) < EXPORT_PAGE_SIZE:
+                return
+            after = (str(rows[-1][order_column]), int(rows[-1]["id"]))
+
+    def load_recent_findings(
+        self,
+        *,
+        limit: int = 30,
+        severity: str | None = None,
+        include_acknowledged: bool = True,
+        include_learning: bool = True,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        normalized_limit = max(1, min(int(limit), 200))
+        try:
+            where_clauses, params = self._findings_filters(
+                severity=severity,
+                include_acknowledged=include_acknowledged,
+                include_learning=include_learning,
+            )
+            after = _decode_cursor(cursor) if cursor else None
+        except ValueError as exc:
+            return {
+                "ok": False,
+                "count": 0,
+                "findings": [],
+                "errors": [str(exc)],
+            }
+
+        if not self.db_path.is_file():
             return {
                 "ok": False,
                 "count": 0,
                 "findings": [],
-                "errors": [f"missing database file: {db_path}"],
+                "errors": [f"missing database file: {self.db_path}"],
             }
 
-        connection: sqlite3.Connection | None = None
         try:
-            connection = sqlite3.connect(str(db_path))
-            connection.row_factory = sqlite3.Row
-            cursor = connection.execute(query, tuple(params))
-            rows = cursor.fetchall()
+            rows = self._fetch_page(
+                columns=FINDING_COLUMNS,
+                table="findings",
+                order_column="created_at",
+                where_clauses=where_clauses,
+                params=params,
+                after=after,
+                limit=normalized_limit + 1,
+            )
         except Exception as exc:
             return {
                 "ok": False,
@@ -231,36 +586,124 @@ class PingTingAdapter:
                 "findings": [],
                 "errors": [f"failed reading pingting findings: {exc}"],
             }
-        finally:
-            try:
-                if connection is not None:
-                    connection.close()
-            except Exception:
-                pass
-
-        findings: list[dict[str, Any]] = []
-        for row in rows:
-            findings.append(
-                {
-                    "id": int(row["id"]),
-                    "created_at": str(row["created_at"]),
-                    "severity": str(row["severity"]),
-                    "agent": str(row["agent"]),
-                    "title": str(row["title"]),
-                    "description": str(row["description"] or ""),
-                    "device_ip": str(row["device_ip"] or ""),
-                    "device_mac": str(row["device_mac"] or ""),
-                    "acknowledged": bool(row["acknowledged"]),
-                    "false_positive": bool(row["false_positive"]),
-                    "during_learning": bool(row["during_learning"]),
-                }
+
+        has_more = len(rows) > normalized_limit
+        findings = [_finding_from_row(row) for row in rows[:normalized_limit]]
+        return {
+            "ok": True,
+            "count": len(findings),
+            "limit": normalized_limit,
+            "findings": findings,
+            "next_cursor": _encode_cursor(findings[-1]["created_at"], findings[-1]["id"]) if has_more else None,
+            "errors": [],
+        }
+
+    def iter_findings(
+        self,
+        *,
+        severity: str | None = None,
+        include_acknowledged: bool = True,
+        include_learning: bool = True,
+        cursor: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield every matching finding, newest first, in constant memory.
+
+        Filters and the cursor are validated before the first row is read, so a
+        ValueError surfaces when the iterator is created rather than mid-stream.
+        """
+        where_clauses, params = self._findings_filters(
+            severity=severity,
+            include_acknowledged=include_acknowledged,
+            include_learning=include_learning,
+        )
+        after = _decode_cursor(cursor) if cursor else None
+        if not self.db_path.is_file():
+            raise FileNotFoundError(f"missing database file: {self.db_path}")
+        rows = self._iter_rows(
+            columns=FINDING_COLUMNS,
+            table="findings",
+            order_column="created_at",
+            where_clauses=where_clauses,
+            params=params,
+            after=after,
+        )
+        return (_finding_from_row(row) for row in rows)
+
+    def load_findings_since(
+        self,
+        *,
+        after_id: int | None,
+        limit: int = 200,
+        severity: str | None = None,
+        include_acknowledged: bool = True,
+        include_learning: bool = True,
+    ) -> dict[str, Any]:
+        """Return findings with an id above ``after_id`` in ascending id order.
+
+        ``high_water_mark`` is the id to pass back next time. It covers rows that
+        the filters skipped, so a follow-up call never rescans them. Without
+        ``after_id`` no rows are returned and the mark starts at the newest
+        finding.
+        """
+        normalized_limit = max(1, min(int(limit), 500))
+        try:
+            where_clauses, params = self._findings_filters(
+                severity=severity,
+                include_acknowledged=include_acknowledged,
+                include_learning=include_learning,
             )
+        except ValueError as exc:
+            return {
+                "ok": False,
+                "count": 0,
+                "findings": [],
+                "errors": [str(exc)],
+            }
+
+        if not self.db_path.is_file():
+            return {
+                "ok": False,
+                "count": 0,
+                "findings": [],
+                "errors": [f"missing database file: {self.db_path}"],
+            }
+
+        try:
+            with self.db_pool.connection() as connection:
+                top_id = _safe_int(connection.execute("SELECT MAX(id) FROM findings").fetchone()[0])
+                rows: list[Any] = []
+                if after_id is not None and top_id > after_id:
+                    # Bounding by top_id keeps the mark consistent with the rows
+                    # returned even if PingTing commits between the two queries.
+                    query = (
+                        f"SELECT {FINDING_COLUMNS} FROM findings "
+                        f"WHERE id > ? AND id <= ? AND {' AND '.join(where_clauses)} "
+                        "ORDER BY id ASC LIMIT ?"
+                    )
+                    rows = connection.execute(
+                        query,
+                        (after_id, top_id, *params, normalized_limit + 1),
+                    ).fetchall()
+        except Exception as exc:
+            return {
+                "ok": False,
+                "count": 0,
+                "findings": [],
+                "errors": [f"failed reading pingting findings: {exc}"],
+            }
 
+        has_more = len(rows) > normalized_limit
+        findings = [_finding_from_row(row) for row in rows[:normalized_limit]]
+        # A top id below after_id means the database was replaced; restarting the
+        # mark there lets the new file's rows flow instead of waiting to overtake it.
+        high_water_mark = findings[-1]["id"] if has_more else top_id
         return {
             "ok": True,
             "count": len(findings),
             "limit": normalized_limit,
             "findings": findings,
+            "high_water_mark": high_water_mark,
+            "has_more": has_more,
             "errors": [],
         }
 
@@ -270,45 +713,38 @@ class PingTingAdapter:
         limit: int = 30,
         agent: str | None = None,
         status: str | None = None,
+        cursor: str | None = None,
     ) -> dict[str, Any]:
         normalized_limit = max(1, min(int(limit), 200))
-        where_clauses: list[str] = []
-        params: list[Any] = []
-
-        normalized_agent = (agent or "").strip()
-        if normalized_agent:
-            where_clauses.append("agent = ?")
-            params.append(normalized_agent)
-
-        normalized_status = (status or "").strip().lower()
-        if normalized_status:
-            where_clauses.append("status = ?")
-            params.append(normalized_status)
-
-        query = (
-            "SELECT id, agent, started_at, completed_at, status, findings_count, raw_data_summary, error_message "
-            "FROM agent_runs "
-        )
-        if where_clauses:
-            query += f"WHERE {' AND '.join(where_clauses)} "
-        query += "ORDER BY started_at DESC LIMIT ?"
-        params.append(normalized_limit)
+        where_clauses, params = self._runs_filters(agent=agent, status=status)
+        try:
+            after = _decode_cursor(cursor) if cursor else None
+        except ValueError as exc:
+            return {
+                "ok": False,
+                "count": 0,
+                "runs": [],
+                "errors": [str(exc)],
+            }
 
-        db_path = self.repo_path / "data" / "pingting.db"
-        if not db_path.is_file():
+        if not self.db_path.is_file():
             return {
                 "ok": False,
                 "count": 0,
                 "runs": [],
-                "errors": [f"missing database file: {db_path}"],
+                "errors": [f"missing database file: {self.db_path}"],
             }
 
-        connection: sqlite3.Connection | None = None
         try:
-            connection = sqlite3.connect(str(db_path))
-            connection.row_factory = sqlite3.Row
-            cursor = connection.execute(query, tuple(params))
-            rows = cursor.fetchall()
+            rows = self._fetch_page(
+                columns=AGENT_RUN_COLUMNS,
+                table="agent_runs",
+                order_column="started_at",
+                where_clauses=where_clauses,
+                params=params,
+                after=after,
+                limit=normalized_limit + 1,
+            )
         except Exception as exc:
             return {
                 "ok": False,
@@ -316,88 +752,144 @@ class PingTingAdapter:
                 "runs": [],
                 "errors": [f"failed reading pingting agent runs: {exc}"],
             }
-        finally:
-            try:
-                if connection is not None:
-                    connection.close()
-            except Exception:
-                pass
-
-        runs: list[dict[str, Any]] = []
-        for row in rows:
-            runs.append(
-                {
-                    "id": int(row["id"]),
-                    "agent": str(row["agent"]),
-                    "started_at": str(row["started_at"]),
-                    "completed_at": str(row["completed_at"] or ""),
-                    "status": str(row["status"]),
-                    "findings_count": _safe_int(row["findings_count"]),
-                    "raw_data_summary": _safe_json_loads(row["raw_data_summary"], default={}),
-                    "error_message": str(row["error_message"] or ""),
-                }
-            )
 
+        has_more = len(rows) > normalized_limit
+        runs = [_agent_run_from_row(row) for row in rows[:normalized_limit]]
         return {
             "ok": True,
             "count": len(runs),
             "limit": normalized_limit,
             "runs": runs,
+            "next_cursor": _encode_cursor(runs[-1]["started_at"], runs[-1]["id"]) if has_more else None,
             "errors": [],
         }
 
-    def load_status_summary(
+    def iter_agent_runs(
         self,
         *,
-        refresh_if_stale: bool = True,
-        force_cli_refresh: bool = False,
-    ) -> dict[str, Any]:
-        errors: list[str] = []
-        snapshot = self._read_status_file()
+        agent: str | None = None,
+        status: str | None = None,
+        cursor: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        where_clauses, params = self._runs_filters(agent=agent, status=status)
+        after = _decode_cursor(cursor) if cursor else None
+        if not self.db_path.is_file():
+            raise FileNotFoundError(f"missing database file: {self.db_path}")
+        rows = self._iter_rows(
+            columns=AGENT_RUN_COLUMNS,
+            table="agent_runs",
+            order_column="started_at",
+            where_clauses=where_clauses,
+            params=params,
+            after=after,
+        )
+        return (_agent_run_from_row(row) for row in rows)
 
-        stale = snapshot is not None and snapshot.age_seconds is not None and snapshot.age_seconds > self.max_age_seconds
+    def _freshest_snapshot(self, snapshot: PingTingStatusSnapshot | None) -> PingTingStatusSnapshot | None:
+        cli_snapshot = self._latest_cli_snapshot()
+        if cli_snapshot is not None and (
+            snapshot is None or (cli_snapshot.age_seconds or 0.0) < (snapshot.age_seconds or 0.0)
+        ):
+            return cli_snapshot
+        return snapshot
 
-        if force_cli_refresh:
-            try:
-                snapshot = self._run_status_cli()
-            except Exception as exc:
-                errors.append(str(exc))
-                if snapshot is None:
-                    snapshot = self._read_status_file()
-        elif snapshot is None:
-            try:
-                snapshot = self._run_status_cli()
-            except Exception as exc:
-                errors.append(str(exc))
-        elif stale and refresh_if_stale:
-            try:
-                snapshot = self._run_status_cli()
-            except Exception as exc:
-                errors.append(str(exc))
-                snapshot = PingTingStatusSnapshot(
-                    payload=snapshot.payload,
-                    source="file_stale",
-                    age_seconds=snapshot.age_seconds,
-                )
+    def _is_stale(self, snapshot: PingTingStatusSnapshot | None) -> bool:
+        return snapshot is not None and snapshot.age_seconds is not None and snapshot.age_seconds > self.max_age_seconds
 
+    def _status_payload(
+        self,
+        snapshot: PingTingStatusSnapshot | None,
+        *,
+        errors: list[str],
+        refreshing: bool,
+    ) -> dict[str, Any]:
+        # The error text stays fixed for a whole backoff; when the next retry
+        # happens is reported separately in retry_at.
+        retry_at = self._cli_retry_at_iso if errors and self._cli_backing_off() else None
         if snapshot is None:
             return {
                 "ok": False,
                 "source": "unavailable",
                 "stale": True,
+                "refreshing": False,
                 "status_age_seconds": None,
+                "retry_at": retry_at,
                 "errors": errors or ["unable to load pingting status"],
                 "highlights": {},
                 "snapshot": {},
             }
 
-        computed_stale = snapshot.age_seconds is not None and snapshot.age_seconds > self.max_age_seconds
+        computed_stale = self._is_stale(snapshot)
+        source = snapshot.source
+        if source == "file" and computed_stale and errors:
+            source = "file_stale"
         return {
             "ok": True,
-            "source": snapshot.source,
+            "source": source,
             "stale": computed_stale,
+            "refreshing": refreshing,
             "status_age_seconds": snapshot.age_seconds,
+            "retry_at": retry_at,
             "errors": errors,
-            "highlights": self._highlights(snapshot.payload),
+            "highlights": snapshot.highlights if snapshot.highlights is not None else self._highlights(snapshot.payload),
             "snapshot": snapshot.payload,
         }
+
+    def load_status_summary(
+        self,
+        *,
+        refresh_if_stale: bool = True,
+        force_cli_refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Return the status, running the CLI in the calling thread when the snapshot is stale.
+
+        Shares the snapshot cache and failure backoff with
+        ``aload_status_summary``, the non-blocking variant used by the API.
+        """
+        errors: list[str] = []
+        snapshot = self._freshest_snapshot(self._read_status_file())
+        if force_cli_refresh or snapshot is None or (self._is_stale(snapshot) and refresh_if_stale):
+            if force_cli_refresh or not self._cli_backing_off():
+                try:
+                    snapshot = self._run_status_cli_sync()
+                except Exception as exc:
+                    errors.append(str(exc))
+            elif self._cli_last_error:
+                self._cli_counters["skipped_backoff"] += 1
+                errors.append(self._cli_last_error)
+        return self._status_payload(snapshot, errors=errors, refreshing=False)
+
+    async def aload_status_summary(
+        self,
+        *,
+        refresh_if_stale: bool = True,
+        force_cli_refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Return the freshest known status without waiting on the CLI.
+
+        A stale or missing snapshot starts a background CLI refresh and is
+        returned with ``refreshing`` set. Only ``force_cli_refresh`` (or having
+        no snapshot at all) awaits the refresh, sharing any in-flight run.
+        """
+        errors: list[str] = []
+        snapshot = self._freshest_snapshot(await self._run_blocking(self._read_status_file))
+
+        task: asyncio.Task[PingTingStatusSnapshot] | None = None
+        if force_cli_refresh:
+            task = self._cli_refresh_task(force=True)
+        elif snapshot is None or (self._is_stale(snapshot) and refresh_if_stale):
+            task = self._cli_refresh_task()
+            if task is None and self._cli_last_error:
+                errors.append(self._cli_last_error)
+
+        refreshing = False
+        if task is not None:
+            if force_cli_refresh or snapshot is None:
+                try:
+                    snapshot = await asyncio.shield(task)
+                except Exception as exc:
+                    errors.append(str(exc))
+            else:
+                refreshing = True
+
+        return self._status_payload(snapshot, errors=errors, refreshing=refreshing)
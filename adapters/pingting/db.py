@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Iterator
+from urllib.parse import quote
+
+
+@dataclass
+class _PooledConnection:
+    connection: sqlite3.Connection
+    file_identity: tuple[int, int]
+    last_used: float
+
+
+def _file_identity(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_dev, stat.st_ino
+
+
+class ReadOnlyConnectionPool:
+    """Small pool of long-lived, read-only SQLite connections.
+
+    Connections are opened as ``mode=ro`` URIs with ``query_only`` set and run in
+    autocommit mode, so every statement is its own short read transaction and
+    never holds back PingTing's WAL checkpoints. A connection is replaced when
+    the database file is swapped out underneath it (different inode), and idle
+    connections are closed after ``idle_timeout_seconds``.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        size: int = 4,
+        idle_timeout_seconds: float = 300.0,
+        mmap_size_bytes: int = 256 * 1024 * 1024,
+        cache_size_kib: int = 16 * 1024,
+        statement_cache_size: int = 64,
+    ) -> None:
+        self.path = path
+        self.size = max(1, size)
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.mmap_size_bytes = mmap_size_bytes
+        self.cache_size_kib = cache_size_kib
+        self.statement_cache_size = statement_cache_size
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle: list[_PooledConnection] = []
+        self._counters = {"opened": 0, "reused": 0, "reopened_after_rotation": 0, "closed_idle": 0, "discarded": 0}
+
+    def _open(self, identity: tuple[int, int]) -> _PooledConnection:
+        uri = f"file:{quote(str(self.path))}?mode=ro"
+        connection = sqlite3.connect(
+            uri,
+            uri=True,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+        )
+        try:
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA query_only = ON")
+            connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size_bytes)}")
+            connection.execute(f"PRAGMA cache_size = {-int(self.cache_size_kib)}")
+            connection.execute("PRAGMA temp_store = MEMORY")
+        except Exception:
+            connection.close()
+            raise
+        with self._lock:
+            self._counters["opened"] += 1
+        return _PooledConnection(connection=connection, file_identity=identity, last_used=time.monotonic())
+
+    @staticmethod
+    def _close(pooled: _PooledConnection) -> None:
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+
+    def _checkout(self) -> _PooledConnection:
+        identity = _file_identity(self.path)
+        now = time.monotonic()
+        stale: list[_PooledConnection] = []
+        chosen: _PooledConnection | None = None
+        with self._lock:
+            keep: list[_PooledConnection] = []
+            for pooled in self._idle:
+                if pooled.file_identity != identity:
+                    self._counters["reopened_after_rotation"] += 1
+                    stale.append(pooled)
+                elif now - pooled.last_used > self.idle_timeout_seconds:
+                    self._counters["closed_idle"] += 1
+                    stale.append(pooled)
+                else:
+                    keep.append(pooled)
+            # Most recently used first: its pages are the likeliest to still be warm.
+            if keep:
+                chosen = keep.pop()
+                self._counters["reused"] += 1
+            self._idle = keep
+        for pooled in stale:
+            self._close(pooled)
+        return chosen if chosen is not None else self._open(identity)
+
+    def _checkin(self, pooled: _PooledConnection) -> None:
+        if pooled.connection.in_transaction:
+            try:
+                pooled.connection.rollback()
+            except sqlite3.Error:
+                self._close(pooled)
+                return
+        pooled.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(pooled)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        self._slots.acquire()
+        try:
+            pooled = self._checkout()
+            try:
+                yield pooled.connection
+            except sqlite3.DatabaseError:
+                # The handle may be unusable (file replaced mid-query, corruption);
+                # drop it rather than hand it to the next caller.
+                with self._lock:
+                    self._counters["discarded"] += 1
+                self._close(pooled)
+                raise
+            except BaseException:
+                self._checkin(pooled)
+                raise
+            else:
+                self._checkin(pooled)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._close(pooled)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "idle": len(self._idle),
+                "size": self.size,
+                "path": os.fspath(self.path),
+            }
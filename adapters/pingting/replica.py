@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from .db import ReadOnlyConnectionPool
+
+# Rows copied per source query / replica transaction.
+_COPY_BATCH_SIZE = 5000
+# Upper bound on new rows copied per table in one sync, so a first sync of a
+# large database is spread over several passes instead of one long one.
+_MAX_NEW_ROWS_PER_SYNC = 50_000
+# Newest ids re-read whenever the source changed, to pick up fresh edits
+# (acknowledgements, agent runs finishing) quickly.
+_HOT_WINDOW_ROWS = 500
+# Older ids re-read per sweep; the sweep wraps around, catching late edits and deletions.
+_RECONCILE_CHUNK_ROWS = 5000
+
+
+def _normalize_json_text(raw: Any) -> str:
+    if not isinstance(raw, str) or not raw.strip():
+        return "{}"
+    try:
+        return json.dumps(json.loads(raw), separators=(",", ":"))
+    except json.JSONDecodeError:
+        return "{}"
+
+
+_TABLES: dict[str, dict[str, Any]] = {
+    "findings": {
+        "columns": (
+            "id",
+            "created_at",
+            "severity",
+            "agent",
+            "title",
+            "description",
+            "device_ip",
+            "device_mac",
+            "acknowledged",
+            "false_positive",
+            "during_learning",
+        ),
+        "schema": (
+            "CREATE TABLE IF NOT EXISTS findings ("
+            "id INTEGER PRIMARY KEY, created_at TEXT NOT NULL, severity TEXT NOT NULL, agent TEXT NOT NULL, "
+            "title TEXT NOT NULL, description TEXT, device_ip TEXT, device_mac TEXT, "
+            "acknowledged INTEGER NOT NULL DEFAULT 0, false_positive INTEGER NOT NULL DEFAULT 0, "
+            "during_learning INTEGER NOT NULL DEFAULT 0)"
+        ),
+        # Every findings read filters on false_positive and orders by (created_at, id).
+        "indexes": (
+            "CREATE INDEX IF NOT EXISTS idx_findings_recent ON findings (false_positive, created_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings (false_positive, severity, created_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_findings_pending "
+            "ON findings (false_positive, acknowledged, during_learning, created_at, id)",
+        ),
+        "transform": None,
+    },
+    "agent_runs": {
+        "columns": (
+            "id",
+            "agent",
+            "started_at",
+            "completed_at",
+            "status",
+            "findings_count",
+            "raw_data_summary",
+            "error_message",
+        ),
+        "schema": (
+            "CREATE TABLE IF NOT EXISTS agent_runs ("
+            "id INTEGER PRIMARY KEY, agent TEXT NOT NULL, started_at TEXT NOT NULL, completed_at TEXT, "
+            "status TEXT NOT NULL, findings_count INTEGER, raw_data_summary TEXT NOT NULL DEFAULT '{}', "
+            "error_message TEXT)"
+        ),
+        "indexes": (
+            "CREATE INDEX IF NOT EXISTS idx_agent_runs_recent ON agent_runs (started_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_agent_runs_agent ON agent_runs (agent, started_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_agent_runs_status ON agent_runs (status, started_at, id)",
+        ),
+        # raw_data_summary is validated and compacted once here instead of on every read.
+        "transform": {"raw_data_summary": _normalize_json_text},
+    },
+}
+
+
+class PingTingReplica:
+    """Controlplane-owned copy of PingTing's findings and agent_runs tables.
+
+    ``sync`` tails new rows by id from the live database. When the source
+    changed it also re-reads a hot window of the newest rows, and when a sweep
+    is requested one rolling chunk of older ones, so edits and deletions
+    converge without rescanning the source. Sweeping stops once a full pass
+    over a table has completed with no change since it started, and resumes
+    on the next change. Reads go through ``read_pool`` once the first full
+    copy has completed (``ready``); until then callers should keep reading the
+    live database.
+    """
+
+    def __init__(self, path: Path, *, read_pool_size: int = 4, read_idle_timeout_seconds: float = 300.0) -> None:
+        self.path = path
+        self.read_pool = ReadOnlyConnectionPool(
+            path,
+            size=read_pool_size,
+            idle_timeout_seconds=read_idle_timeout_seconds,
+        )
+        self._lock = threading.Lock()
+        self._writer: sqlite3.Connection | None = None
+        self._ready: bool | None = None
+        # Per table: whether a sweep pass is under way, and whether the source
+        # changed after the current pass started (so another one is needed).
+        # A restart always sweeps once to catch edits made while it was down.
+        self._sweeping = {table: True for table in _TABLES}
+        self._changed_during_sweep = {table: False for table in _TABLES}
+        self._counters = {
+            "syncs": 0,
+            "rows_copied": 0,
+            "rows_reconciled": 0,
+            "rows_deleted": 0,
+            "resets": 0,
+            "hot_refreshes": 0,
+            "sweeps": 0,
+        }
+        self._last_sync_ms = 0.0
+        self._last_sync_at: float | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS replica_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            for spec in _TABLES.values():
+                connection.execute(spec["schema"])
+                for statement in spec["indexes"]:
+                    connection.execute(statement)
+            connection.commit()
+            self._writer = connection
+        return self._writer
+
+    @staticmethod
+    def _state(db: sqlite3.Connection, key: str) -> int:
+        row = db.execute("SELECT value FROM replica_state WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+    @staticmethod
+    def _set_state(db: sqlite3.Connection, key: str, value: int) -> None:
+        db.execute("INSERT OR REPLACE INTO replica_state (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def ready(self) -> bool:
+        if self._ready is None:
+            if not self.path.is_file():
+                return False
+            with self._lock:
+                self._ready = bool(self._state(self._db(), "ready"))
+        return self._ready
+
+    def _rows_for_insert(self, table: str, rows: list[Any]) -> list[tuple[Any, ...]]:
+        spec = _TABLES[table]
+        transform = spec["transform"] or {}
+        return [
+            tuple(transform[column](row[column]) if column in transform else row[column] for column in spec["columns"])
+            for row in rows
+        ]
+
+    def _upsert(self, db: sqlite3.Connection, table: str, rows: list[Any]) -> None:
+        columns = _TABLES[table]["columns"]
+        db.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            self._rows_for_insert(table, rows),
+        )
+
+    def _refresh_range(self, db: sqlite3.Connection, source: sqlite3.Connection, table: str, low: int, high: int) -> None:
+        """Make replica rows with ``low < id <= high`` match the source exactly."""
+        columns = ", ".join(_TABLES[table]["columns"])
+        rows = source.execute(
+            f"SELECT {columns} FROM {table} WHERE id > ? AND id <= ? ORDER BY id",
+            (low, high),
+        ).fetchall()
+        source_ids = {int(row["id"]) for row in rows}
+        replica_ids = {int(item[0]) for item in db.execute(f"SELECT id FROM {table} WHERE id > ? AND id <= ?", (low, high))}
+        removed = [(row_id,) for row_id in replica_ids - source_ids]
+        with db:
+            self._upsert(db, table, rows)
+            if removed:
+                db.executemany(f"DELETE FROM {table} WHERE id = ?", removed)
+        self._counters["rows_reconciled"] += len(rows)
+        self._counters["rows_deleted"] += len(removed)
+
+    def _note_change(self, table: str, *, pass_started: bool) -> None:
+        if not self._sweeping[table]:
+            self._sweeping[table] = True
+        elif pass_started:
+            self._changed_during_sweep[table] = True
+
+    def _sync_table(
+        self,
+        db: sqlite3.Connection,
+        source: sqlite3.Connection,
+        table: str,
+        *,
+        changed: bool,
+        sweep: bool,
+    ) -> bool:
+        columns = ", ".join(_TABLES[table]["columns"])
+        mark_key = f"{table}_mark"
+        sweep_key = f"{table}_sweep"
+        top_id = int(source.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0])
+        mark = self._state(db, mark_key)
+
+        if top_id < mark:
+            # The source database was replaced; start the copy over.
+            with db:
+                db.execute(f"DELETE FROM {table}")
+                self._set_state(db, mark_key, 0)
+                self._set_state(db, sweep_key, 0)
+                self._set_state(db, "ready", 0)
+            self._ready = False
+            self._counters["resets"] += 1
+            mark = 0
+
+        copied = 0
+        while mark < top_id and copied < _MAX_NEW_ROWS_PER_SYNC:
+            rows = source.execute(
+                f"SELECT {columns} FROM {table} WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+                (mark, top_id, _COPY_BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                mark = top_id
+                break
+            mark = int(rows[-1]["id"])
+            with db:
+                self._upsert(db, table, rows)
+                self._set_state(db, mark_key, mark)
+            copied += len(rows)
+        self._counters["rows_copied"] += copied
+        caught_up = mark >= top_id
+        if not caught_up:
+            return False
+
+        hot_low = max(0, mark - _HOT_WINDOW_ROWS)
+        low = self._state(db, sweep_key)
+        if low >= hot_low:
+            low = 0
+        if changed:
+            self._note_change(table, pass_started=low > 0)
+            self._refresh_range(db, source, table, hot_low, mark)
+            self._counters["hot_refreshes"] += 1
+
+        if not sweep or not self._sweeping[table]:
+            return True
+        sweep_high = min(low + _RECONCILE_CHUNK_ROWS, hot_low)
+        if sweep_high > low:
+            self._refresh_range(db, source, table, low, sweep_high)
+        complete = sweep_high >= hot_low
+        with db:
+            # A finished pass restarts from the bottom, however far the top has moved since.
+            self._set_state(db, sweep_key, 0 if complete else sweep_high)
+        self._counters["sweeps"] += 1
+        if complete:
+            # Run another pass only if the source changed during this one.
+            self._sweeping[table] = self._changed_during_sweep[table]
+            self._changed_during_sweep[table] = False
+        return True
+
+    def sync(self, source_pool: ReadOnlyConnectionPool, *, changed: bool = True, sweep: bool = True) -> bool:
+        """Advance the replica from the live database; return whether it is caught up.
+
+        ``changed`` says the source files moved since the last caught-up sync
+        (re-read the hot window); ``sweep`` allows one reconcile chunk per table.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            db = self._db()
+            with source_pool.connection() as source:
+                caught_up = all(
+                    [self._sync_table(db, source, table, changed=changed, sweep=sweep) for table in _TABLES]
+                )
+            if caught_up and not self._ready:
+                with db:
+                    self._set_state(db, "ready", 1)
+                self._ready = True
+            self._counters["syncs"] += 1
+            self._last_sync_ms = (time.perf_counter() - started) * 1000
+            self._last_sync_at = time.time()
+        return caught_up
+
+    def close(self) -> None:
+        self.read_pool.close()
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "ready": bool(self._ready),
+            "sweeping": sorted(table for table, active in self._sweeping.items() if active),
+            "last_sync_ms": round(self._last_sync_ms, 3),
+            "last_sync_age_seconds": None
+            if self._last_sync_at is None
+            else round(max(0.0, time.time() - self._last_sync_at), 3),
+            "path": str(self.path),
+        }
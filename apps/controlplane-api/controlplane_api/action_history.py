@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import json
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Any
+import zlib
+
+ACTION_NAMES = ("bootstrap", "smoke", "update")
+
+# Characters of output kept inline with each run; the full log lives in action_outputs.
+OUTPUT_TAIL_CHARS = 12000
+# Prune passes between incremental vacuums of freed pages.
+_VACUUM_EVERY_PRUNES = 20
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS action_runs ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, action TEXT NOT NULL, job_id TEXT, state TEXT NOT NULL, "
+    "ok INTEGER NOT NULL, started_at TEXT, finished_at TEXT NOT NULL, exit_code INTEGER, "
+    "command TEXT NOT NULL, output_tail TEXT NOT NULL, output_bytes INTEGER NOT NULL, details TEXT)",
+    "CREATE INDEX IF NOT EXISTS action_runs_action_id ON action_runs (action, id)",
+    "CREATE INDEX IF NOT EXISTS action_runs_finished_at ON action_runs (finished_at)",
+    "CREATE TABLE IF NOT EXISTS action_outputs (run_id INTEGER PRIMARY KEY, output BLOB NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS action_latest (action TEXT PRIMARY KEY, run_id INTEGER NOT NULL) WITHOUT ROWID",
+)
+
+_RUN_COLUMNS = (
+    "id",
+    "action",
+    "job_id",
+    "state",
+    "ok",
+    "started_at",
+    "finished_at",
+    "exit_code",
+    "command",
+    "output_tail",
+    "output_bytes",
+    "details",
+)
+_RUN_SELECT = ", ".join(_RUN_COLUMNS)
+
+
+def _tail(output: str, limit_chars: int = OUTPUT_TAIL_CHARS) -> str:
+    output = output.strip()
+    if len(output) <= limit_chars:
+        return output
+    return f"... (truncated)\n{output[-limit_chars:]}"
+
+
+def _run_from_row(row: sqlite3.Row, *, include_output: bool = True) -> dict[str, Any]:
+    run = {
+        "id": int(row["id"]),
+        "action": row["action"],
+        "job_id": row["job_id"],
+        "state": row["state"],
+        "ok": bool(row["ok"]),
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+        "exit_code": row["exit_code"],
+        "command": json.loads(row["command"]),
+        "output_bytes": int(row["output_bytes"]),
+        "details": json.loads(row["details"]) if row["details"] else None,
+    }
+    if include_output:
+        run["output"] = row["output_tail"]
+    return run
+
+
+class ActionHistoryStore:
+    """Append-only history of orchestration action runs in a sidecar SQLite db.
+
+    Each finished run is one inserted row; ``action_latest`` points at the
+    newest run per action so the summary reads the last results by primary
+    key. Rows carry the last ``OUTPUT_TAIL_CHARS`` of output for display,
+    while the full log is stored zlib-compressed in ``action_outputs`` and
+    only read when a run's output is requested. Runs beyond
+    ``retain_per_action`` per action or older than ``retain_days`` are pruned
+    on insert and freed pages are reclaimed incrementally. Results from the
+    legacy ``actions-state.json`` are imported once into an empty store.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: Path,
+        legacy_state_path: Path | None = None,
+        retain_per_action: int = 200,
+        retain_days: int = 90,
+    ) -> None:
+        self.path = path
+        self.legacy_state_path = legacy_state_path
+        self.retain_per_action = max(1, retain_per_action)
+        self.retain_days = max(0, retain_days)
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._counters = {"recorded": 0, "pruned": 0, "vacuums": 0, "legacy_imported": 0}
+        self._prunes_since_vacuum = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            # Only takes effect on a new database, before the first table exists.
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(action_runs)")}
+            if "details" not in columns:
+                connection.execute("ALTER TABLE action_runs ADD COLUMN details TEXT")
+            connection.commit()
+            self._connection = connection
+            self._import_legacy(connection)
+        return self._connection
+
+    def _import_legacy(self, db: sqlite3.Connection) -> None:
+        if self.legacy_state_path is None or not self.legacy_state_path.is_file():
+            return
+        if db.execute("SELECT 1 FROM action_runs LIMIT 1").fetchone() is not None:
+            return
+        try:
+            payload = json.loads(self.legacy_state_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(payload, dict):
+            return
+        legacy = [payload.get(name) for name in ACTION_NAMES]
+        results = [item for item in legacy if isinstance(item, dict) and item.get("finished_at")]
+        # Oldest first so ids keep chronological order.
+        for result in sorted(results, key=lambda item: str(item.get("finished_at"))):
+            action = str(result.get("action") or "")
+            if action not in ACTION_NAMES:
+                continue
+            ok = bool(result.get("ok"))
+            self._insert(
+                db,
+                action=action,
+                result={**result, "state": result.get("state") or ("succeeded" if ok else "failed")},
+                full_output=str(result.get("output") or ""),
+            )
+            self._counters["legacy_imported"] += 1
+
+    def _insert(self, db: sqlite3.Connection, *, action: str, result: dict[str, Any], full_output: str) -> int:
+        encoded = full_output.encode("utf-8")
+        with db:
+            cursor = db.execute(
+                f"INSERT INTO action_runs ({_RUN_SELECT}) VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    action,
+                    result.get("job_id"),
+                    str(result.get("state") or ("succeeded" if result.get("ok") else "failed")),
+                    1 if result.get("ok") else 0,
+                    result.get("started_at"),
+                    str(result.get("finished_at") or ""),
+                    result.get("exit_code"),
+                    json.dumps(result.get("command") or []),
+                    _tail(full_output),
+                    len(encoded),
+                    json.dumps(result["details"]) if result.get("details") is not None else None,
+                ),
+            )
+            run_id = int(cursor.lastrowid)
+            db.execute("INSERT INTO action_outputs (run_id, output) VALUES (?, ?)", (run_id, zlib.compress(encoded, 6)))
+            db.execute("INSERT OR REPLACE INTO action_latest (action, run_id) VALUES (?, ?)", (action, run_id))
+        return run_id
+
+    def _prune(self, db: sqlite3.Connection, action: str) -> None:
+        with db:
+            cutoff_row = db.execute(
+                "SELECT id FROM action_runs WHERE action = ? ORDER BY id DESC LIMIT 1 OFFSET ?",
+                (action, self.retain_per_action),
+            ).fetchone()
+            doomed: list[int] = []
+            if cutoff_row is not None:
+                doomed.extend(
+                    int(row[0])
+                    for row in db.execute(
+                        "SELECT id FROM action_runs WHERE action = ? AND id <= ?",
+                        (action, int(cutoff_row[0])),
+                    )
+                )
+            if self.retain_days > 0:
+                cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retain_days)).isoformat()
+                # The newest run per action is kept however old it is.
+                doomed.extend(
+                    int(row[0])
+                    for row in db.execute(
+                        "SELECT id FROM action_runs WHERE finished_at < ? "
+                        "AND id NOT IN (SELECT run_id FROM action_latest)",
+                        (cutoff,),
+                    )
+                )
+            if not doomed:
+                return
+            ids = [(run_id,) for run_id in set(doomed)]
+            db.executemany("DELETE FROM action_outputs WHERE run_id = ?", ids)
+            db.executemany("DELETE FROM action_runs WHERE id = ?", ids)
+        self._counters["pruned"] += len(ids)
+        self._prunes_since_vacuum += 1
+        if self._prunes_since_vacuum >= _VACUUM_EVERY_PRUNES:
+            self._prunes_since_vacuum = 0
+            db.execute("PRAGMA incremental_vacuum")
+            self._counters["vacuums"] += 1
+
+    def record(self, result: dict[str, Any], *, full_output: str | None = None) -> int:
+        """Append a finished run; ``full_output`` defaults to the result's ``output``."""
+        action = str(result.get("action") or "")
+        output = full_output if full_output is not None else str(result.get("output") or "")
+        with self._lock:
+            db = self._db()
+            run_id = self._insert(db, action=action, result=result, full_output=output)
+            self._counters["recorded"] += 1
+            self._prune(db, action)
+        return run_id
+
+    def latest(self) -> dict[str, dict[str, Any] | None]:
+        """Most recent run per action, in the legacy ``last_actions`` shape."""
+        with self._lock:
+            db = self._db()
+            rows = db.execute(
+                f"SELECT {', '.join(f'r.{column}' for column in _RUN_COLUMNS)} "
+                "FROM action_latest AS l JOIN action_runs AS r ON r.id = l.run_id"
+            ).fetchall()
+        latest: dict[str, dict[str, Any] | None] = {name: None for name in ACTION_NAMES}
+        for row in rows:
+            latest[row["action"]] = _run_from_row(row)
+        return latest
+
+    def history(self, *, action: str | None = None, cursor: int | None = None, limit: int = 30) -> dict[str, Any]:
+        """Runs newest first; ``cursor`` is the ``next_cursor`` of the previous page."""
+        clauses: list[str] = []
+        params: list[Any] = []
+        if action is not None:
+            clauses.append("action = ?")
+            params.append(action)
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(cursor)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT {_RUN_SELECT} FROM action_runs {where}ORDER BY id DESC LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+        has_more = len(rows) > limit
+        runs = [_run_from_row(row, include_output=False) for row in rows[:limit]]
+        return {
+            "runs": runs,
+            "count": len(runs),
+            "has_more": has_more,
+            "next_cursor": runs[-1]["id"] if has_more else None,
+        }
+
+    def run(self, run_id: int) -> dict[str, Any] | None:
+        """One run with its full, decompressed output."""
+        with self._lock:
+            db = self._db()
+            row = db.execute(f"SELECT {_RUN_SELECT} FROM action_runs WHERE id = ?", (run_id,)).fetchone()
+            blob = db.execute("SELECT output FROM action_outputs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        run = _run_from_row(row, include_output=False)
+        run["output"] = zlib.decompress(blob[0]).decode("utf-8", errors="replace") if blob else row["output_tail"]
+        return run
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "path": str(self.path),
+            "retain_per_action": self.retain_per_action,
+            "retain_days": self.retain_days,
+        }
@@ -1,26 +1,57 @@
 from __future__ import annotations
 
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+import functools
+import json
 from pathlib import Path
 import sys
-from typing import Any
+import threading
+import time
+from typing import Any, AsyncIterator, Callable
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import websockets
-from websockets.exceptions import ConnectionClosed
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
 REPO_ROOT = Path(__file__).resolve().parents[3]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from adapters.clownpeanuts import ClownPeanutsAdapter
+from adapters.clownpeanuts import CONDITIONAL_REQUEST_HEADERS, ClownPeanutsAdapter, ClownPeanutsStream
 from adapters.pingting import PingTingAdapter
+from .action_history import ACTION_NAMES, ActionHistoryStore
+from .batch import DeceptionBatchRequest, run_deception_batch
+from .bundle_cache import ReplayBundleCache, extract_live_sessions
+from .conditional import conditional_json_response, content_etag, etag_matches, not_modified_response
 from .config import ControlPlaneSettings, load_settings
-from .orchestration import build_orchestration_summary, run_action
+from .db_watcher import FileChangeWatcher
+from .loop_monitor import EventLoopLagMonitor
+from .jobs import JobTask, OrchestrationJob, OrchestrationJobRunner
+from .orchestration import (
+    abuild_orchestration_summary,
+    action_command,
+    close_repo_status_reader,
+    create_smoke_engine,
+    repo_status_stats,
+    smoke_command,
+    smoke_workspace,
+    sync_command,
+    sync_workspace,
+)
+from .overview import OverviewGatherer, OverviewSource, overview_snapshot_fingerprint
+from .proxy_cache import CachedProxyResponse, ProxyResponseCache, normalize_query
+from .sentry_export import AGENT_RUN_EXPORT_FIELDS, EXPORT_FORMATS, FINDING_EXPORT_FIELDS, export_chunks
+from .sentry_rollups import BUCKET_SECONDS, ROLLUP_DIMENSIONS, FindingsRollupStore
+from .theater_delta import TheaterSnapshotTracker
+from .ws_hub import UpstreamStreamHub
+
+# Same query the Theater page polls with, so prefetcher refreshes share its cache entry.
+BUNDLE_PREFETCH_LIVE_QUERY = "limit=120&events_per_session=250"
 
 
 def _now_iso() -> str:
@@ -86,12 +117,100 @@ def _with_token_query(url: str, token: str) -> str:
     return urlunsplit((split.scheme, split.netloc, split.path, urlencode(query), split.fragment))
 
 
+def _optional_non_negative_int(raw: str | None) -> int | None:
+    if raw is None or not raw.strip():
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        return None
+    return value if value >= 0 else None
+
+
+def _sse_event(event: str, data: Any, *, event_id: int | None = None) -> bytes:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
 def create_app(settings: ControlPlaneSettings | None = None) -> FastAPI:
     settings = settings or load_settings()
+    # Bounded pool for SQLite reads, file I/O and git calls so request handlers
+    # never run blocking work on the event loop (long-running actions keep
+    # their own threads and do not count against it). The pool lives as long as
+    # the app, not one lifespan: components below capture it at construction,
+    # so it is never shut down here and idle workers are reaped at exit.
+    blocking_executor = ThreadPoolExecutor(
+        max_workers=settings.blocking_io_workers,
+        thread_name_prefix="controlplane-io",
+    )
+    loop_monitor = EventLoopLagMonitor(threshold_ms=settings.loop_lag_threshold_ms)
+    action_scripts = {
+        "bootstrap": settings.bootstrap_script_path,
+        "smoke": settings.smoke_script_path,
+        "update": settings.update_script_path,
+    }
+    action_history = ActionHistoryStore(
+        path=settings.action_history_db_path,
+        legacy_state_path=settings.orchestration_state_path,
+        retain_per_action=settings.action_history_retain_per_action,
+        retain_days=settings.action_history_retain_days,
+    )
+
+    smoke_engine = create_smoke_engine(settings)
+    # The summary only runs the in-process checks when they are the configured engine.
+    summary_smoke_engine = smoke_engine if settings.smoke_engine == "native" else None
+
+    def run_smoke_task(full: bool, log: Callable[[str], None], cancelled: threading.Event) -> dict[str, Any]:
+        return smoke_workspace(settings, smoke_engine, full=full, log=log, cancelled=cancelled)
+
+    def run_sync_task(mode: str, log: Callable[[str], None], cancelled: threading.Event) -> dict[str, Any]:
+        return sync_workspace(settings, mode=mode, log=log, cancelled=cancelled)
+
+    def record_finished_job(job: OrchestrationJob) -> None:
+        action_history.record(job.result(), full_output=job.full_output())
+
+    job_runner = OrchestrationJobRunner(
+        max_concurrent=settings.orchestration_action_max_concurrent,
+        timeout_seconds=settings.orchestration_action_timeout_seconds,
+        on_finished=record_finished_job,
+        executor=blocking_executor,
+    )
+    overview_gatherer = OverviewGatherer(
+        snapshot_path=settings.overview_snapshot_path,
+        fingerprint=lambda: overview_snapshot_fingerprint(settings),
+        executor=blocking_executor,
+    )
     clownpeanuts = ClownPeanutsAdapter(
         base_url=settings.clownpeanuts_api_base,
         api_token=settings.clownpeanuts_api_token,
+        timeout_seconds=settings.clownpeanuts_timeout_seconds,
+        connect_timeout_seconds=settings.clownpeanuts_connect_timeout_seconds,
+        max_connections=settings.clownpeanuts_max_connections,
+        max_keepalive_connections=settings.clownpeanuts_max_keepalive_connections,
+        keepalive_expiry_seconds=settings.clownpeanuts_keepalive_expiry_seconds,
+        http2=settings.clownpeanuts_http2,
+    )
+    proxy_cache = ProxyResponseCache(
+        ttl_rules=settings.deception_cache_ttls,
+        max_entries=settings.deception_cache_max_entries,
+        max_bytes=settings.deception_cache_max_bytes,
     )
+    theater_tracker = TheaterSnapshotTracker(max_versions=settings.theater_delta_max_versions)
+    bundle_cache = (
+        ReplayBundleCache(
+            root=settings.bundle_cache_dir,
+            max_bytes=settings.bundle_cache_max_bytes,
+            live_ttl_seconds=settings.bundle_cache_live_ttl_seconds,
+            max_age_seconds=settings.bundle_cache_max_age_seconds,
+            executor=blocking_executor,
+        )
+        if settings.bundle_cache_enabled
+        else None
+    )
+    bundle_prefetcher: dict[str, asyncio.Task[None] | None] = {"task": None}
     pingting = PingTingAdapter(
         repo_path=settings.pingting_repo_path,
         status_path=settings.pingting_status_path,
@@ -99,14 +218,76 @@ def create_app(settings: ControlPlaneSettings | None = None) -> FastAPI:
         python_bin=settings.pingting_python_bin,
         max_age_seconds=settings.pingting_status_max_age_seconds,
         command_timeout_seconds=settings.pingting_command_timeout_seconds,
+        db_pool_size=settings.pingting_db_pool_size,
+        db_idle_timeout_seconds=settings.pingting_db_idle_timeout_seconds,
+        replica_path=settings.pingting_replica_path if settings.pingting_replica_enabled else None,
+        executor=blocking_executor,
+    )
+    pingting_syncer: dict[str, asyncio.Task[None] | None] = {"task": None}
+    findings_rollups = FindingsRollupStore(path=settings.sentry_rollup_db_path, pingting=pingting)
+    findings_watcher = FileChangeWatcher(
+        [pingting.db_path, pingting.db_path.with_name(f"{pingting.db_path.name}-wal")],
+        poll_interval_seconds=settings.pingting_db_watch_interval_seconds,
     )
 
+    upstream_ws_token = settings.clownpeanuts_ws_token
+    upstream_ws_headers: dict[str, str] = {}
+    if upstream_ws_token:
+        upstream_ws_headers["Authorization"] = f"Bearer {upstream_ws_token}"
+    stream_hubs = {
+        "events": UpstreamStreamHub(
+            name="events",
+            upstream_url=_with_token_query(settings.clownpeanuts_ws_events_url, upstream_ws_token),
+            upstream_headers=upstream_ws_headers,
+            client_queue_size=settings.ws_client_queue_size,
+            overflow_policy=settings.ws_events_overflow_policy,
+            backlog_max_messages=settings.ws_backlog_max_messages,
+            backlog_max_bytes=settings.ws_backlog_max_bytes,
+            linger_seconds=settings.ws_upstream_linger_seconds,
+        ),
+        "theater": UpstreamStreamHub(
+            name="theater",
+            upstream_url=_with_token_query(settings.clownpeanuts_ws_theater_url, upstream_ws_token),
+            upstream_headers=upstream_ws_headers,
+            client_queue_size=settings.ws_client_queue_size,
+            overflow_policy=settings.ws_theater_overflow_policy,
+            backlog_max_messages=settings.ws_backlog_max_messages,
+            backlog_max_bytes=settings.ws_backlog_max_bytes,
+            linger_seconds=settings.ws_upstream_linger_seconds,
+        ),
+    }
+
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+        loop_monitor.ensure_running()
+        ensure_bundle_prefetcher()
+        ensure_pingting_syncer()
+        overview_gatherer.ensure_refreshing(overview_sources)
+        try:
+            yield
+        finally:
+            for background_task in (bundle_prefetcher["task"], pingting_syncer["task"]):
+                if background_task is not None and not background_task.done():
+                    background_task.cancel()
+                    await asyncio.gather(background_task, return_exceptions=True)
+            for hub in stream_hubs.values():
+                await hub.aclose()
+            await clownpeanuts.aclose()
+            await loop_monitor.aclose()
+            await overview_gatherer.aclose()
+            await job_runner.aclose()
+            findings_rollups.close()
+            action_history.close()
+            pingting.close()
+            close_repo_status_reader()
+
     app = FastAPI(
         title="SquirrelOps Control Plane API",
         version="0.1.0",
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
+        lifespan=lifespan,
     )
 
     if settings.cors_allow_origins:
@@ -118,38 +299,159 @@ def create_app(settings: ControlPlaneSettings | None = None) -> FastAPI:
             allow_headers=["*"],
         )
 
-    async def relay_deception_websocket(*, websocket: WebSocket, upstream_url: str) -> None:
+    async def relay_deception_websocket(*, websocket: WebSocket, hub: UpstreamStreamHub) -> None:
         if settings.api_auth_token and _resolve_websocket_token(websocket) != settings.api_auth_token:
             await websocket.close(code=4401, reason="authentication required")
             return
 
         await websocket.accept()
-        upstream_token = settings.clownpeanuts_ws_token
-        resolved_upstream_url = _with_token_query(upstream_url, upstream_token)
-        upstream_headers: dict[str, str] = {}
-        if upstream_token:
-            upstream_headers["Authorization"] = f"Bearer {upstream_token}"
+        subscriber = hub.subscribe(
+            websocket,
+            since=websocket.query_params.get("since") or None,
+            backlog=_optional_non_negative_int(websocket.query_params.get("backlog")),
+        )
+
+        async def drain_client() -> None:
+            while True:
+                message = await websocket.receive()
+                if message.get("type") == "websocket.disconnect":
+                    return
 
+        writer = asyncio.create_task(subscriber.run_writer(hub))
+        reader = asyncio.create_task(drain_client())
         try:
-            async with websockets.connect(
-                resolved_upstream_url,
-                additional_headers=upstream_headers or None,
-            ) as upstream:
-                while True:
-                    message = await upstream.recv()
-                    if isinstance(message, bytes):
-                        await websocket.send_bytes(message)
-                    else:
-                        await websocket.send_text(message)
-        except WebSocketDisconnect:
+            done, pending = await asyncio.wait({writer, reader}, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                if not task.cancelled():
+                    task.exception()
+        finally:
+            await hub.unsubscribe(subscriber)
+
+    async def fetch_upstream_get(path: str, normalized_query: str) -> tuple[int, dict[str, str], bytes]:
+        status_code, headers, content = await clownpeanuts.proxy(
+            method="GET",
+            path=path,
+            query_string=normalized_query,
+            body=b"",
+            content_type=None,
+        )
+        if status_code == 200:
+            headers.setdefault("etag", content_etag(content))
+        return status_code, headers, content
+
+    async def open_upstream_get(path: str, normalized_query: str) -> ClownPeanutsStream:
+        # Identity encoding keeps the streamed bytes identical to the body that is cached.
+        return await clownpeanuts.proxy_stream(
+            method="GET",
+            path=path,
+            query_string=normalized_query,
+            body=None,
+            content_type=None,
+            forward_headers={"accept-encoding": "identity"},
+        )
+
+    async def cached_upstream_get(
+        path: str,
+        query_string: str,
+        ttl_seconds: float,
+    ) -> tuple[CachedProxyResponse, str]:
+        async def fetch_upstream(normalized_query: str) -> tuple[int, dict[str, str], bytes]:
+            return await fetch_upstream_get(path, normalized_query)
+
+        cached, outcome = await proxy_cache.get_or_fetch(
+            path=path,
+            query_string=query_string,
+            ttl_seconds=ttl_seconds,
+            fetch=fetch_upstream,
+        )
+        if bundle_cache is not None and outcome == "miss" and path == "theater/live" and cached.status_code == 200:
+            live_sessions = extract_live_sessions(cached.content)
+            if live_sessions is not None:
+                bundle_cache.note_live_sessions(live_sessions)
+                ensure_bundle_prefetcher()
+        return cached, outcome
+
+    async def prefetch_bundles_forever() -> None:
+        assert bundle_cache is not None
+        interval = settings.bundle_prefetch_interval_seconds
+        while True:
+            try:
+                if stream_hubs["theater"].subscriber_count:
+                    # Clients following the websocket never poll theater/live, so
+                    # refresh the session list on their behalf.
+                    await cached_upstream_get(
+                        "theater/live",
+                        BUNDLE_PREFETCH_LIVE_QUERY,
+                        proxy_cache.ttl_for("theater/live") or settings.theater_delta_min_refresh_seconds,
+                    )
+                await bundle_cache.prefetch(
+                    targets=settings.bundle_prefetch_targets,
+                    fetch=open_upstream_get,
+                    max_age_seconds=interval * 3,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                bundle_cache.note_prefetch_pass(exc)
+            else:
+                bundle_cache.note_prefetch_pass()
+            await asyncio.sleep(interval)
+
+    def ensure_bundle_prefetcher() -> None:
+        if bundle_cache is None or settings.bundle_prefetch_interval_seconds <= 0 or not settings.bundle_prefetch_targets:
             return
-        except ConnectionClosed:
+        loop = asyncio.get_running_loop()
+        task = bundle_prefetcher["task"]
+        # A task bound to a loop that has since gone away (e.g. per-request test
+        # clients without a lifespan) is simply replaced.
+        if task is not None and not task.done() and task.get_loop() is loop:
             return
-        except Exception:
+        bundle_prefetcher["task"] = loop.create_task(prefetch_bundles_forever(), name="bundle-prefetch")
+
+    async def sync_pingting_forever() -> None:
+        # Keeps the control plane's PingTing sidecars (the replica and the
+        # findings rollups) current so request handlers only read them. New
+        # rows are copied on every change; the replica's hot window is re-read
+        # only when pingting.db moved since the last caught-up sync, and older
+        # rows are swept at most once per sync interval.
+        interval = settings.pingting_replica_sync_interval_seconds
+        synced_signature = None
+        rolled_up_signature = None
+        next_sweep_at = 0.0
+        while True:
+            signature = findings_watcher.snapshot()
+            if signature != rolled_up_signature and pingting.db_path.is_file():
+                try:
+                    await run_blocking(findings_rollups.advance)
+                    rolled_up_signature = signature
+                except Exception:
+                    pass
+            sweep = time.monotonic() >= next_sweep_at
             try:
-                await websocket.close(code=1011, reason="upstream websocket unavailable")
+                caught_up = await pingting.arefresh_replica(changed=signature != synced_signature, sweep=sweep)
             except Exception:
-                return
+                caught_up = True
+            else:
+                if caught_up:
+                    synced_signature = signature
+                    if sweep:
+                        next_sweep_at = time.monotonic() + interval
+            if caught_up:
+                await findings_watcher.wait_for_change(since=signature, timeout_seconds=interval)
+
+    def ensure_pingting_syncer() -> None:
+        loop = asyncio.get_running_loop()
+        task = pingting_syncer["task"]
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        pingting_syncer["task"] = loop.create_task(sync_pingting_forever(), name="pingting-sync")
+
+    async def run_blocking(func: Any, /, *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(blocking_executor, functools.partial(func, *args, **kwargs))
 
     @app.middleware("http")
     async def auth_middleware(request: Request, call_next: Any) -> Response:
@@ -168,6 +470,12 @@ def create_app(settings: ControlPlaneSettings | None = None) -> FastAPI:
             )
         return await call_next(request)
 
+    @app.middleware("http")
+    async def loop_lag_middleware(request: Request, call_next: Any) -> Response:
+        loop_monitor.ensure_running()
+        with loop_monitor.track(f"{request.method} {request.url.path}"):
+            return await call_next(request)
+
     @app.get("/health")
     def health() -> dict[str, Any]:
         return {
@@ -176,131 +484,576 @@ def create_app(settings: ControlPlaneSettings | None = None) -> FastAPI:
             "generated_at": _now_iso(),
         }
 
-    @app.get("/overview/summary")
-    async def overview_summary() -> dict[str, Any]:
-        deception: dict[str, Any]
+    @app.get("/health/metrics")
+    def health_metrics() -> dict[str, Any]:
+        return {
+            "generated_at": _now_iso(),
+            "deception_proxy_cache": proxy_cache.stats(),
+            "deception_streams": {name: hub.stats() for name, hub in stream_hubs.items()},
+            "theater_delta": theater_tracker.stats(),
+            "replay_bundle_cache": bundle_cache.stats() if bundle_cache is not None else None,
+            "pingting_status_file": pingting.status_file_cache_stats(),
+            "pingting_status_cli": pingting.status_cli_stats(),
+            "pingting_db_pool": pingting.db_pool.stats(),
+            "pingting_db_watcher": findings_watcher.stats(),
+            "pingting_replica": pingting.replica.stats() if pingting.replica is not None else None,
+            "event_loop": loop_monitor.stats(),
+            "overview_sources": overview_gatherer.stats(),
+            "repo_status": repo_status_stats(),
+            "orchestration_jobs": job_runner.stats(),
+            "action_history": action_history.stats(),
+            "smoke": smoke_engine.stats(),
+            "sentry_rollups": findings_rollups.stats(),
+        }
+
+    async def overview_deception() -> dict[str, Any]:
         try:
-            deception_status = await clownpeanuts.status()
-            deception = {"ok": True, "status": deception_status}
+            return {"ok": True, "status": await clownpeanuts.status()}
         except Exception as exc:
-            deception = {"ok": False, "status": {}, "error": str(exc)}
+            return {"ok": False, "status": {}, "error": str(exc)}
 
-        sentry = pingting.load_status_summary(refresh_if_stale=True)
-        sentry_findings = pingting.load_recent_findings(
+    async def overview_sentry_findings() -> dict[str, Any]:
+        ensure_pingting_syncer()
+        sentry_findings = await pingting.aload_recent_findings(
             limit=5,
             include_acknowledged=False,
             include_learning=True,
         )
         if not bool(sentry_findings.get("ok")):
-            sentry_findings = {
+            return {
                 "ok": False,
                 "count": 0,
                 "findings": [],
                 "errors": sentry_findings.get("errors", []),
             }
-        orchestration = build_orchestration_summary(settings)
+        return sentry_findings
 
-        overall_ok = bool(deception.get("ok")) and bool(sentry.get("ok")) and orchestration.get("missing_repo_count", 0) == 0
+    def overview_source(name: str, fetch: Any, placeholder: dict[str, Any]) -> OverviewSource:
+        return OverviewSource(
+            name=name,
+            fetch=fetch,
+            deadline_seconds=settings.overview_source_timeouts.get(name, settings.overview_deadline_seconds),
+            placeholder=placeholder,
+            refresh_interval_seconds=settings.overview_refresh_intervals.get(name, 0.0),
+        )
 
-        return {
-            "generated_at": _now_iso(),
-            "overall_ok": overall_ok,
-            "deception": deception,
-            "sentry": sentry,
-            "sentry_findings": sentry_findings,
-            "orchestration": orchestration,
-        }
+    overview_sources = [
+        overview_source("deception", overview_deception, {"ok": False, "status": {}}),
+        overview_source(
+            "sentry",
+            lambda: pingting.aload_status_summary(refresh_if_stale=True),
+            {"ok": False, "source": "unavailable", "stale": True, "highlights": {}, "snapshot": {}, "errors": []},
+        ),
+        overview_source(
+            "sentry_findings",
+            overview_sentry_findings,
+            {"ok": False, "count": 0, "findings": [], "errors": []},
+        ),
+        overview_source(
+            "orchestration",
+            lambda: abuild_orchestration_summary(
+                settings,
+                history=action_history,
+                smoke=summary_smoke_engine,
+                executor=blocking_executor,
+            ),
+            {"ok": False, "projects": [], "project_count": 0},
+        ),
+    ]
+
+    @app.get("/overview/summary")
+    async def overview_summary(request: Request) -> Response:
+        overview_gatherer.ensure_refreshing(overview_sources)
+        sections, sources = await overview_gatherer.gather(
+            overview_sources,
+            hard_deadline_seconds=settings.overview_deadline_seconds,
+        )
+        deception = sections["deception"]
+        sentry = sections["sentry"]
+        orchestration = sections["orchestration"]
+        overall_ok = (
+            bool(deception.get("ok"))
+            and bool(sentry.get("ok"))
+            and "missing_repo_count" in orchestration
+            and orchestration.get("missing_repo_count", 0) == 0
+        )
+
+        return conditional_json_response(
+            request,
+            {
+                "generated_at": _now_iso(),
+                "overall_ok": overall_ok,
+                "partial": any(item["freshness"] != "fresh" for item in sources.values()),
+                "deception": deception,
+                "sentry": sentry,
+                "sentry_findings": sections["sentry_findings"],
+                "orchestration": orchestration,
+                "sources": sources,
+            },
+        )
 
     @app.get("/sentry/summary")
-    def sentry_summary(refresh: bool = Query(default=False)) -> dict[str, Any]:
-        return pingting.load_status_summary(refresh_if_stale=True, force_cli_refresh=refresh)
+    async def sentry_summary(request: Request, refresh: bool = Query(default=False)) -> Response:
+        return conditional_json_response(
+            request,
+            await pingting.aload_status_summary(refresh_if_stale=True, force_cli_refresh=refresh),
+        )
 
     @app.get("/sentry/findings")
-    def sentry_findings(
+    async def sentry_findings(
+        request: Request,
         limit: int = Query(default=30, ge=1, le=200),
         severity: str | None = Query(default=None),
         include_acknowledged: bool = Query(default=True),
         include_learning: bool = Query(default=True),
-    ) -> dict[str, Any]:
-        payload = pingting.load_recent_findings(
+        cursor: str | None = Query(default=None),
+    ) -> Response:
+        ensure_pingting_syncer()
+        payload = await pingting.aload_recent_findings(
             limit=limit,
             severity=severity,
             include_acknowledged=include_acknowledged,
             include_learning=include_learning,
+            cursor=cursor,
         )
         if not bool(payload.get("ok")):
             errors = payload.get("errors", ["sentry findings unavailable"])
             joined = " ".join(str(item) for item in errors).lower()
-            status_code = 400 if "invalid severity" in joined else 502
+            status_code = 400 if "invalid severity" in joined or "invalid cursor" in joined else 502
             raise HTTPException(status_code=status_code, detail=errors)
+        return conditional_json_response(request, payload)
+
+    @app.get("/sentry/findings/export")
+    def sentry_findings_export(
+        export_format: str = Query(default="ndjson", alias="format"),
+        severity: str | None = Query(default=None),
+        include_acknowledged: bool = Query(default=True),
+        include_learning: bool = Query(default=True),
+        cursor: str | None = Query(default=None),
+    ) -> StreamingResponse:
+        if export_format not in EXPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=[f"invalid format: {export_format}"])
+        try:
+            rows = pingting.iter_findings(
+                severity=severity,
+                include_acknowledged=include_acknowledged,
+                include_learning=include_learning,
+                cursor=cursor,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=[str(exc)]) from exc
+        except FileNotFoundError as exc:
+            raise HTTPException(status_code=502, detail=[str(exc)]) from exc
+        return StreamingResponse(
+            export_chunks(rows, export_format=export_format, fields=FINDING_EXPORT_FIELDS),
+            media_type=EXPORT_FORMATS[export_format],
+            headers={"Content-Disposition": f'attachment; filename="pingting-findings.{export_format}"'},
+        )
+
+    def findings_since_error(payload: dict[str, Any]) -> HTTPException:
+        errors = payload.get("errors", ["sentry findings unavailable"])
+        status_code = 400 if "invalid severity" in " ".join(str(item) for item in errors) else 502
+        return HTTPException(status_code=status_code, detail=errors)
+
+    @app.get("/sentry/findings/since")
+    async def sentry_findings_since(
+        after_id: int | None = Query(default=None, ge=0),
+        limit: int = Query(default=200, ge=1, le=500),
+        severity: str | None = Query(default=None),
+        include_acknowledged: bool = Query(default=True),
+        include_learning: bool = Query(default=True),
+        wait: float = Query(default=0.0, ge=0.0, le=60.0),
+    ) -> dict[str, Any]:
+        async def read() -> dict[str, Any]:
+            return await pingting.aload_findings_since(
+                after_id=after_id,
+                limit=limit,
+                severity=severity,
+                include_acknowledged=include_acknowledged,
+                include_learning=include_learning,
+            )
+
+        snapshot = findings_watcher.snapshot()
+        payload = await read()
+        if not bool(payload.get("ok")):
+            raise findings_since_error(payload)
+        if wait > 0 and after_id is not None and not payload["findings"]:
+            if await findings_watcher.wait_for_change(since=snapshot, timeout_seconds=wait):
+                payload = await read()
+                if not bool(payload.get("ok")):
+                    raise findings_since_error(payload)
         return payload
 
+    @app.get("/sentry/findings/stream")
+    async def sentry_findings_stream(
+        request: Request,
+        after_id: int | None = Query(default=None, ge=0),
+        severity: str | None = Query(default=None),
+        include_acknowledged: bool = Query(default=True),
+        include_learning: bool = Query(default=True),
+    ) -> StreamingResponse:
+        async def read(mark: int | None) -> dict[str, Any]:
+            return await pingting.aload_findings_since(
+                after_id=mark,
+                limit=200,
+                severity=severity,
+                include_acknowledged=include_acknowledged,
+                include_learning=include_learning,
+            )
+
+        # EventSource resends the last id it saw on reconnect.
+        last_event_id = _optional_non_negative_int(request.headers.get("last-event-id"))
+        start = last_event_id if last_event_id is not None else after_id
+        snapshot = findings_watcher.snapshot()
+        first = await read(start)
+        if not bool(first.get("ok")):
+            raise findings_since_error(first)
+
+        async def events() -> AsyncIterator[bytes]:
+            nonlocal snapshot
+            payload = first
+            # Announce where the stream starts; rows in ``first`` follow as their own event.
+            mark = start if start is not None else first["high_water_mark"]
+            yield _sse_event("ready", {"high_water_mark": mark}, event_id=mark)
+            while True:
+                if payload.get("ok"):
+                    mark = payload["high_water_mark"]
+                    if payload["findings"]:
+                        yield _sse_event(
+                            "findings",
+                            {"findings": payload["findings"], "high_water_mark": mark},
+                            event_id=mark,
+                        )
+                else:
+                    yield _sse_event("error", {"errors": payload.get("errors", [])})
+                if not payload.get("has_more"):
+                    while not await findings_watcher.wait_for_change(
+                        since=snapshot,
+                        timeout_seconds=settings.sse_keepalive_seconds,
+                    ):
+                        yield b": keepalive\n\n"
+                snapshot = findings_watcher.snapshot()
+                payload = await read(mark)
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+        )
+
+    @app.get("/sentry/rollups")
+    async def sentry_rollups(
+        request: Request,
+        bucket: str = Query(default="hour"),
+        days: int = Query(default=30, ge=1, le=366),
+        group_by: str = Query(default="severity"),
+        severity: str | None = Query(default=None),
+        agent: str | None = Query(default=None),
+        device: str | None = Query(default=None),
+    ) -> Response:
+        if bucket not in BUCKET_SECONDS:
+            raise HTTPException(status_code=400, detail=[f"invalid bucket: {bucket}"])
+        dimensions = tuple(item.strip() for item in group_by.split(",") if item.strip())
+        invalid = [item for item in dimensions if item not in ROLLUP_DIMENSIONS]
+        if invalid or len(set(dimensions)) != len(dimensions):
+            raise HTTPException(status_code=400, detail=[f"invalid group_by: {group_by}"])
+        filters = {
+            name: value.strip()
+            for name, value in (("severity", severity), ("agent", agent), ("device", device))
+            if value and value.strip()
+        }
+        if not pingting.db_path.is_file():
+            raise HTTPException(status_code=502, detail=[f"missing database file: {pingting.db_path}"])
+
+        since_epoch = int(time.time()) - days * 86400
+        ensure_pingting_syncer()
+        try:
+            # Rollups are advanced by the PingTing syncer; this only reads them.
+            result = await run_blocking(
+                findings_rollups.query,
+                bucket=bucket,
+                since_epoch=since_epoch,
+                group_by=dimensions,
+                filters=filters,
+            )
+        except Exception as exc:
+            raise HTTPException(status_code=502, detail=[f"failed building sentry rollups: {exc}"]) from exc
+
+        return conditional_json_response(
+            request,
+            {
+                "ok": True,
+                "bucket": bucket,
+                "bucket_seconds": BUCKET_SECONDS[bucket],
+                "since": since_epoch,
+                "group_by": list(dimensions),
+                **result,
+                "errors": [],
+            },
+        )
+
     @app.get("/sentry/runs")
-    def sentry_runs(
+    async def sentry_runs(
+        request: Request,
         limit: int = Query(default=30, ge=1, le=200),
         agent: str | None = Query(default=None),
         status: str | None = Query(default=None),
-    ) -> dict[str, Any]:
-        payload = pingting.load_recent_agent_runs(
+        cursor: str | None = Query(default=None),
+    ) -> Response:
+        ensure_pingting_syncer()
+        payload = await pingting.aload_recent_agent_runs(
             limit=limit,
             agent=agent,
             status=status,
+            cursor=cursor,
         )
         if not bool(payload.get("ok")):
-            raise HTTPException(status_code=502, detail=payload.get("errors", ["sentry runs unavailable"]))
-        return payload
+            errors = payload.get("errors", ["sentry runs unavailable"])
+            status_code = 400 if "invalid cursor" in " ".join(str(item) for item in errors) else 502
+            raise HTTPException(status_code=status_code, detail=errors)
+        return conditional_json_response(request, payload)
 
-    @app.get("/orchestration/summary")
-    def orchestration_summary() -> dict[str, Any]:
-        return build_orchestration_summary(settings)
-
-    @app.post("/orchestration/actions/smoke")
-    async def orchestration_action_smoke() -> dict[str, Any]:
-        return await asyncio.to_thread(
-            run_action,
-            action_name="smoke",
-            script_path=settings.smoke_script_path,
-            base_dir=settings.workspace_root,
-            timeout_seconds=settings.orchestration_action_timeout_seconds,
-            state_path=settings.orchestration_state_path,
+    @app.get("/sentry/runs/export")
+    def sentry_runs_export(
+        export_format: str = Query(default="ndjson", alias="format"),
+        agent: str | None = Query(default=None),
+        status: str | None = Query(default=None),
+        cursor: str | None = Query(default=None),
+    ) -> StreamingResponse:
+        if export_format not in EXPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=[f"invalid format: {export_format}"])
+        try:
+            rows = pingting.iter_agent_runs(agent=agent, status=status, cursor=cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=[str(exc)]) from exc
+        except FileNotFoundError as exc:
+            raise HTTPException(status_code=502, detail=[str(exc)]) from exc
+        return StreamingResponse(
+            export_chunks(rows, export_format=export_format, fields=AGENT_RUN_EXPORT_FIELDS),
+            media_type=EXPORT_FORMATS[export_format],
+            headers={"Content-Disposition": f'attachment; filename="pingting-agent-runs.{export_format}"'},
         )
 
-    @app.post("/orchestration/actions/bootstrap")
-    async def orchestration_action_bootstrap() -> dict[str, Any]:
-        return await asyncio.to_thread(
-            run_action,
-            action_name="bootstrap",
-            script_path=settings.bootstrap_script_path,
-            base_dir=settings.workspace_root,
-            timeout_seconds=settings.orchestration_action_timeout_seconds,
-            state_path=settings.orchestration_state_path,
+    @app.get("/orchestration/summary")
+    async def orchestration_summary(request: Request) -> Response:
+        return conditional_json_response(
+            request,
+            await abuild_orchestration_summary(
+                settings,
+                history=action_history,
+                smoke=summary_smoke_engine,
+                executor=blocking_executor,
+            ),
         )
 
-    @app.post("/orchestration/actions/update")
-    async def orchestration_action_update() -> dict[str, Any]:
-        return await asyncio.to_thread(
-            run_action,
-            action_name="update",
-            script_path=settings.update_script_path,
-            base_dir=settings.workspace_root,
-            timeout_seconds=settings.orchestration_action_timeout_seconds,
-            state_path=settings.orchestration_state_path,
+    def orchestration_job_or_404(job_id: str) -> OrchestrationJob:
+        job = job_runner.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"unknown job: {job_id}")
+        return job
+
+    @app.post("/orchestration/actions/{action}", status_code=202)
+    async def orchestration_action_start(action: str, full: bool = Query(default=False)) -> dict[str, Any]:
+        script_path = action_scripts.get(action)
+        if script_path is None:
+            raise HTTPException(status_code=404, detail=f"unknown action: {action}")
+        task: JobTask | None = None
+        if action in {"bootstrap", "update"} and settings.sync_engine == "native":
+            task = functools.partial(run_sync_task, action)
+            command = sync_command(settings, action)
+        elif action == "smoke" and settings.smoke_engine == "native":
+            # ``full`` re-verifies every project instead of reusing cached results.
+            task = functools.partial(run_smoke_task, full)
+            command = smoke_command(settings, full=full)
+        else:
+            command = action_command(script_path, settings.workspace_root)
+        job, attached = job_runner.start(action=action, command=command, cwd=script_path.parent.parent, task=task)
+        return {"ok": True, "job": job.summary(), "attached": attached, "errors": []}
+
+    @app.get("/orchestration/jobs")
+    async def orchestration_jobs() -> dict[str, Any]:
+        return {"ok": True, "jobs": [job.summary() for job in job_runner.jobs()], "errors": []}
+
+    @app.get("/orchestration/jobs/{job_id}")
+    async def orchestration_job(job_id: str, offset: int = Query(default=0, ge=0)) -> dict[str, Any]:
+        job = orchestration_job_or_404(job_id)
+        start, end, output, truncated = job.read_log(offset)
+        return {
+            "ok": True,
+            "job": job.summary(),
+            "offset": start,
+            "next_offset": end,
+            "output": output,
+            "truncated": truncated,
+            "errors": [],
+        }
+
+    @app.get("/orchestration/jobs/{job_id}/stream")
+    async def orchestration_job_stream(
+        job_id: str,
+        request: Request,
+        offset: int = Query(default=0, ge=0),
+    ) -> StreamingResponse:
+        job = orchestration_job_or_404(job_id)
+        # EventSource resends the last id (a log byte offset) on reconnect.
+        last_event_id = _optional_non_negative_int(request.headers.get("last-event-id"))
+        start = last_event_id if last_event_id is not None else offset
+
+        async def events() -> AsyncIterator[bytes]:
+            yield _sse_event("status", job.summary())
+            async for chunk_start, end, text, truncated in job_runner.follow(job, start):
+                yield _sse_event(
+                    "log",
+                    {"offset": chunk_start, "text": text, "truncated": truncated},
+                    event_id=end,
+                )
+            yield _sse_event("status", job.summary())
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
         )
 
+    @app.get("/orchestration/history")
+    async def orchestration_history(
+        action: str | None = Query(default=None),
+        cursor: int | None = Query(default=None, ge=1),
+        limit: int = Query(default=30, ge=1, le=200),
+    ) -> dict[str, Any]:
+        if action is not None and action not in ACTION_NAMES:
+            raise HTTPException(status_code=400, detail=[f"invalid action: {action}"])
+        page = await run_blocking(action_history.history, action=action, cursor=cursor, limit=limit)
+        return {"ok": True, **page, "errors": []}
+
+    @app.get("/orchestration/history/{run_id}")
+    async def orchestration_history_run(run_id: int) -> dict[str, Any]:
+        run = await run_blocking(action_history.run, run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail=f"unknown run: {run_id}")
+        return {"ok": True, "run": run, "errors": []}
+
+    @app.post("/orchestration/jobs/{job_id}/cancel")
+    async def orchestration_job_cancel(job_id: str) -> dict[str, Any]:
+        job = orchestration_job_or_404(job_id)
+        if job.done:
+            return {"ok": False, "job": job.summary(), "errors": [f"job already {job.state}"]}
+        job_runner.cancel(job_id)
+        return {"ok": True, "job": job.summary(), "errors": []}
+
     @app.websocket("/deception/ws/events")
     async def deception_ws_events(websocket: WebSocket) -> None:
-        await relay_deception_websocket(
-            websocket=websocket,
-            upstream_url=settings.clownpeanuts_ws_events_url,
-        )
+        await relay_deception_websocket(websocket=websocket, hub=stream_hubs["events"])
 
     @app.websocket("/deception/ws/theater/live")
     async def deception_ws_theater_live(websocket: WebSocket) -> None:
-        await relay_deception_websocket(
-            websocket=websocket,
-            upstream_url=settings.clownpeanuts_ws_theater_url,
+        ensure_bundle_prefetcher()
+        await relay_deception_websocket(websocket=websocket, hub=stream_hubs["theater"])
+
+    @app.post("/deception/_batch")
+    async def deception_batch(batch: DeceptionBatchRequest) -> dict[str, Any]:
+        if len(batch.requests) > settings.deception_batch_max_items:
+            raise HTTPException(
+                status_code=400,
+                detail=f"batch accepts at most {settings.deception_batch_max_items} requests",
+            )
+
+        async def fetch_item(path: str, query_string: str) -> tuple[int, dict[str, str], bytes, str]:
+            cache_ttl = proxy_cache.ttl_for(path)
+            if cache_ttl is not None:
+                cached, outcome = await cached_upstream_get(path, query_string, cache_ttl)
+                return cached.status_code, cached.headers, cached.content, outcome
+            status_code, headers, content = await fetch_upstream_get(path, normalize_query(query_string))
+            return status_code, headers, content, "bypass"
+
+        timeout_seconds = settings.deception_batch_timeout_seconds
+        if batch.timeout_seconds is not None and batch.timeout_seconds > 0:
+            timeout_seconds = min(timeout_seconds, batch.timeout_seconds)
+        started = time.perf_counter()
+        results = await run_deception_batch(
+            batch.requests,
+            fetch=fetch_item,
+            max_concurrency=settings.deception_batch_max_concurrency,
+            timeout_seconds=timeout_seconds,
+        )
+        return {
+            "ok": all(result["ok"] for result in results),
+            "generated_at": _now_iso(),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "results": results,
+        }
+
+    @app.get("/deception/_delta/theater/live")
+    async def deception_theater_live_delta(request: Request, since: str | None = Query(default=None)) -> Response:
+        upstream_query = normalize_query(request.url.query, exclude=frozenset({"since"}))
+        try:
+            cached, _outcome = await cached_upstream_get(
+                "theater/live",
+                upstream_query,
+                proxy_cache.ttl_for("theater/live") or settings.theater_delta_min_refresh_seconds,
+            )
+        except Exception as exc:
+            raise HTTPException(status_code=502, detail=f"deception upstream error: {exc}") from exc
+        if cached.status_code != 200:
+            return Response(content=cached.content, status_code=cached.status_code, headers=cached.headers)
+
+        def build_response() -> bytes | None:
+            # Parsing and diffing large snapshots is CPU-bound; keep it off the loop.
+            version = theater_tracker.observe(
+                upstream_query,
+                identity=cached.headers.get("etag") or content_etag(cached.content),
+                content=cached.content,
+            )
+            if version is None:
+                return None
+            return theater_tracker.respond(upstream_query, version, since)
+
+        content = await run_blocking(build_response)
+        if content is None:
+            raise HTTPException(status_code=502, detail="deception upstream returned a non-object theater payload")
+        return Response(
+            content=content,
+            media_type="application/json",
+            headers={"Cache-Control": "no-store"},
         )
 
+    async def serve_replay_bundle(path: str, session_id: str, request: Request) -> Response:
+        assert bundle_cache is not None
+        ensure_bundle_prefetcher()
+        try:
+            body = await bundle_cache.open(
+                path=path,
+                query_string=request.url.query,
+                session_id=session_id,
+                fetch=open_upstream_get,
+            )
+        except Exception as exc:
+            raise HTTPException(status_code=502, detail=f"deception upstream error: {exc}") from exc
+
+        if body.status_code == 200 and body.etag and etag_matches(request.headers.get("if-none-match"), body.etag):
+            await body.aclose()
+            return not_modified_response(body.etag, headers={"x-controlplane-cache": body.outcome})
+        response_headers = {**body.headers, "x-controlplane-cache": body.outcome}
+        if body.status_code == 200:
+            response_headers["cache-control"] = "no-cache"
+        response_headers.setdefault("content-type", "application/json")
+        return StreamingResponse(
+            body,
+            status_code=body.status_code,
+            headers=response_headers,
+            background=BackgroundTask(body.aclose),
+        )
+
+    if bundle_cache is not None:
+
+        @app.get("/deception/theater/sessions/{session_id}/bundle")
+        async def deception_theater_session_bundle(session_id: str, request: Request) -> Response:
+            return await serve_replay_bundle(f"theater/sessions/{session_id}/bundle", session_id, request)
+
+        @app.get("/deception/sessions/{session_id}/replay")
+        async def deception_session_replay(session_id: str, request: Request) -> Response:
+            return await serve_replay_bundle(f"sessions/{session_id}/replay", session_id, request)
+
     @app.api_route(
         "/deception/{target_path:path}",
         methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
@@ -314,8 +1067,59 @@ def create_app(settings: ControlPlaneSettings | None = None) -> FastAPI:
                 detail="use websocket routes at /deception/ws/events or /deception/ws/theater/live",
             )
 
-        body = await request.body()
         content_type = request.headers.get("content-type")
+        conditional_headers = {
+            name: request.headers[name] for name in CONDITIONAL_REQUEST_HEADERS if name in request.headers
+        }
+
+        cache_ttl = proxy_cache.ttl_for(normalized_path) if request.method.upper() == "GET" else None
+        if cache_ttl is not None:
+            try:
+                cached, outcome = await cached_upstream_get(normalized_path, request.url.query, cache_ttl)
+            except Exception as exc:
+                raise HTTPException(status_code=502, detail=f"deception upstream error: {exc}") from exc
+
+            cached_headers = dict(cached.headers)
+            cached_headers["x-controlplane-cache"] = outcome
+            cached_headers["age"] = str(cached.age_seconds())
+            etag = cached_headers.get("etag")
+            if cached.status_code == 200 and etag and etag_matches(request.headers.get("if-none-match"), etag):
+                return not_modified_response(
+                    etag,
+                    headers={"x-controlplane-cache": outcome, "age": cached_headers["age"]},
+                )
+            return Response(content=cached.content, status_code=cached.status_code, headers=cached_headers)
+
+        if settings.deception_proxy_streaming:
+            content_length = request.headers.get("content-length")
+            has_body = bool(content_length and content_length != "0") or "transfer-encoding" in request.headers
+            try:
+                upstream = await clownpeanuts.proxy_stream(
+                    method=request.method,
+                    path=normalized_path,
+                    query_string=request.url.query,
+                    body=request.stream() if has_body else None,
+                    content_type=content_type,
+                    content_length=content_length if has_body else None,
+                    # The body is relayed raw, so only encodings the caller accepts may come back.
+                    forward_headers={
+                        **conditional_headers,
+                        "accept-encoding": request.headers.get("accept-encoding", "identity"),
+                    },
+                )
+            except Exception as exc:
+                raise HTTPException(status_code=502, detail=f"deception upstream error: {exc}") from exc
+
+            stream_headers = dict(upstream.headers)
+            stream_headers.setdefault("content-type", "application/json")
+            return StreamingResponse(
+                upstream.aiter_bytes(),
+                status_code=upstream.status_code,
+                headers=stream_headers,
+                background=BackgroundTask(upstream.aclose),
+            )
+
+        body = await request.body()
 
         try:
             status_code, headers, content = await clownpeanuts.proxy(
@@ -324,15 +1128,11 @@ def create_app(settings: ControlPlaneSettings | None = None) -> FastAPI:
                 query_string=request.url.query,
                 body=body,
                 content_type=content_type,
+                forward_headers=conditional_headers,
             )
         except Exception as exc:
             raise HTTPException(status_code=502, detail=f"deception upstream error: {exc}") from exc
 
-        response_headers = {}
-        content_type_header = headers.get("content-type")
-        if content_type_header:
-            response_headers["content-type"] = content_type_header
-
-        return Response(content=content, status_code=status_code, headers=response_headers)
+        return Response(content=content, status_code=status_code, headers=headers)
 
     return app
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlencode
+
+from pydantic import BaseModel, Field
+
+# (status_code, headers, content, cache outcome)
+BatchFetch = Callable[[str, str], Awaitable[tuple[int, dict[str, str], bytes, str]]]
+
+
+class DeceptionBatchItem(BaseModel):
+    id: str | None = None
+    path: str
+    query: str | dict[str, str] = ""
+
+
+class DeceptionBatchRequest(BaseModel):
+    requests: list[DeceptionBatchItem] = Field(default_factory=list)
+    timeout_seconds: float | None = None
+
+
+def _item_query(item: DeceptionBatchItem) -> str:
+    if isinstance(item.query, dict):
+        return urlencode(item.query)
+    return item.query.lstrip("?")
+
+
+def _item_path_error(path: str) -> str | None:
+    if not path:
+        return "path is required"
+    if path.startswith(("ws/", "_")):
+        return "path is not batchable"
+    if "?" in path or "#" in path:
+        return "pass query parameters in query"
+    return None
+
+
+def _decode_content(content: bytes, content_type: str) -> dict[str, Any]:
+    if "json" in content_type.lower():
+        try:
+            return {"body": json.loads(content) if content else None}
+        except ValueError:
+            pass
+    return {"text": content.decode("utf-8", errors="replace")}
+
+
+async def run_deception_batch(
+    items: list[DeceptionBatchItem],
+    *,
+    fetch: BatchFetch,
+    max_concurrency: int,
+    timeout_seconds: float,
+) -> list[dict[str, Any]]:
+    """Run GET sub-requests concurrently and report each one's outcome in order.
+
+    ``timeout_seconds`` bounds each item including its wait for a concurrency
+    slot, so one slow resource never holds up the rest of the batch.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def fetch_with_slot(path: str, query_string: str) -> tuple[int, dict[str, str], bytes, str]:
+        async with semaphore:
+            return await fetch(path, query_string)
+
+    async def run_item(index: int, item: DeceptionBatchItem) -> dict[str, Any]:
+        path = item.path.strip().strip("/")
+        result: dict[str, Any] = {"id": item.id or str(index), "path": path}
+        started = time.perf_counter()
+        path_error = _item_path_error(path)
+        if path_error is not None:
+            result.update({"status": 400, "ok": False, "error": path_error, "elapsed_ms": 0.0})
+            return result
+        try:
+            status_code, headers, content, cache = await asyncio.wait_for(
+                fetch_with_slot(path, _item_query(item)),
+                timeout=timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            result.update({"status": 504, "ok": False, "error": f"timed out after {timeout_seconds:g}s"})
+        except Exception as exc:
+            result.update({"status": 502, "ok": False, "error": f"deception upstream error: {exc}"})
+        else:
+            result.update({"status": status_code, "ok": 200 <= status_code < 300, "cache": cache})
+            if headers.get("etag"):
+                result["etag"] = headers["etag"]
+            result.update(_decode_content(content, headers.get("content-type", "")))
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    return list(await asyncio.gather(*(run_item(index, item) for index, item in enumerate(items))))
@@ -0,0 +1,593 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass
+import functools
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from adapters.clownpeanuts import ClownPeanutsStream
+
+from .proxy_cache import _consume_task_result, _is_storable, normalize_query
+
+logger = logging.getLogger("controlplane_api.bundle_cache")
+
+# Opens an upstream GET for ``(path, normalized_query)``, returning once headers arrive.
+BundleOpen = Callable[[str, str], Awaitable[ClownPeanutsStream]]
+
+# Bytes read from a bundle file per chunk.
+_READ_CHUNK_BYTES = 64 * 1024
+
+
+def extract_live_sessions(content: bytes) -> dict[str, str | None] | None:
+    """Map session ids in a theater/live payload to a change marker (their event count)."""
+    try:
+        payload = json.loads(content)
+    except ValueError:
+        return None
+    sessions = payload.get("sessions") if isinstance(payload, dict) else None
+    if not isinstance(sessions, list):
+        return None
+    live: dict[str, str | None] = {}
+    for session in sessions:
+        if isinstance(session, dict) and session.get("session_id"):
+            event_count = session.get("event_count")
+            live[str(session["session_id"])] = None if event_count is None else str(event_count)
+    return live
+
+
+@dataclass(frozen=True)
+class CachedBundle:
+    key: str
+    path: Path
+    session_id: str
+    marker: str | None
+    size: int
+    stored_at: float
+    content_type: str
+    etag: str
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_bytes(content)
+    os.replace(temp_path, path)
+
+
+def _open_temp(path: Path) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def _unlink_quietly(*paths: Path) -> None:
+    for path in paths:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _open_if_current(path: Path) -> int | None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        os.utime(fd)
+    except OSError:
+        pass
+    return fd
+
+
+class _BundleDownload:
+    """An upstream bundle being written to a temp file that readers follow by offset.
+
+    The file descriptor stays open until the download is done and every
+    reader has released it, so readers are unaffected by the temp file being
+    renamed into the cache, discarded, or the entry being evicted.
+    """
+
+    def __init__(self, temp_path: Path) -> None:
+        self.temp_path = temp_path
+        self.fd: int | None = None
+        self.status_code = 502
+        self.headers: dict[str, str] = {}
+        self.entry: CachedBundle | None = None
+        self.error: BaseException | None = None
+        self.written = 0
+        self.done = False
+        # The writer holds one reference until it finishes.
+        self.refs = 1
+        self.ready = asyncio.Event()
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def advance(self, size: int) -> None:
+        self.written += size
+        self._notify()
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self.error = error
+        self.done = True
+        self.ready.set()
+        self._notify()
+
+    async def wait_for(self, offset: int) -> None:
+        if self.written > offset or self.done:
+            return
+        await self._changed.wait()
+
+    def release(self) -> None:
+        self.refs -= 1
+        if self.refs <= 0 and self.done and self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class BundleBody:
+    """A bundle response body read from an open file, following a download in progress."""
+
+    def __init__(
+        self,
+        *,
+        fd: int,
+        status_code: int,
+        headers: dict[str, str],
+        etag: str,
+        outcome: str,
+        executor: Executor | None,
+        download: _BundleDownload | None = None,
+    ) -> None:
+        self.fd = fd
+        self.status_code = status_code
+        self.headers = headers
+        self.etag = etag
+        self.outcome = outcome
+        self.executor = executor
+        self.download = download
+        self._closed = False
+
+    async def _read(self, offset: int) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, os.pread, self.fd, _READ_CHUNK_BYTES, offset)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        download = self.download
+        offset = 0
+        try:
+            while not self._closed:
+                if download is not None:
+                    await download.wait_for(offset)
+                chunk = await self._read(offset) if download is None or offset < download.written else b""
+                if chunk:
+                    offset += len(chunk)
+                    yield chunk
+                    continue
+                if download is None:
+                    return
+                if download.done and offset >= download.written:
+                    if download.error is not None:
+                        raise RuntimeError(f"upstream bundle download failed: {download.error}")
+                    return
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self.download is not None:
+            self.download.release()
+        else:
+            os.close(self.fd)
+
+    async def wait_stored(self) -> bool:
+        """Wait for the download behind this body to finish; True when it was cached."""
+        download = self.download
+        if download is None:
+            return True
+        while not download.done:
+            await download.wait_for(download.written)
+        return download.entry is not None
+
+
+class ReplayBundleCache:
+    """Size-bounded, content-addressed disk cache for session replay bundles.
+
+    Entries are keyed on the upstream path plus normalized query, stored as a
+    body file and a small JSON sidecar, and evicted least-recently-used once the
+    directory grows past ``max_bytes``. A miss streams the upstream body into a
+    temp file while every waiting client reads it back from that file, and the
+    file is renamed into place once complete, so bundles are never held in
+    memory. Bundles for sessions that have left the Theater live view are
+    served until evicted or ``max_age_seconds`` old. While a session is still
+    live its bundle stays valid as long as the session's event count matches
+    the one seen when it was stored, and for ``live_ttl_seconds`` otherwise.
+    Filesystem work runs on ``executor``, and hits are served from a
+    descriptor opened before the response starts, so eviction never cuts a
+    response short.
+    """
+
+    def __init__(
+        self,
+        *,
+        root: Path,
+        max_bytes: int = 512 * 1024 * 1024,
+        live_ttl_seconds: float = 30.0,
+        max_age_seconds: float = 24 * 3600.0,
+        executor: Executor | None = None,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max(1, max_bytes)
+        self.live_ttl_seconds = live_ttl_seconds
+        self.max_age_seconds = max_age_seconds
+        self.executor = executor
+        self._index: OrderedDict[str, CachedBundle] | None = None
+        self._index_task: asyncio.Task[OrderedDict[str, CachedBundle]] | None = None
+        self._bytes = 0
+        self._inflight: dict[str, _BundleDownload] = {}
+        self._live_sessions: dict[str, str | None] | None = None
+        self._live_seen_at = 0.0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expired": 0,
+            "prefetched": 0,
+            "prefetch_passes": 0,
+            "prefetch_failures": 0,
+        }
+        self._last_prefetch_error: str | None = None
+
+    @staticmethod
+    def cache_key(path: str, query_string: str) -> str:
+        normalized = f"{path.strip('/')}?{normalize_query(query_string)}"
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _body_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.body"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.meta.json"
+
+    async def _run_blocking(self, func: Callable[..., Any], /, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    def _scan_index(self) -> OrderedDict[str, CachedBundle]:
+        entries: list[tuple[float, CachedBundle]] = []
+        if self.root.is_dir():
+            # Partial downloads left behind by a previous process.
+            _unlink_quietly(*self.root.glob("*/*.part"))
+            for meta_path in self.root.glob("*/*.meta.json"):
+                key = meta_path.name.removesuffix(".meta.json")
+                body_path = self._body_path(key)
+                try:
+                    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                    stat = body_path.stat()
+                except (OSError, ValueError):
+                    continue
+                entries.append(
+                    (
+                        stat.st_mtime,
+                        CachedBundle(
+                            key=key,
+                            path=body_path,
+                            session_id=str(meta.get("session_id") or ""),
+                            marker=meta.get("marker"),
+                            size=stat.st_size,
+                            stored_at=float(meta.get("stored_at") or 0.0),
+                            content_type=str(meta.get("content_type") or "application/json"),
+                            etag=str(meta.get("etag") or ""),
+                        ),
+                    )
+                )
+        entries.sort(key=lambda item: item[0])
+        return OrderedDict((entry.key, entry) for _mtime, entry in entries)
+
+    async def _load_index(self) -> OrderedDict[str, CachedBundle]:
+        if self._index is not None:
+            return self._index
+        # Concurrent first callers share one directory scan.
+        task = self._index_task
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._run_blocking(self._scan_index))
+            self._index_task = task
+        index = await asyncio.shield(task)
+        if self._index is None:
+            self._index = index
+            self._bytes = sum(entry.size for entry in index.values())
+        return self._index
+
+    def note_live_sessions(self, sessions: dict[str, str | None]) -> None:
+        self._live_sessions = dict(sessions)
+        self._live_seen_at = time.monotonic()
+
+    def live_sessions(self, *, max_age_seconds: float) -> list[str]:
+        if self._live_sessions is None or time.monotonic() - self._live_seen_at > max_age_seconds:
+            return []
+        return sorted(self._live_sessions)
+
+    def _is_fresh(self, entry: CachedBundle) -> bool:
+        age = time.time() - entry.stored_at
+        # Missing from the (top-N) live list does not prove a session has
+        # ended, so even "finished" bundles are re-fetched eventually.
+        if self.max_age_seconds > 0 and age > self.max_age_seconds:
+            self._counters["expired"] += 1
+            return False
+        # Until a live snapshot has been seen, every session may still be changing.
+        if self._live_sessions is not None:
+            if entry.session_id not in self._live_sessions:
+                return True
+            marker = self._live_sessions[entry.session_id]
+            if marker is not None and marker == entry.marker:
+                return True
+        return age <= self.live_ttl_seconds
+
+    async def lookup(self, key: str) -> CachedBundle | None:
+        index = await self._load_index()
+        entry = index.get(key)
+        if entry is None or not self._is_fresh(entry):
+            return None
+        index.move_to_end(key)
+        return entry
+
+    async def _open_hit(self, key: str) -> tuple[CachedBundle, int] | None:
+        entry = await self.lookup(key)
+        if entry is None:
+            return None
+        fd = await self._run_blocking(_open_if_current, entry.path)
+        if fd is None:
+            await self._forget(key)
+            return None
+        return entry, fd
+
+    def _drop(self, key: str) -> list[Path]:
+        assert self._index is not None
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return []
+        self._bytes -= entry.size
+        return [entry.path, self._meta_path(key)]
+
+    async def _forget(self, key: str) -> None:
+        await self._load_index()
+        doomed = self._drop(key)
+        if doomed:
+            await self._run_blocking(_unlink_quietly, *doomed)
+
+    def _commit_sync(self, download: _BundleDownload, entry: CachedBundle) -> None:
+        meta = {
+            "session_id": entry.session_id,
+            "marker": entry.marker,
+            "stored_at": entry.stored_at,
+            "content_type": entry.content_type,
+            "etag": entry.etag,
+        }
+        os.replace(download.temp_path, entry.path)
+        _write_atomic(self._meta_path(entry.key), json.dumps(meta).encode("utf-8"))
+
+    async def _register(self, entry: CachedBundle) -> None:
+        index = await self._load_index()
+        self._drop(entry.key)
+        index[entry.key] = entry
+        self._bytes += entry.size
+        doomed: list[Path] = []
+        while index and self._bytes > self.max_bytes:
+            doomed.extend(self._drop(next(iter(index))))
+            self._counters["evictions"] += 1
+        if doomed:
+            # Readers keep their own descriptors, so unlinking never truncates a response.
+            await self._run_blocking(_unlink_quietly, *doomed)
+
+    async def _download(
+        self,
+        download: _BundleDownload,
+        *,
+        key: str,
+        path: str,
+        query_string: str,
+        session_id: str,
+        fetch: BundleOpen,
+    ) -> None:
+        # Take the marker before fetching so a session that moves on mid-fetch is
+        # re-fetched rather than pinned to an older bundle.
+        marker = self._live_sessions.get(session_id) if self._live_sessions else None
+        error: BaseException | None = None
+        stored = False
+        try:
+            upstream = await fetch(path, normalize_query(query_string))
+            headers = upstream.headers
+            try:
+                download.fd = await self._run_blocking(_open_temp, download.temp_path)
+                download.status_code, download.headers = upstream.status_code, headers
+                download.ready.set()
+                storable = _is_storable(upstream.status_code, headers)
+                digest = hashlib.blake2b(digest_size=16)
+                async for chunk in upstream.aiter_bytes():
+                    await self._run_blocking(_pwrite_all, download.fd, chunk, download.written)
+                    digest.update(chunk)
+                    download.advance(len(chunk))
+                    if download.written > self.max_bytes:
+                        storable = False
+            finally:
+                await upstream.aclose()
+            if storable:
+                entry = CachedBundle(
+                    key=key,
+                    path=self._body_path(key),
+                    session_id=session_id,
+                    marker=marker,
+                    size=download.written,
+                    stored_at=time.time(),
+                    content_type=headers.get("content-type", "application/json"),
+                    etag=headers.get("etag") or f'W/"{digest.hexdigest()}"',
+                )
+                await self._run_blocking(self._commit_sync, download, entry)
+                stored = True
+                download.entry = entry
+                await self._register(entry)
+        except Exception as exc:
+            error = exc
+        finally:
+            if not stored:
+                await self._run_blocking(_unlink_quietly, download.temp_path)
+            if self._inflight.get(key) is download:
+                del self._inflight[key]
+            download.finish(error)
+            download.release()
+
+    async def open(
+        self,
+        *,
+        path: str,
+        query_string: str,
+        session_id: str,
+        fetch: BundleOpen,
+    ) -> BundleBody:
+        """Return the bundle body, from the cache or streamed from upstream.
+
+        The caller must iterate the body or ``aclose()`` it. ``outcome`` is
+        ``hit``, ``miss`` (this call started the download) or ``coalesced``.
+        """
+        key = self.cache_key(path, query_string)
+        hit = await self._open_hit(key)
+        if hit is not None:
+            entry, fd = hit
+            self._counters["hits"] += 1
+            return BundleBody(
+                fd=fd,
+                status_code=200,
+                headers={"content-type": entry.content_type, "content-length": str(entry.size), "etag": entry.etag},
+                etag=entry.etag,
+                outcome="hit",
+                executor=self.executor,
+            )
+
+        download = self._inflight.get(key)
+        if download is not None:
+            self._counters["coalesced"] += 1
+            outcome = "coalesced"
+        else:
+            self._counters["misses"] += 1
+            outcome = "miss"
+            download = _BundleDownload(self._body_path(key).with_suffix(f".{os.getpid()}.{id(self):x}.part"))
+            self._inflight[key] = download
+            task = asyncio.ensure_future(
+                self._download(
+                    download,
+                    key=key,
+                    path=path,
+                    query_string=query_string,
+                    session_id=session_id,
+                    fetch=fetch,
+                )
+            )
+            task.add_done_callback(_consume_task_result)
+        # Hold a reference from the moment of joining so the descriptor
+        # outlives a download that finishes before this caller resumes.
+        download.refs += 1
+        try:
+            await download.ready.wait()
+        except BaseException:
+            download.release()
+            raise
+        if download.fd is None:
+            download.release()
+            raise RuntimeError(str(download.error or "upstream bundle download failed"))
+        return BundleBody(
+            fd=download.fd,
+            status_code=download.status_code,
+            headers=dict(download.headers),
+            etag=download.entry.etag if download.entry is not None else download.headers.get("etag", ""),
+            outcome=outcome,
+            executor=self.executor,
+            download=download,
+        )
+
+    def note_prefetch_pass(self, error: BaseException | None = None) -> None:
+        """Record the outcome of one background prefetch pass.
+
+        A failure is logged when it differs from the previous one, so an
+        upstream that stays down does not log on every pass.
+        """
+        if error is None:
+            self._counters["prefetch_passes"] += 1
+            if self._last_prefetch_error is not None:
+                logger.info("replay bundle prefetch recovered")
+            self._last_prefetch_error = None
+            return
+        self._counters["prefetch_failures"] += 1
+        message = f"{type(error).__name__}: {error}"
+        if message != self._last_prefetch_error:
+            logger.warning("replay bundle prefetch failed: %s", message, exc_info=error)
+        self._last_prefetch_error = message
+
+    async def prefetch(
+        self,
+        *,
+        targets: list[str],
+        fetch: BundleOpen,
+        max_age_seconds: float,
+        concurrency: int = 4,
+    ) -> int:
+        """Warm bundles for every session currently shown on the Theater page.
+
+        ``targets`` are ``path?query`` templates containing ``{session_id}``.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        warmed = 0
+
+        async def warm(session_id: str, template: str) -> None:
+            nonlocal warmed
+            target = template.replace("{session_id}", session_id)
+            path, _, query_string = target.partition("?")
+            if await self.lookup(self.cache_key(path, query_string)) is not None:
+                return
+            async with semaphore:
+                try:
+                    body = await self.open(path=path, query_string=query_string, session_id=session_id, fetch=fetch)
+                except Exception:
+                    return
+                try:
+                    if body.outcome != "hit" and await body.wait_stored():
+                        warmed += 1
+                finally:
+                    await body.aclose()
+
+        sessions = self.live_sessions(max_age_seconds=max_age_seconds)
+        await asyncio.gather(*(warm(session_id, template) for session_id in sessions for template in targets))
+        self._counters["prefetched"] += warmed
+        return warmed
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "entries": len(self._index) if self._index is not None else None,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age_seconds,
+            "inflight": len(self._inflight),
+            "live_sessions": len(self._live_sessions or ()),
+            "last_prefetch_error": self._last_prefetch_error,
+        }
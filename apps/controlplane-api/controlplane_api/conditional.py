@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+# Fields the control plane itself adds that change on every build without the
+# underlying state changing, as key paths ("*" matches any key). They are left
+# out of the validator so a quiet system keeps answering 304. Only these exact
+# paths are dropped: same-named keys inside upstream or project data still count.
+VOLATILE_PAYLOAD_PATHS: tuple[tuple[str, ...], ...] = (
+    ("generated_at",),
+    ("elapsed_ms",),
+    ("status_age_seconds",),
+    ("smoke", "elapsed_ms"),
+    ("sources", "*", "age_seconds"),
+    ("sources", "*", "elapsed_ms"),
+    ("sources", "*", "joined_inflight"),
+    ("sentry", "status_age_seconds"),
+    ("orchestration", "generated_at"),
+    ("orchestration", "smoke", "elapsed_ms"),
+)
+
+
+def _strip_volatile(value: Any, paths: tuple[tuple[str, ...], ...] = VOLATILE_PAYLOAD_PATHS) -> Any:
+    if not paths or not isinstance(value, dict):
+        return value
+    dropped = {path[0] for path in paths if len(path) == 1}
+    nested: dict[str, list[tuple[str, ...]]] = {}
+    for path in paths:
+        if len(path) > 1:
+            nested.setdefault(path[0], []).append(path[1:])
+    any_key = nested.get("*", [])
+    stripped: dict[str, Any] = {}
+    for key, item in value.items():
+        if key in dropped:
+            continue
+        rest = nested.get(key, []) + any_key
+        stripped[key] = _strip_volatile(item, tuple(rest)) if rest else item
+    return stripped
+
+
+def content_etag(content: bytes) -> str:
+    return f'W/"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def payload_etag(payload: Any) -> str:
+    canonical = json.dumps(
+        _strip_volatile(payload),
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    ).encode("utf-8")
+    return content_etag(canonical)
+
+
+def _opaque_tag(value: str) -> str:
+    tag = value.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    return tag
+
+
+def etag_matches(if_none_match: str | None, etag: str | None) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    expected = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == expected for candidate in if_none_match.split(","))
+
+
+def not_modified_response(etag: str, *, headers: dict[str, str] | None = None) -> Response:
+    response_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if headers:
+        response_headers.update(headers)
+    return Response(status_code=304, headers=response_headers)
+
+
+def conditional_json_response(request: Request, payload: Any) -> Response:
+    etag = payload_etag(payload)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified_response(etag)
+    return JSONResponse(content=payload, headers={"ETag": etag, "Cache-Control": "no-cache"})
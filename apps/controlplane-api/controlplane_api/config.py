@@ -15,7 +15,43 @@ def _parse_int_env(name: str, default: int) -> int:
         return default
 
 
-def _parse_origins(raw: str) -> list[str]:
+def _parse_float_env(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def _parse_bool_env(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    normalized = raw.strip().lower()
+    if normalized in {"1", "true", "yes", "on"}:
+        return True
+    if normalized in {"0", "false", "no", "off"}:
+        return False
+    return default
+
+
+def _parse_ttl_rules(raw: str) -> dict[str, float]:
+    rules: dict[str, float] = {}
+    for item in raw.split(","):
+        prefix, separator, ttl_raw = item.partition("=")
+        prefix = prefix.strip().strip("/")
+        if not separator or not prefix:
+            continue
+        try:
+            rules[prefix] = float(ttl_raw)
+        except ValueError:
+            continue
+    return rules
+
+
+def _parse_csv(raw: str) -> list[str]:
     items = [item.strip() for item in raw.split(",")]
     return [item for item in items if item]
 
@@ -27,17 +63,76 @@ class ControlPlaneSettings:
     projects_config_path: Path
     clownpeanuts_api_base: str
     clownpeanuts_api_token: str
+    clownpeanuts_timeout_seconds: float
+    clownpeanuts_connect_timeout_seconds: float
+    clownpeanuts_max_connections: int
+    clownpeanuts_max_keepalive_connections: int
+    clownpeanuts_keepalive_expiry_seconds: float
+    clownpeanuts_http2: bool
+    deception_proxy_streaming: bool
+    deception_cache_ttls: dict[str, float]
+    deception_cache_max_entries: int
+    deception_cache_max_bytes: int
+    deception_batch_max_items: int
+    deception_batch_max_concurrency: int
+    deception_batch_timeout_seconds: float
+    theater_delta_max_versions: int
+    theater_delta_min_refresh_seconds: float
+    bundle_cache_enabled: bool
+    bundle_cache_dir: Path
+    bundle_cache_max_bytes: int
+    bundle_cache_live_ttl_seconds: float
+    bundle_cache_max_age_seconds: float
+    bundle_prefetch_interval_seconds: float
+    bundle_prefetch_targets: list[str]
     clownpeanuts_ws_events_url: str
     clownpeanuts_ws_theater_url: str
     clownpeanuts_ws_token: str
+    ws_client_queue_size: int
+    ws_events_overflow_policy: str
+    ws_theater_overflow_policy: str
+    ws_backlog_max_messages: int
+    ws_backlog_max_bytes: int
+    ws_upstream_linger_seconds: float
     pingting_repo_path: Path
     pingting_status_path: Path
     pingting_config_path: Path
     pingting_python_bin: str | None
     pingting_status_max_age_seconds: int
     pingting_command_timeout_seconds: int
+    pingting_db_pool_size: int
+    pingting_db_idle_timeout_seconds: float
+    pingting_db_watch_interval_seconds: float
+    pingting_replica_enabled: bool
+    pingting_replica_path: Path
+    pingting_replica_sync_interval_seconds: float
+    sse_keepalive_seconds: float
+    blocking_io_workers: int
+    loop_lag_threshold_ms: float
+    overview_source_timeouts: dict[str, float]
+    overview_deadline_seconds: float
+    overview_refresh_intervals: dict[str, float]
+    overview_snapshot_path: Path
+    sentry_rollup_db_path: Path
     orchestration_state_path: Path
+    action_history_db_path: Path
+    action_history_retain_per_action: int
+    action_history_retain_days: int
     orchestration_action_timeout_seconds: int
+    orchestration_action_max_concurrent: int
+    sync_engine: str
+    sync_max_workers: int
+    sync_clone_filter: str
+    sync_depth: int
+    sync_clone_protocol: str
+    sync_allowed_base_roots: list[str]
+    sync_allowed_orgs: list[str]
+    sync_clone_timeout_seconds: float
+    sync_fetch_timeout_seconds: float
+    sync_merge_timeout_seconds: float
+    sync_access_token: str
+    smoke_engine: str
+    smoke_cache_path: Path
     bootstrap_script_path: Path
     smoke_script_path: Path
     update_script_path: Path
@@ -49,6 +144,12 @@ def load_settings() -> ControlPlaneSettings:
     repo_root = Path(__file__).resolve().parents[3]
     workspace_root = Path(os.getenv("CONTROLPLANE_WORKSPACE_ROOT", "/Users/matt/code")).expanduser()
     pingting_repo = Path(os.getenv("PINGTING_REPO_PATH", str(workspace_root / "pingting"))).expanduser()
+    # The bash scripts stay the default until the native engines have test coverage.
+    sync_engine = os.getenv("CONTROLPANE_SYNC_ENGINE", "script").strip().lower()
+    smoke_engine = os.getenv("CONTROLPANE_SMOKE_ENGINE", "script").strip().lower()
+    in_ci = os.getenv("CI") == "true" or os.getenv("GITHUB_ACTIONS") == "true"
+    sync_clone_protocol = os.getenv("CLONE_PROTOCOL", "https" if in_ci else "ssh").strip().lower()
+    default_allowed_roots = ",".join(root for root in ("/Users/matt/code", os.getenv("RUNNER_TEMP", "")) if root)
 
     return ControlPlaneSettings(
         repo_root=repo_root,
@@ -58,6 +159,40 @@ def load_settings() -> ControlPlaneSettings:
         ).expanduser(),
         clownpeanuts_api_base=os.getenv("CLOWNPEANUTS_API_BASE", "http://127.0.0.1:8099").strip(),
         clownpeanuts_api_token=os.getenv("CLOWNPEANUTS_API_TOKEN", "").strip(),
+        clownpeanuts_timeout_seconds=_parse_float_env("CLOWNPEANUTS_TIMEOUT_SECONDS", 5.0),
+        clownpeanuts_connect_timeout_seconds=_parse_float_env("CLOWNPEANUTS_CONNECT_TIMEOUT_SECONDS", 2.0),
+        clownpeanuts_max_connections=_parse_int_env("CLOWNPEANUTS_MAX_CONNECTIONS", 100),
+        clownpeanuts_max_keepalive_connections=_parse_int_env("CLOWNPEANUTS_MAX_KEEPALIVE_CONNECTIONS", 20),
+        clownpeanuts_keepalive_expiry_seconds=_parse_float_env("CLOWNPEANUTS_KEEPALIVE_EXPIRY_SECONDS", 30.0),
+        clownpeanuts_http2=_parse_bool_env("CLOWNPEANUTS_HTTP2", False),
+        deception_proxy_streaming=_parse_bool_env("CONTROLPANE_DECEPTION_PROXY_STREAMING", True),
+        deception_cache_ttls=_parse_ttl_rules(
+            os.getenv(
+                "CONTROLPANE_DECEPTION_CACHE_TTLS",
+                "dashboard/summary=5,theater/live=2,theater/actions=5",
+            )
+        ),
+        deception_cache_max_entries=_parse_int_env("CONTROLPANE_DECEPTION_CACHE_MAX_ENTRIES", 256),
+        deception_cache_max_bytes=_parse_int_env("CONTROLPANE_DECEPTION_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+        deception_batch_max_items=_parse_int_env("CONTROLPANE_DECEPTION_BATCH_MAX_ITEMS", 16),
+        deception_batch_max_concurrency=_parse_int_env("CONTROLPANE_DECEPTION_BATCH_MAX_CONCURRENCY", 6),
+        deception_batch_timeout_seconds=_parse_float_env("CONTROLPANE_DECEPTION_BATCH_TIMEOUT_SECONDS", 10.0),
+        theater_delta_max_versions=_parse_int_env("CONTROLPANE_THEATER_DELTA_MAX_VERSIONS", 8),
+        theater_delta_min_refresh_seconds=_parse_float_env("CONTROLPANE_THEATER_DELTA_MIN_REFRESH_SECONDS", 1.0),
+        bundle_cache_enabled=_parse_bool_env("CONTROLPANE_BUNDLE_CACHE_ENABLED", True),
+        bundle_cache_dir=Path(
+            os.getenv("CONTROLPANE_BUNDLE_CACHE_DIR", str(repo_root / "data" / "controlplane" / "bundles"))
+        ).expanduser(),
+        bundle_cache_max_bytes=_parse_int_env("CONTROLPANE_BUNDLE_CACHE_MAX_BYTES", 512 * 1024 * 1024),
+        bundle_cache_live_ttl_seconds=_parse_float_env("CONTROLPANE_BUNDLE_CACHE_LIVE_TTL_SECONDS", 15.0),
+        bundle_cache_max_age_seconds=_parse_float_env("CONTROLPANE_BUNDLE_CACHE_MAX_AGE_SECONDS", 86400.0),
+        bundle_prefetch_interval_seconds=_parse_float_env("CONTROLPANE_BUNDLE_PREFETCH_INTERVAL_SECONDS", 20.0),
+        bundle_prefetch_targets=_parse_csv(
+            os.getenv(
+                "CONTROLPANE_BUNDLE_PREFETCH_TARGETS",
+                "theater/sessions/{session_id}/bundle?events_limit=500,sessions/{session_id}/replay?events_limit=120",
+            )
+        ),
         clownpeanuts_ws_events_url=os.getenv(
             "CLOWNPEANUTS_WS_EVENTS_URL",
             "ws://127.0.0.1:8099/ws/events",
@@ -70,6 +205,12 @@ def load_settings() -> ControlPlaneSettings:
             os.getenv("CLOWNPEANUTS_WS_TOKEN", "").strip()
             or os.getenv("CLOWNPEANUTS_API_TOKEN", "").strip()
         ),
+        ws_client_queue_size=_parse_int_env("CONTROLPANE_WS_CLIENT_QUEUE_SIZE", 256),
+        ws_events_overflow_policy=os.getenv("CONTROLPANE_WS_EVENTS_OVERFLOW_POLICY", "drop_oldest").strip().lower(),
+        ws_theater_overflow_policy=os.getenv("CONTROLPANE_WS_THEATER_OVERFLOW_POLICY", "coalesce_latest").strip().lower(),
+        ws_backlog_max_messages=_parse_int_env("CONTROLPANE_WS_BACKLOG_MAX_MESSAGES", 500),
+        ws_backlog_max_bytes=_parse_int_env("CONTROLPANE_WS_BACKLOG_MAX_BYTES", 8 * 1024 * 1024),
+        ws_upstream_linger_seconds=_parse_float_env("CONTROLPANE_WS_UPSTREAM_LINGER_SECONDS", 5.0),
         pingting_repo_path=pingting_repo,
         pingting_status_path=Path(
             os.getenv("PINGTING_STATUS_PATH", str(pingting_repo / "data" / "status.json"))
@@ -80,13 +221,77 @@ def load_settings() -> ControlPlaneSettings:
         pingting_python_bin=(os.getenv("PINGTING_PYTHON_BIN") or "").strip() or None,
         pingting_status_max_age_seconds=_parse_int_env("PINGTING_STATUS_MAX_AGE_SECONDS", 120),
         pingting_command_timeout_seconds=_parse_int_env("PINGTING_STATUS_TIMEOUT_SECONDS", 20),
+        pingting_db_pool_size=_parse_int_env("PINGTING_DB_POOL_SIZE", 4),
+        pingting_db_idle_timeout_seconds=_parse_float_env("PINGTING_DB_IDLE_TIMEOUT_SECONDS", 300.0),
+        pingting_db_watch_interval_seconds=_parse_float_env("PINGTING_DB_WATCH_INTERVAL_SECONDS", 0.25),
+        pingting_replica_enabled=_parse_bool_env("PINGTING_REPLICA_ENABLED", True),
+        pingting_replica_path=Path(
+            os.getenv(
+                "PINGTING_REPLICA_PATH",
+                str(repo_root / "data" / "controlplane" / "pingting-replica.db"),
+            )
+        ).expanduser(),
+        pingting_replica_sync_interval_seconds=_parse_float_env("PINGTING_REPLICA_SYNC_INTERVAL_SECONDS", 30.0),
+        sse_keepalive_seconds=_parse_float_env("CONTROLPANE_SSE_KEEPALIVE_SECONDS", 15.0),
+        blocking_io_workers=max(1, _parse_int_env("CONTROLPANE_BLOCKING_IO_WORKERS", 8)),
+        loop_lag_threshold_ms=_parse_float_env("CONTROLPANE_LOOP_LAG_THRESHOLD_MS", 100.0),
+        overview_source_timeouts=_parse_ttl_rules(
+            os.getenv(
+                "CONTROLPANE_OVERVIEW_SOURCE_TIMEOUTS",
+                "deception=2.5,sentry=2,sentry_findings=2,orchestration=3",
+            )
+        ),
+        overview_deadline_seconds=_parse_float_env("CONTROLPANE_OVERVIEW_DEADLINE_SECONDS", 4.0),
+        overview_refresh_intervals=_parse_ttl_rules(
+            os.getenv(
+                "CONTROLPANE_OVERVIEW_REFRESH_INTERVALS",
+                "deception=5,sentry=10,sentry_findings=5,orchestration=30",
+            )
+        ),
+        overview_snapshot_path=Path(
+            os.getenv(
+                "CONTROLPANE_OVERVIEW_SNAPSHOT_PATH",
+                str(repo_root / "data" / "controlplane" / "overview-snapshot.json"),
+            )
+        ).expanduser(),
+        sentry_rollup_db_path=Path(
+            os.getenv(
+                "CONTROLPANE_SENTRY_ROLLUP_DB_PATH",
+                str(repo_root / "data" / "controlplane" / "sentry-rollups.db"),
+            )
+        ).expanduser(),
         orchestration_state_path=Path(
             os.getenv(
                 "CONTROLPANE_ACTION_STATE_PATH",
                 str(repo_root / "data" / "controlplane" / "actions-state.json"),
             )
         ).expanduser(),
+        action_history_db_path=Path(
+            os.getenv(
+                "CONTROLPANE_ACTION_HISTORY_DB_PATH",
+                str(repo_root / "data" / "controlplane" / "action-history.db"),
+            )
+        ).expanduser(),
+        action_history_retain_per_action=max(1, _parse_int_env("CONTROLPANE_ACTION_HISTORY_RETAIN_PER_ACTION", 200)),
+        action_history_retain_days=max(0, _parse_int_env("CONTROLPANE_ACTION_HISTORY_RETAIN_DAYS", 90)),
         orchestration_action_timeout_seconds=_parse_int_env("CONTROLPANE_ACTION_TIMEOUT_SECONDS", 900),
+        orchestration_action_max_concurrent=max(1, _parse_int_env("CONTROLPANE_ACTION_MAX_CONCURRENT", 2)),
+        sync_engine=sync_engine if sync_engine in {"native", "script"} else "script",
+        sync_max_workers=max(1, _parse_int_env("CONTROLPANE_SYNC_MAX_WORKERS", 4)),
+        sync_clone_filter=os.getenv("CONTROLPANE_SYNC_CLONE_FILTER", "").strip(),
+        sync_depth=max(0, _parse_int_env("CONTROLPANE_SYNC_DEPTH", 0)),
+        # The knobs below share their names with scripts/lib/common.sh.
+        sync_clone_protocol=sync_clone_protocol if sync_clone_protocol in {"ssh", "https"} else "ssh",
+        sync_allowed_base_roots=_parse_csv(os.getenv("ALLOWED_BASE_ROOTS", default_allowed_roots)),
+        sync_allowed_orgs=_parse_csv(os.getenv("ALLOWED_GITHUB_ORGS", "rocketweb")),
+        sync_clone_timeout_seconds=_parse_float_env("GIT_CLONE_TIMEOUT_SEC", 300.0),
+        sync_fetch_timeout_seconds=_parse_float_env("GIT_FETCH_TIMEOUT_SEC", 120.0),
+        sync_merge_timeout_seconds=_parse_float_env("GIT_PULL_TIMEOUT_SEC", 120.0),
+        sync_access_token=(os.getenv("GH_ACCESS_TOKEN") or os.getenv("GITHUB_TOKEN") or "").strip(),
+        smoke_engine=smoke_engine if smoke_engine in {"native", "script"} else "script",
+        smoke_cache_path=Path(
+            os.getenv("CONTROLPANE_SMOKE_CACHE_PATH", str(repo_root / "data" / "controlplane" / "smoke-cache.json"))
+        ).expanduser(),
         bootstrap_script_path=Path(
             os.getenv("CONTROLPANE_BOOTSTRAP_SCRIPT_PATH", str(repo_root / "scripts" / "bootstrap_repos.sh"))
         ).expanduser(),
@@ -96,7 +301,7 @@ def load_settings() -> ControlPlaneSettings:
         update_script_path=Path(
             os.getenv("CONTROLPANE_UPDATE_SCRIPT_PATH", str(repo_root / "scripts" / "update_repos.sh"))
         ).expanduser(),
-        cors_allow_origins=_parse_origins(
+        cors_allow_origins=_parse_csv(
             os.getenv(
                 "CONTROLPANE_CORS_ALLOW_ORIGINS",
                 "http://127.0.0.1:4317,http://localhost:4317,http://127.0.0.1:3001,http://localhost:3001,http://127.0.0.1:3000,http://localhost:3000",
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Any
+
+FileSignature = tuple[tuple[int, int, int, int] | None, ...]
+
+
+def _signature(paths: tuple[Path, ...]) -> FileSignature:
+    signature: list[tuple[int, int, int, int] | None] = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            signature.append(None)
+            continue
+        signature.append((stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class FileChangeWatcher:
+    """Wakes waiters when any of a set of files changes on disk.
+
+    Used for PingTing's SQLite database and its ``-wal`` file: commits in WAL
+    mode touch the ``-wal`` file, checkpoints and rotations touch the main file.
+    Only ``stat`` is polled, never the database itself, and the poll loop runs
+    only while someone is waiting. With the replica enabled its syncer is
+    always waiting, so the files are stat-ed every poll interval; the database
+    is only read when they change or a reconcile sweep is due.
+    """
+
+    def __init__(self, paths: list[Path], *, poll_interval_seconds: float = 0.25) -> None:
+        self.paths = tuple(paths)
+        self.poll_interval_seconds = max(0.01, poll_interval_seconds)
+        self._signature = _signature(self.paths)
+        self._waiters = 0
+        self._changed: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._counters = {"polls": 0, "changes": 0}
+
+    def snapshot(self) -> FileSignature:
+        """Current state of the watched files, to pass to ``wait_for_change``."""
+        return _signature(self.paths)
+
+    def _ensure_running(self, baseline: FileSignature) -> asyncio.Event:
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._signature = baseline
+            self._changed = asyncio.Event()
+            self._task = loop.create_task(self._poll(), name="file-change-watcher")
+        assert self._changed is not None
+        return self._changed
+
+    async def _poll(self) -> None:
+        while self._waiters > 0:
+            await asyncio.sleep(self.poll_interval_seconds)
+            self._counters["polls"] += 1
+            signature = _signature(self.paths)
+            if signature != self._signature:
+                self._signature = signature
+                self._counters["changes"] += 1
+                changed, self._changed = self._changed, asyncio.Event()
+                if changed is not None:
+                    changed.set()
+
+    async def wait_for_change(self, *, since: FileSignature, timeout_seconds: float) -> bool:
+        """Return True once the files differ from the ``since`` snapshot, False on timeout.
+
+        Take the snapshot before reading the database so a commit landing
+        between the read and this call still wakes the caller immediately.
+        """
+        if _signature(self.paths) != since:
+            return True
+        self._waiters += 1
+        try:
+            changed = self._ensure_running(since)
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=timeout_seconds)
+            except asyncio.TimeoutError:
+                return _signature(self.paths) != since
+            return True
+        finally:
+            self._waiters -= 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "waiters": self._waiters,
+            "polling": self._task is not None and not self._task.done(),
+            "poll_interval_seconds": self.poll_interval_seconds,
+        }
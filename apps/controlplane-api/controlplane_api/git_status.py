@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import os
+from pathlib import Path
+import subprocess
+import threading
+import time
+from typing import Any
+import zlib
+
+StatSignature = tuple[int, int, int, int] | None
+
+# Worker threads used when several repos need git subprocesses in the same pass.
+_GIT_WORKERS = 8
+
+
+def _stat_signature(path: Path) -> StatSignature:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _git_output(path: Path, *args: str) -> str:
+    completed = subprocess.run(
+        ["git", "-C", str(path), *args],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError((completed.stderr or completed.stdout or "git command failed").strip())
+    return (completed.stdout or "").strip()
+
+
+@dataclass(frozen=True)
+class _GitDirs:
+    git_dir: Path
+    # Shared refs/objects directory; differs from git_dir for linked worktrees.
+    common_dir: Path
+
+
+@dataclass(frozen=True)
+class _RefState:
+    signature: tuple[StatSignature, ...]
+    # Ref HEAD points at, or None when HEAD is detached.
+    ref_name: str | None
+    branch: str
+    commit: str
+
+
+@dataclass(frozen=True)
+class _DirtyState:
+    signature: tuple[StatSignature, ...]
+    dirty: bool
+    checked_at: float
+
+
+def _resolve_git_dirs(repo: Path) -> _GitDirs:
+    dot_git = repo / ".git"
+    if dot_git.is_dir():
+        git_dir = dot_git
+    else:
+        # Worktrees and submodules use a ``gitdir: <path>`` pointer file.
+        content = dot_git.read_text(encoding="utf-8").strip()
+        if not content.startswith("gitdir:"):
+            raise ValueError(f"unrecognized .git file in {repo}")
+        git_dir = Path(content[len("gitdir:") :].strip())
+        if not git_dir.is_absolute():
+            git_dir = (repo / git_dir).resolve()
+    common_dir = git_dir
+    commondir_file = git_dir / "commondir"
+    if commondir_file.is_file():
+        common_dir = Path(commondir_file.read_text(encoding="utf-8").strip())
+        if not common_dir.is_absolute():
+            common_dir = (git_dir / common_dir).resolve()
+    return _GitDirs(git_dir=git_dir, common_dir=common_dir)
+
+
+def _parse_packed_refs(content: str) -> dict[str, str]:
+    refs: dict[str, str] = {}
+    for line in content.splitlines():
+        if not line or line[0] in "#^":
+            continue
+        sha, _separator, name = line.partition(" ")
+        if name:
+            refs[name.strip()] = sha.strip()
+    return refs
+
+
+def _parse_commit_time(raw: bytes) -> str | None:
+    header, _separator, body = raw.partition(b"\x00")
+    if not header.startswith(b"commit "):
+        return None
+    for line in body.split(b"\n"):
+        if not line:
+            break
+        if line.startswith(b"committer "):
+            # committer Name <email> 1700000000 +0200
+            try:
+                timestamp_raw, offset_raw = line.rsplit(b" ", 2)[1:]
+                sign = -1 if offset_raw.startswith(b"-") else 1
+                hours, minutes = int(offset_raw[1:3]), int(offset_raw[3:5])
+                tz = timezone(sign * timedelta(hours=hours, minutes=minutes))
+                return datetime.fromtimestamp(int(timestamp_raw), tz).isoformat()
+            except (ValueError, IndexError):
+                return None
+    return None
+
+
+class RepoStatusReader:
+    """Repo branch/commit/dirty status without a git subprocess on the hot path.
+
+    Branch and commit come from ``HEAD``, loose refs and ``packed-refs`` read
+    directly and are re-resolved only when one of those files changes. Commit
+    timestamps are read from loose objects (or ``git show`` for packed ones)
+    and cached by sha, since they never change. ``git status`` is re-run only
+    when HEAD, the refs or the index change, or after ``dirty_ttl_seconds`` to
+    catch in-place edits of tracked files that leave the index untouched.
+    Repos with an unusual layout fall back to plain git commands.
+    """
+
+    def __init__(self, *, dirty_ttl_seconds: float = 30.0) -> None:
+        self.dirty_ttl_seconds = dirty_ttl_seconds
+        self._lock = threading.Lock()
+        self._refs: dict[Path, _RefState] = {}
+        self._dirty: dict[Path, _DirtyState] = {}
+        self._packed_refs: dict[Path, tuple[StatSignature, dict[str, str]]] = {}
+        self._commit_times: dict[str, str] = {}
+        self._pool: ThreadPoolExecutor | None = None
+        self._counters = {"ref_hits": 0, "ref_reads": 0, "dirty_hits": 0, "dirty_checks": 0, "git_fallbacks": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _packed(self, common_dir: Path) -> tuple[StatSignature, dict[str, str]]:
+        path = common_dir / "packed-refs"
+        signature = _stat_signature(path)
+        with self._lock:
+            cached = self._packed_refs.get(common_dir)
+        if cached is not None and cached[0] == signature:
+            return cached
+        refs = _parse_packed_refs(path.read_text(encoding="utf-8")) if signature is not None else {}
+        entry = (signature, refs)
+        with self._lock:
+            self._packed_refs[common_dir] = entry
+        return entry
+
+    @staticmethod
+    def _ref_signature(dirs: _GitDirs, head_signature: StatSignature, ref_name: str | None) -> tuple[StatSignature, ...]:
+        return (
+            head_signature,
+            _stat_signature(dirs.common_dir / ref_name) if ref_name else None,
+            _stat_signature(dirs.common_dir / "packed-refs"),
+        )
+
+    def _resolve_refs(self, dirs: _GitDirs) -> _RefState:
+        head_signature = _stat_signature(dirs.git_dir / "HEAD")
+        with self._lock:
+            cached = self._refs.get(dirs.git_dir)
+        if cached is not None and cached.signature == self._ref_signature(dirs, head_signature, cached.ref_name):
+            self._count("ref_hits")
+            return cached
+
+        self._count("ref_reads")
+        head = (dirs.git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        if not head.startswith("ref:"):
+            state = _RefState(
+                signature=self._ref_signature(dirs, head_signature, None),
+                ref_name=None,
+                branch="HEAD",
+                commit=head,
+            )
+        else:
+            head_ref = head[len("ref:") :].strip()
+            # Stat before reading so a ref updated mid-read is re-resolved next time.
+            signature = self._ref_signature(dirs, head_signature, head_ref)
+            ref_name = head_ref
+            commit = ""
+            for _depth in range(5):
+                loose = dirs.common_dir / ref_name
+                if loose.is_file():
+                    value = loose.read_text(encoding="utf-8").strip()
+                else:
+                    value = self._packed(dirs.common_dir)[1].get(ref_name, "")
+                if not value.startswith("ref:"):
+                    commit = value
+                    break
+                ref_name = value[len("ref:") :].strip()
+            if not commit:
+                raise LookupError(f"unresolved ref {head_ref}")
+            branch = head_ref[len("refs/heads/") :] if head_ref.startswith("refs/heads/") else head_ref
+            state = _RefState(signature=signature, ref_name=head_ref, branch=branch, commit=commit)
+        with self._lock:
+            self._refs[dirs.git_dir] = state
+        return state
+
+    def _committed_at(self, repo: Path, dirs: _GitDirs, commit: str) -> str:
+        with self._lock:
+            cached = self._commit_times.get(commit)
+        if cached is not None:
+            return cached
+        committed_at: str | None = None
+        loose = dirs.common_dir / "objects" / commit[:2] / commit[2:]
+        try:
+            committed_at = _parse_commit_time(zlib.decompress(loose.read_bytes()))
+        except (OSError, zlib.error):
+            committed_at = None
+        if committed_at is None:
+            self._count("git_fallbacks")
+            committed_at = _git_output(repo, "show", "-s", "--format=%cI", commit)
+        with self._lock:
+            self._commit_times[commit] = committed_at
+        return committed_at
+
+    def _is_dirty(self, repo: Path, dirs: _GitDirs, ref_state: _RefState) -> bool:
+        signature = (*ref_state.signature, _stat_signature(dirs.git_dir / "index"))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._dirty.get(repo)
+        if cached is not None and cached.signature == signature and now - cached.checked_at < self.dirty_ttl_seconds:
+            self._count("dirty_hits")
+            return cached.dirty
+        self._count("dirty_checks")
+        # --no-optional-locks keeps status from rewriting the index (and so its mtime).
+        dirty = bool(_git_output(repo, "--no-optional-locks", "status", "--porcelain"))
+        with self._lock:
+            self._dirty[repo] = _DirtyState(signature=signature, dirty=dirty, checked_at=now)
+        return dirty
+
+    def _fallback_status(self, path: Path) -> dict[str, Any]:
+        self._count("git_fallbacks")
+        return {
+            "present": True,
+            "path": str(path),
+            "git": True,
+            "branch": _git_output(path, "rev-parse", "--abbrev-ref", "HEAD"),
+            "commit": _git_output(path, "rev-parse", "HEAD"),
+            "committed_at": _git_output(path, "show", "-s", "--format=%cI", "HEAD"),
+            "dirty": bool(_git_output(path, "status", "--porcelain")),
+        }
+
+    def head_commit(self, path: Path) -> str | None:
+        """HEAD's commit from the cached ref state, or None when it cannot be read without git."""
+        try:
+            return self._resolve_refs(_resolve_git_dirs(path)).commit
+        except (OSError, ValueError, LookupError):
+            return None
+
+    def status(self, path: Path) -> dict[str, Any]:
+        if not path.exists():
+            return {"present": False, "path": str(path), "git": False}
+        if not (path / ".git").exists():
+            return {"present": True, "path": str(path), "git": False}
+
+        try:
+            try:
+                dirs = _resolve_git_dirs(path)
+                ref_state = self._resolve_refs(dirs)
+            except (OSError, ValueError, LookupError):
+                return self._fallback_status(path)
+            return {
+                "present": True,
+                "path": str(path),
+                "git": True,
+                "branch": ref_state.branch,
+                "commit": ref_state.commit,
+                "committed_at": self._committed_at(path, dirs, ref_state.commit),
+                "dirty": self._is_dirty(path, dirs, ref_state),
+            }
+        except Exception as exc:
+            return {
+                "present": True,
+                "path": str(path),
+                "git": True,
+                "error": str(exc),
+            }
+
+    def status_many(self, paths: list[Path]) -> list[dict[str, Any]]:
+        """``status`` for each path; repos are checked in parallel when there are several."""
+        if len(paths) <= 1:
+            return [self.status(path) for path in paths]
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=_GIT_WORKERS, thread_name_prefix="repo-status")
+            pool = self._pool
+        return list(pool.map(self.status, paths))
+
+    def close(self) -> None:
+        """Shut down the status pool; the next ``status_many`` starts a fresh one."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "repos": len(self._refs), "dirty_ttl_seconds": self.dirty_ttl_seconds}
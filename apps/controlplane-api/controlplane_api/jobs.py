@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Executor
+from datetime import datetime, timezone
+import os
+from pathlib import Path
+import signal
+import threading
+import uuid
+from typing import Any, AsyncIterator, Callable, Coroutine
+
+ACTIVE_JOB_STATES = frozenset({"queued", "running"})
+
+# Bytes read from the script's output per chunk.
+_READ_CHUNK_BYTES = 4096
+# Grace period between SIGTERM and SIGKILL when stopping a job.
+_TERMINATE_GRACE_SECONDS = 5.0
+
+JobResultSink = Callable[["OrchestrationJob"], None]
+# In-process job body: called on a worker thread with a log writer and a
+# cancellation flag, returns structured details including an ``ok`` flag.
+JobTask = Callable[[Callable[[str], None], threading.Event], dict[str, Any]]
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _utf8_lead_skip(data: bytes | bytearray) -> int:
+    """Number of continuation bytes at the start of ``data`` (a split character's tail)."""
+    skip = 0
+    while skip < min(3, len(data)) and data[skip] & 0xC0 == 0x80:
+        skip += 1
+    return skip
+
+
+def _utf8_complete_len(data: bytes | bytearray) -> int:
+    """Length of ``data`` without a trailing, still incomplete UTF-8 sequence."""
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 == 0x80:
+            continue
+        if byte >= 0xF0:
+            needed = 4
+        elif byte >= 0xE0:
+            needed = 3
+        elif byte >= 0xC0:
+            needed = 2
+        else:
+            needed = 1
+        return len(data) - back if back < needed else len(data)
+    return len(data)
+
+
+class OrchestrationJob:
+    """One run of an orchestration script and its bounded, offset-addressed log."""
+
+    def __init__(self, *, action: str, command: list[str], cwd: Path, log_limit_bytes: int) -> None:
+        self.id = uuid.uuid4().hex[:16]
+        self.action = action
+        self.command = command
+        self.cwd = cwd
+        self.state = "queued"
+        self.created_at = _now_iso()
+        self.started_at: str | None = None
+        self.finished_at: str | None = None
+        self.exit_code: int | None = None
+        self.log_limit_bytes = max(1024, log_limit_bytes)
+        # Retained log text and the absolute byte offset of its first character.
+        self._log = bytearray()
+        self._log_start = 0
+        self._changed = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+        self.cancel_requested = False
+        self.details: dict[str, Any] | None = None
+
+    @property
+    def log_end(self) -> int:
+        return self._log_start + len(self._log)
+
+    @property
+    def done(self) -> bool:
+        return self.state not in ACTIVE_JOB_STATES
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def append(self, chunk: bytes) -> None:
+        self._log.extend(chunk)
+        overflow = len(self._log) - self.log_limit_bytes
+        if overflow > 0:
+            del self._log[:overflow]
+            self._log_start += overflow
+        self._notify()
+
+    def finish(self, state: str, exit_code: int | None) -> None:
+        self.state = state
+        self.exit_code = exit_code
+        self.finished_at = _now_iso()
+        self._notify()
+
+    def read_log(self, offset: int) -> tuple[int, int, str, bool]:
+        """Return ``(start_offset, end_offset, text, truncated)`` for output from ``offset`` on.
+
+        Offsets are raw byte positions. A character split by the log trim is
+        skipped and, while the job runs, an incomplete trailing character is
+        held back until the rest of it arrives.
+        """
+        truncated = offset < self._log_start
+        start = max(offset, self._log_start)
+        data = bytes(self._log[start - self._log_start :])
+        if truncated:
+            skip = _utf8_lead_skip(data)
+            start, data = start + skip, data[skip:]
+        if not self.done:
+            data = data[: _utf8_complete_len(data)]
+        return start, start + len(data), data.decode("utf-8", errors="replace"), truncated
+
+    async def wait_for_output(self, offset: int) -> None:
+        if self.log_end > offset or self.done:
+            return
+        await self._changed.wait()
+
+    def full_output(self) -> str:
+        if self._log_start == 0:
+            return bytes(self._log).decode("utf-8", errors="replace")
+        text = bytes(self._log[_utf8_lead_skip(self._log) :]).decode("utf-8", errors="replace")
+        return f"... (truncated)\n{text}"
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "action": self.action,
+            "state": self.state,
+            "ok": self.state == "succeeded",
+            "command": self.command,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "exit_code": self.exit_code,
+            "log_bytes": self.log_end,
+            "details": self.details,
+        }
+
+    def result(self) -> dict[str, Any]:
+        """The finished job in the shape recorded in the action history."""
+        return {
+            "action": self.action,
+            "job_id": self.id,
+            "ok": self.state == "succeeded",
+            "state": self.state,
+            "started_at": self.started_at or self.created_at,
+            "finished_at": self.finished_at,
+            "exit_code": self.exit_code,
+            "command": self.command,
+            "details": self.details,
+        }
+
+
+class OrchestrationJobRunner:
+    """Runs orchestration actions (scripts or in-process tasks) as background jobs.
+
+    Starting an action that already has a queued or running job returns that
+    job instead of launching a second copy. At most ``max_concurrent`` scripts
+    run at once; the rest wait in ``queued``. Output is collected incrementally into
+    each job's bounded log so clients can follow it while the script runs.
+    Finished jobs are handed to ``on_finished`` on ``executor`` and the most
+    recent ``retain_finished`` are kept for lookup.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int = 2,
+        timeout_seconds: float = 900.0,
+        log_limit_bytes: int = 1024 * 1024,
+        retain_finished: int = 50,
+        on_finished: JobResultSink | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.timeout_seconds = timeout_seconds
+        self.log_limit_bytes = log_limit_bytes
+        self.retain_finished = max(1, retain_finished)
+        self.on_finished = on_finished
+        self.executor = executor
+        self._jobs: OrderedDict[str, OrchestrationJob] = OrderedDict()
+        self._active: dict[str, OrchestrationJob] = {}
+        self._slots: asyncio.Semaphore | None = None
+        self._slots_loop: asyncio.AbstractEventLoop | None = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+            self._slots_loop = loop
+        return self._slots
+
+    def start(
+        self,
+        *,
+        action: str,
+        command: list[str],
+        cwd: Path,
+        task: JobTask | None = None,
+    ) -> tuple[OrchestrationJob, bool]:
+        """Return ``(job, attached)``; ``attached`` is True when an active job was reused.
+
+        With ``task`` the job runs that callable in-process and ``command``
+        only describes it; otherwise ``command`` is spawned as a script.
+        """
+        loop = asyncio.get_running_loop()
+        active = self._active.get(action)
+        if active is not None and not active.done and active.task is not None and active.task.get_loop() is loop:
+            return active, True
+
+        job = OrchestrationJob(action=action, command=command, cwd=cwd, log_limit_bytes=self.log_limit_bytes)
+        self._jobs[job.id] = job
+        self._active[action] = job
+        body = self._run_task(job, task) if task is not None else self._run_script(job)
+        job.task = loop.create_task(self._run(job, body), name=f"orchestration-job-{action}")
+        self._prune()
+        return job, False
+
+    def get(self, job_id: str) -> OrchestrationJob | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[OrchestrationJob]:
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> OrchestrationJob | None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if not job.done and job.task is not None:
+            job.cancel_requested = True
+            job.task.cancel()
+        return job
+
+    async def aclose(self) -> None:
+        tasks = [job.task for job in self._active.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - self.retain_finished)]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    async def _stop(process: asyncio.subprocess.Process) -> None:
+        if process.returncode is not None:
+            return
+        # Scripts run in their own session so their children (git, curl, ...) stop with them.
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(process.wait(), timeout=_TERMINATE_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await process.wait()
+
+    async def _run_script(self, job: OrchestrationJob) -> None:
+        script = Path(job.command[1]) if len(job.command) > 1 else None
+        if script is not None and not script.is_file():
+            job.append(f"missing script: {script}\n".encode("utf-8"))
+            job.finish("failed", 127)
+            return
+        process = await asyncio.create_subprocess_exec(
+            *job.command,
+            cwd=str(job.cwd),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+        async def pump() -> None:
+            assert process.stdout is not None
+            while True:
+                chunk = await process.stdout.read(_READ_CHUNK_BYTES)
+                if not chunk:
+                    return
+                job.append(chunk)
+
+        try:
+            await asyncio.wait_for(pump(), timeout=self.timeout_seconds)
+            exit_code = await process.wait()
+        except asyncio.TimeoutError:
+            await self._stop(process)
+            job.append(f"\naction timed out after {self.timeout_seconds:g}s\n".encode("utf-8"))
+            job.finish("timed_out", 124)
+            return
+        except BaseException:
+            await self._stop(process)
+            raise
+        job.finish("succeeded" if exit_code == 0 else "failed", exit_code)
+
+    @staticmethod
+    async def _partial_details(worker: asyncio.Future[dict[str, Any]]) -> dict[str, Any] | None:
+        (outcome,) = await asyncio.gather(worker, return_exceptions=True)
+        return outcome if isinstance(outcome, dict) else None
+
+    async def _run_task(self, job: OrchestrationJob, task: JobTask) -> None:
+        loop = asyncio.get_running_loop()
+        cancelled = threading.Event()
+
+        def log(text: str) -> None:
+            loop.call_soon_threadsafe(job.append, text.encode("utf-8"))
+
+        worker = asyncio.ensure_future(asyncio.to_thread(task, log, cancelled))
+        try:
+            details = await asyncio.wait_for(asyncio.shield(worker), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            cancelled.set()
+            job.details = await self._partial_details(worker)
+            job.append(f"\naction timed out after {self.timeout_seconds:g}s\n".encode("utf-8"))
+            job.finish("timed_out", 124)
+            return
+        except asyncio.CancelledError:
+            # The task stops its own subprocesses once the flag is set.
+            cancelled.set()
+            job.details = await self._partial_details(worker)
+            raise
+        # Let log lines queued by the worker thread land before the job finishes.
+        await asyncio.sleep(0)
+        job.details = details
+        ok = bool(details.get("ok"))
+        job.finish("succeeded" if ok else "failed", 0 if ok else 1)
+
+    async def _run(self, job: OrchestrationJob, body: Coroutine[Any, Any, None]) -> None:
+        try:
+            async with self._semaphore():
+                job.state = "running"
+                job.started_at = _now_iso()
+                await body
+        except asyncio.CancelledError:
+            job.append(b"\naction cancelled\n")
+            job.finish("cancelled", 130)
+            if not job.cancel_requested:
+                raise
+        except Exception as exc:
+            job.append(f"\naction failed to run: {exc}\n".encode("utf-8"))
+            job.finish("failed", 1)
+        finally:
+            # No-op once the body has run; avoids a never-awaited warning when cancelled while queued.
+            body.close()
+            if self._active.get(job.action) is job:
+                del self._active[job.action]
+            if self.on_finished is not None and job.done:
+                try:
+                    await asyncio.get_running_loop().run_in_executor(self.executor, self.on_finished, job)
+                except Exception:
+                    pass
+
+    async def follow(self, job: OrchestrationJob, offset: int) -> AsyncIterator[tuple[int, int, str, bool]]:
+        """Yield ``(start_offset, end_offset, text, truncated)`` log chunks until the job finishes."""
+        while True:
+            await job.wait_for_output(offset)
+            start, end, text, truncated = job.read_log(offset)
+            if text or truncated:
+                yield start, end, text, truncated
+                offset = end
+            elif not job.done and job.log_end > offset:
+                # Only part of a character so far; wait for more output.
+                await job.wait_for_output(job.log_end)
+            if job.done and offset >= job.log_end:
+                return
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": {action: job.id for action, job in self._active.items()},
+            "retained": len(self._jobs),
+        }
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+import itertools
+import logging
+import time
+from typing import Any, Iterator
+
+logger = logging.getLogger("controlplane_api.loop_monitor")
+
+# Upper bounds (ms) of the lag histogram buckets; the last bucket is open-ended.
+_LAG_BUCKETS_MS = (10, 50, 100, 250, 1000, 5000)
+
+
+class EventLoopLagMonitor:
+    """Measures how long the event loop is blocked and by which requests.
+
+    A background task sleeps for ``interval_seconds`` and records how late it
+    wakes up. HTTP requests register themselves while in flight, so a stall
+    above ``threshold_ms`` is logged together with the routes that were
+    running on the loop when it happened.
+    """
+
+    def __init__(self, *, interval_seconds: float = 0.1, threshold_ms: float = 100.0, recent_limit: int = 20) -> None:
+        self.interval_seconds = max(0.01, interval_seconds)
+        self.threshold_ms = threshold_ms
+        self._task: asyncio.Task[None] | None = None
+        self._inflight: dict[int, str] = {}
+        self._ids = itertools.count(1)
+        self._recent: deque[dict[str, Any]] = deque(maxlen=recent_limit)
+        self._histogram = [0] * (len(_LAG_BUCKETS_MS) + 1)
+        self._counters = {"samples": 0, "stalls": 0}
+        self._max_lag_ms = 0.0
+        self._total_lag_ms = 0.0
+
+    def ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._task = loop.create_task(self._run(), name="event-loop-lag-monitor")
+
+    async def aclose(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    @contextmanager
+    def track(self, route: str) -> Iterator[None]:
+        request_id = next(self._ids)
+        self._inflight[request_id] = route
+        try:
+            yield
+        finally:
+            self._inflight.pop(request_id, None)
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            lag_ms = max(0.0, (time.monotonic() - expected) * 1000)
+            self._record(lag_ms)
+
+    def _record(self, lag_ms: float) -> None:
+        self._counters["samples"] += 1
+        self._total_lag_ms += lag_ms
+        self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+        bucket = next((index for index, bound in enumerate(_LAG_BUCKETS_MS) if lag_ms <= bound), len(_LAG_BUCKETS_MS))
+        self._histogram[bucket] += 1
+        if lag_ms < self.threshold_ms:
+            return
+        self._counters["stalls"] += 1
+        routes = sorted(set(self._inflight.values()))
+        self._recent.append({"at": time.time(), "lag_ms": round(lag_ms, 1), "routes": routes})
+        logger.warning("event loop blocked for %.0f ms; in-flight routes: %s", lag_ms, ", ".join(routes) or "none")
+
+    def stats(self) -> dict[str, Any]:
+        samples = self._counters["samples"]
+        labels = [f"le_{bound}ms" for bound in _LAG_BUCKETS_MS] + [f"gt_{_LAG_BUCKETS_MS[-1]}ms"]
+        return {
+            **self._counters,
+            "running": self._task is not None and not self._task.done(),
+            "threshold_ms": self.threshold_ms,
+            "max_lag_ms": round(self._max_lag_ms, 1),
+            "mean_lag_ms": round(self._total_lag_ms / samples, 3) if samples else 0.0,
+            "histogram": dict(zip(labels, self._histogram)),
+            "inflight_requests": len(self._inflight),
+            "recent_stalls": list(self._recent),
+        }
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import Executor
 from datetime import datetime, timezone
+import functools
 from pathlib import Path
-import json
-import subprocess
-from typing import Any
+import sys
+import threading
+from typing import Any, Callable
 
 import yaml
 
+from .action_history import ActionHistoryStore
 from .config import ControlPlaneSettings
+from .git_status import RepoStatusReader
+from .repo_sync import RepoSyncEngine, RepoSyncError, RepoSyncOptions, load_sync_targets, validate_base_dir
+from .smoke import SmokeEngine, load_smoke_targets
 
 
 def _now_iso() -> str:
@@ -25,130 +32,104 @@ def _load_yaml(path: Path) -> dict[str, Any]:
     return payload
 
 
-def _git_output(path: Path, *args: str) -> str:
-    completed = subprocess.run(
-        ["git", "-C", str(path), *args],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-    if completed.returncode != 0:
-        raise RuntimeError((completed.stderr or completed.stdout or "git command failed").strip())
-    return (completed.stdout or "").strip()
+_repo_status_reader = RepoStatusReader()
 
 
 def repo_status(path: Path) -> dict[str, Any]:
-    if not path.exists():
-        return {"present": False, "path": str(path), "git": False}
-    if not (path / ".git").exists():
-        return {"present": True, "path": str(path), "git": False}
+    return _repo_status_reader.status(path)
+
+
+def repo_status_stats() -> dict[str, Any]:
+    return _repo_status_reader.stats()
 
-    try:
-        branch = _git_output(path, "rev-parse", "--abbrev-ref", "HEAD")
-        commit = _git_output(path, "rev-parse", "HEAD")
-        committed_at = _git_output(path, "show", "-s", "--format=%cI", "HEAD")
-        dirty = bool(_git_output(path, "status", "--porcelain"))
-        return {
-            "present": True,
-            "path": str(path),
-            "git": True,
-            "branch": branch,
-            "commit": commit,
-            "committed_at": committed_at,
-            "dirty": dirty,
-        }
-    except Exception as exc:
-        return {
-            "present": True,
-            "path": str(path),
-            "git": True,
-            "error": str(exc),
-        }
-
-
-def _load_action_state(path: Path) -> dict[str, Any]:
-    if not path.is_file():
-        return {"bootstrap": None, "smoke": None, "update": None}
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
-        return {"bootstrap": None, "smoke": None, "update": None}
-    if not isinstance(payload, dict):
-        return {"bootstrap": None, "smoke": None, "update": None}
-    return {
-        "bootstrap": payload.get("bootstrap"),
-        "smoke": payload.get("smoke"),
-        "update": payload.get("update"),
-    }
 
+def close_repo_status_reader() -> None:
+    _repo_status_reader.close()
 
-def _save_action_state(path: Path, state: dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(state, indent=2), encoding="utf-8")
 
+def action_command(script_path: Path, base_dir: Path) -> list[str]:
+    return ["bash", str(script_path), str(base_dir)]
 
-def _trim_output(stdout: str, stderr: str, *, limit_chars: int = 12000) -> str:
-    combined = "\n".join(part for part in (stdout.strip(), stderr.strip()) if part)
-    if len(combined) <= limit_chars:
-        return combined
-    return f"{combined[:limit_chars]}\n... (truncated)"
 
+def workspace_base_dir(settings: ControlPlaneSettings) -> Path:
+    """The workspace root as the native engines see it (and key their caches on)."""
+    return settings.workspace_root.expanduser().resolve()
 
-def run_action(
+
+def create_smoke_engine(settings: ControlPlaneSettings) -> SmokeEngine:
+    # Shares the repo status reader so HEAD lookups reuse its cached ref state.
+    return SmokeEngine(cache_path=settings.smoke_cache_path, status_reader=_repo_status_reader)
+
+
+def smoke_command(settings: ControlPlaneSettings, *, full: bool = False) -> list[str]:
+    if settings.smoke_engine == "native":
+        return [
+            sys.executable,
+            "-m",
+            "controlplane_api.smoke_cli",
+            *(["--full"] if full else []),
+            str(workspace_base_dir(settings)),
+        ]
+    return action_command(settings.smoke_script_path, settings.workspace_root)
+
+
+def smoke_workspace(
+    settings: ControlPlaneSettings,
+    engine: SmokeEngine,
     *,
-    action_name: str,
-    script_path: Path,
-    base_dir: Path,
-    timeout_seconds: int,
-    state_path: Path,
+    full: bool,
+    log: Callable[[str], None],
+    cancelled: threading.Event | None = None,
 ) -> dict[str, Any]:
-    started_at = _now_iso()
-    command = ["bash", str(script_path), str(base_dir)]
-
-    if not script_path.is_file():
-        result = {
-            "action": action_name,
-            "ok": False,
-            "started_at": started_at,
-            "finished_at": _now_iso(),
-            "exit_code": 127,
-            "command": command,
-            "output": f"missing script: {script_path}",
-        }
-    else:
-        try:
-            completed = subprocess.run(
-                command,
-                cwd=str(script_path.parent.parent),
-                capture_output=True,
-                text=True,
-                timeout=timeout_seconds,
-                check=False,
-            )
-            result = {
-                "action": action_name,
-                "ok": completed.returncode == 0,
-                "started_at": started_at,
-                "finished_at": _now_iso(),
-                "exit_code": completed.returncode,
-                "command": command,
-                "output": _trim_output(completed.stdout, completed.stderr),
-            }
-        except subprocess.TimeoutExpired as exc:
-            result = {
-                "action": action_name,
-                "ok": False,
-                "started_at": started_at,
-                "finished_at": _now_iso(),
-                "exit_code": 124,
-                "command": command,
-                "output": f"action timed out after {timeout_seconds}s: {exc}",
-            }
+    """Smoke-check the runtime repos in-process (the native counterpart of ``harness/smoke.sh``)."""
+    try:
+        base_dir = validate_base_dir(settings.workspace_root, settings.sync_allowed_base_roots)
+        targets = load_smoke_targets(settings.projects_config_path, base_dir)
+    except (RepoSyncError, OSError, yaml.YAMLError) as exc:
+        log(f"ERROR: {exc}\n")
+        return {"ok": False, "full": full, "projects": [], "failed": [], "errors": [str(exc)]}
+    return engine.run(targets, full=full, log=log, cancelled=cancelled)
 
-    state = _load_action_state(state_path)
-    state[action_name] = result
-    _save_action_state(state_path, state)
-    return result
+
+def sync_command(settings: ControlPlaneSettings, mode: str) -> list[str]:
+    """How a bootstrap/update run is described in job and summary payloads."""
+    if settings.sync_engine == "native":
+        return [sys.executable, "-m", "controlplane_api.repo_sync_cli", mode, str(workspace_base_dir(settings))]
+    script_path = settings.bootstrap_script_path if mode == "bootstrap" else settings.update_script_path
+    return action_command(script_path, settings.workspace_root)
+
+
+def sync_workspace(
+    settings: ControlPlaneSettings,
+    *,
+    mode: str,
+    log: Callable[[str], None],
+    cancelled: threading.Event,
+) -> dict[str, Any]:
+    """Bootstrap or update the runtime repos in-process (the native counterpart of the sync scripts)."""
+    try:
+        base_dir = validate_base_dir(settings.workspace_root, settings.sync_allowed_base_roots)
+        targets = load_sync_targets(
+            settings.projects_config_path,
+            base_dir,
+            default_filter=settings.sync_clone_filter or None,
+            default_depth=settings.sync_depth or None,
+        )
+    except (RepoSyncError, OSError, yaml.YAMLError) as exc:
+        log(f"ERROR: {exc}\n")
+        return {"ok": False, "mode": mode, "repos": [], "failed": [], "errors": [str(exc)]}
+    engine = RepoSyncEngine(
+        options=RepoSyncOptions(
+            protocol=settings.sync_clone_protocol,
+            allowed_orgs=tuple(settings.sync_allowed_orgs),
+            clone_timeout_seconds=settings.sync_clone_timeout_seconds,
+            fetch_timeout_seconds=settings.sync_fetch_timeout_seconds,
+            merge_timeout_seconds=settings.sync_merge_timeout_seconds,
+            access_token=settings.sync_access_token,
+        ),
+        max_workers=settings.sync_max_workers,
+    )
+    return engine.run(targets, mode=mode, log=log, cancelled=cancelled)
 
 
 def build_projects_summary(settings: ControlPlaneSettings) -> list[dict[str, Any]]:
@@ -158,6 +139,7 @@ def build_projects_summary(settings: ControlPlaneSettings) -> list[dict[str, Any
         return []
 
     output: list[dict[str, Any]] = []
+    local_paths: list[Path] = []
     for entry in raw_projects:
         if not isinstance(entry, dict):
             continue
@@ -180,20 +162,40 @@ def build_projects_summary(settings: ControlPlaneSettings) -> list[dict[str, Any
                 "dashboard": entry.get("dashboard") if isinstance(entry.get("dashboard"), dict) else {},
                 "capabilities": entry.get("capabilities") if isinstance(entry.get("capabilities"), dict) else {},
                 "local_path": str(local_path),
-                "status": repo_status(local_path),
             }
         )
+        local_paths.append(local_path)
 
+    for project, status in zip(output, _repo_status_reader.status_many(local_paths)):
+        project["status"] = status
     return output
 
 
-def build_orchestration_summary(settings: ControlPlaneSettings) -> dict[str, Any]:
-    projects = build_projects_summary(settings)
+def build_orchestration_summary(
+    settings: ControlPlaneSettings,
+    *,
+    history: ActionHistoryStore,
+    smoke: SmokeEngine | None = None,
+) -> dict[str, Any]:
+    errors: list[str] = []
+    try:
+        projects = build_projects_summary(settings)
+    except (OSError, yaml.YAMLError) as exc:
+        projects = []
+        errors.append(f"unable to read {settings.projects_config_path}: {exc}")
     dirty_repos = [project["name"] for project in projects if bool(project.get("status", {}).get("dirty"))]
     missing_repos = [project["name"] for project in projects if not bool(project.get("status", {}).get("present"))]
-    action_state = _load_action_state(settings.orchestration_state_path)
+    action_state = history.latest()
+    smoke_summary: dict[str, Any] | None = None
+    if smoke is not None:
+        # Same base dir as smoke_workspace, so both share cache entries.
+        try:
+            smoke_summary = smoke.run(load_smoke_targets(settings.projects_config_path, workspace_base_dir(settings)))
+        except (OSError, yaml.YAMLError) as exc:
+            smoke_summary = {"ok": False, "projects": [], "failed": [], "errors": [str(exc)]}
 
     return {
+        "ok": not errors,
         "generated_at": _now_iso(),
         "projects": projects,
         "project_count": len(projects),
@@ -202,9 +204,26 @@ def build_orchestration_summary(settings: ControlPlaneSettings) -> dict[str, Any
         "missing_repo_count": len(missing_repos),
         "missing_repos": missing_repos,
         "last_actions": action_state,
+        "smoke": smoke_summary,
         "commands": {
-            "bootstrap": ["bash", str(settings.bootstrap_script_path), str(settings.workspace_root)],
-            "smoke": ["bash", str(settings.smoke_script_path), str(settings.workspace_root)],
-            "update": ["bash", str(settings.update_script_path), str(settings.workspace_root)],
+            "bootstrap": sync_command(settings, "bootstrap"),
+            "smoke": smoke_command(settings),
+            "update": sync_command(settings, "update"),
         },
+        "errors": errors,
     }
+
+
+async def abuild_orchestration_summary(
+    settings: ControlPlaneSettings,
+    *,
+    history: ActionHistoryStore,
+    smoke: SmokeEngine | None = None,
+    executor: Executor | None = None,
+) -> dict[str, Any]:
+    """``build_orchestration_summary`` run on ``executor`` (its git calls block)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(build_orchestration_summary, settings, history=history, smoke=smoke),
+    )
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+from .config import ControlPlaneSettings
+
+OverviewFetch = Callable[[], Awaitable[dict[str, Any]]]
+
+
+def _consume_task_result(task: asyncio.Task[Any]) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_bytes(content)
+    os.replace(temp_path, path)
+
+
+def _section_ok(section: dict[str, Any]) -> bool:
+    return bool(section.get("ok"))
+
+
+def overview_snapshot_fingerprint(settings: ControlPlaneSettings) -> str:
+    """Identify the settings a persisted overview was gathered under."""
+    try:
+        projects_mtime_ns: int | None = os.stat(settings.projects_config_path).st_mtime_ns
+    except OSError:
+        projects_mtime_ns = None
+    parts = [
+        str(settings.workspace_root),
+        str(settings.projects_config_path),
+        projects_mtime_ns,
+        settings.clownpeanuts_api_base,
+        str(settings.pingting_repo_path),
+        str(settings.pingting_status_path),
+    ]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass(frozen=True)
+class OverviewSource:
+    name: str
+    fetch: OverviewFetch
+    deadline_seconds: float
+    # Section returned when the source neither answers in time nor has a cached result.
+    placeholder: dict[str, Any]
+    # Background refresh cadence; 0 fetches the source on demand only.
+    refresh_interval_seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class _StoredSection:
+    section: dict[str, Any]
+    stored_at: float
+    from_disk: bool = False
+
+
+class OverviewGatherer:
+    """Keeps the overview sections current and serves them without waiting.
+
+    Sources with a refresh interval are re-fetched by background loops and
+    read straight from memory. Only sections with a true ``ok`` are kept: a
+    failed refresh leaves the previous good section in place, served as
+    ``stale`` with the failure's ``error``. The last-known-good sections are
+    persisted to ``snapshot_path`` so a restarted API answers immediately from
+    disk, with ``stale`` set until each source has refreshed again. The snapshot carries
+    ``fingerprint()`` and is ignored when that no longer matches, so changed
+    settings never serve another workspace's data. A source with no
+    stored section (or no interval) is fetched on demand under its deadline:
+    a fetch that misses it keeps running, the next request joins that same
+    fetch, and the last completed section is served as ``cached`` meanwhile,
+    or the placeholder as ``timed_out`` if it has never answered.
+    """
+
+    def __init__(
+        self,
+        *,
+        snapshot_path: Path | None = None,
+        fingerprint: Callable[[], str] | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        self.snapshot_path = snapshot_path
+        self.fingerprint = fingerprint
+        self.executor = executor
+        self._inflight: dict[str, asyncio.Task[dict[str, Any]]] = {}
+        self._refreshers: dict[str, asyncio.Task[None]] = {}
+        self._last: dict[str, _StoredSection] = {}
+        # Source name -> (time, error) of its latest failed fetch, cleared on success.
+        self._failures: dict[str, tuple[float, str]] = {}
+        self._snapshot_loaded = False
+        self._snapshot_task: asyncio.Task[None] | None = None
+        self._write_lock = threading.Lock()
+        self._counters = {
+            "fresh": 0,
+            "cached": 0,
+            "stale": 0,
+            "timed_out": 0,
+            "error": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "snapshot_writes": 0,
+            "snapshot_mismatches": 0,
+        }
+
+    def _read_snapshot(self) -> tuple[dict[str, Any] | None, bool]:
+        """Return ``(sections, fingerprint_mismatch)`` from disk; runs on the executor."""
+        if self.snapshot_path is None or not self.snapshot_path.is_file():
+            return None, False
+        try:
+            payload = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None, False
+        if not isinstance(payload, dict):
+            return None, False
+        if self.fingerprint is not None and payload.get("fingerprint") != self.fingerprint():
+            return None, True
+        sections = payload.get("sections")
+        return (sections if isinstance(sections, dict) else None), False
+
+    async def _load_snapshot(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            sections, mismatch = await loop.run_in_executor(self.executor, self._read_snapshot)
+        finally:
+            self._snapshot_loaded = True
+        if mismatch:
+            self._counters["snapshot_mismatches"] += 1
+        for name, item in (sections or {}).items():
+            if not isinstance(item, dict) or not isinstance(item.get("section"), dict):
+                continue
+            if not _section_ok(item["section"]):
+                continue
+            try:
+                stored_at = float(item["stored_at"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            self._last.setdefault(name, _StoredSection(section=item["section"], stored_at=stored_at, from_disk=True))
+
+    async def _ensure_snapshot(self) -> None:
+        if self._snapshot_loaded:
+            return
+        loop = asyncio.get_running_loop()
+        task = self._snapshot_task
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._load_snapshot(), name="overview-snapshot-load")
+            task.add_done_callback(_consume_task_result)
+            self._snapshot_task = task
+        await asyncio.shield(task)
+
+    def _write_snapshot(self) -> None:
+        assert self.snapshot_path is not None
+        with self._write_lock:
+            sections = {
+                name: {"section": stored.section, "stored_at": stored.stored_at}
+                for name, stored in list(self._last.items())
+            }
+            snapshot = {
+                "fingerprint": self.fingerprint() if self.fingerprint is not None else None,
+                "sections": sections,
+            }
+            _write_atomic(self.snapshot_path, json.dumps(snapshot, default=str).encode("utf-8"))
+            self._counters["snapshot_writes"] += 1
+
+    def _task_for(self, source: OverviewSource) -> tuple[asyncio.Task[dict[str, Any]], bool]:
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(source.name)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return task, True
+        task = loop.create_task(self._fetch(source), name=f"overview-{source.name}")
+        task.add_done_callback(_consume_task_result)
+        self._inflight[source.name] = task
+        return task, False
+
+    async def _fetch(self, source: OverviewSource) -> dict[str, Any]:
+        # Load first so a fresh section is never overwritten by an older one from disk.
+        await self._ensure_snapshot()
+        section = await source.fetch()
+        if not _section_ok(section):
+            error = section.get("error") or "; ".join(str(item) for item in section.get("errors") or [])
+            self._failures[source.name] = (time.time(), error or f"{source.name} reported ok=false")
+            return section
+        self._failures.pop(source.name, None)
+        self._last[source.name] = _StoredSection(section=section, stored_at=time.time())
+        if self.snapshot_path is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self.executor, self._write_snapshot)
+            except OSError:
+                pass
+        return section
+
+    async def _refresh_forever(self, source: OverviewSource) -> None:
+        while True:
+            task, _joined = self._task_for(source)
+            try:
+                section = await asyncio.shield(task)
+                self._counters["refreshes" if _section_ok(section) else "refresh_failures"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._counters["refresh_failures"] += 1
+            await asyncio.sleep(source.refresh_interval_seconds)
+
+    def ensure_refreshing(self, sources: list[OverviewSource]) -> None:
+        loop = asyncio.get_running_loop()
+        for source in sources:
+            if source.refresh_interval_seconds <= 0:
+                continue
+            task = self._refreshers.get(source.name)
+            if task is not None and not task.done() and task.get_loop() is loop:
+                continue
+            self._refreshers[source.name] = loop.create_task(
+                self._refresh_forever(source),
+                name=f"overview-refresh-{source.name}",
+            )
+
+    async def aclose(self) -> None:
+        tasks = [task for task in self._refreshers.values() if not task.done()]
+        self._refreshers.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _stored(self, source: OverviewSource) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        stored = self._last.get(source.name)
+        if stored is None or source.refresh_interval_seconds <= 0:
+            return None
+        age = max(0.0, time.time() - stored.stored_at)
+        failure = self._failures.get(source.name)
+        failed_since = failure is not None and failure[0] >= stored.stored_at
+        # One missed refresh (plus its deadline) is tolerated before a section counts as stale.
+        fresh = (
+            not stored.from_disk
+            and not failed_since
+            and age <= 2 * source.refresh_interval_seconds + source.deadline_seconds
+        )
+        freshness = "fresh" if fresh else "stale"
+        self._counters[freshness] += 1
+        meta: dict[str, Any] = {
+            "freshness": freshness,
+            "age_seconds": round(age, 3),
+            "refresh_interval_seconds": source.refresh_interval_seconds,
+            "from_disk": stored.from_disk,
+        }
+        if failed_since:
+            meta["error"] = failure[1]
+        return stored.section, meta
+
+    async def _collect(self, source: OverviewSource, deadline_seconds: float) -> tuple[dict[str, Any], dict[str, Any]]:
+        stored = self._stored(source)
+        if stored is not None:
+            return stored
+
+        started = time.perf_counter()
+        task, joined = self._task_for(source)
+        meta: dict[str, Any] = {"deadline_seconds": deadline_seconds, "joined_inflight": joined}
+        try:
+            section = await asyncio.wait_for(asyncio.shield(task), timeout=deadline_seconds)
+            freshness = "fresh"
+            if not _section_ok(section):
+                # Serve the source's own error section unless a good one is stored.
+                freshness = "error"
+                meta["error"] = self._failures.get(source.name, (0.0, ""))[1]
+        except asyncio.TimeoutError:
+            freshness = "timed_out"
+            section = source.placeholder
+        except Exception as exc:
+            freshness = "error"
+            section = source.placeholder
+            meta["error"] = str(exc)
+        if freshness != "fresh" and source.name in self._last:
+            stored_section = self._last[source.name]
+            section = stored_section.section
+            freshness = "cached"
+            meta["age_seconds"] = round(max(0.0, time.time() - stored_section.stored_at), 3)
+        elif freshness == "timed_out":
+            meta["error"] = f"{source.name} did not answer within {deadline_seconds:g}s"
+        self._counters[freshness] += 1
+        meta["freshness"] = freshness
+        meta["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return section, meta
+
+    async def gather(
+        self,
+        sources: list[OverviewSource],
+        *,
+        hard_deadline_seconds: float,
+    ) -> tuple[dict[str, dict[str, Any]], dict[str, dict[str, Any]]]:
+        """Return ``(sections, source_meta)`` keyed by source name."""
+        await self._ensure_snapshot()
+        results = await asyncio.gather(
+            *(self._collect(source, min(source.deadline_seconds, hard_deadline_seconds)) for source in sources)
+        )
+        sections = {source.name: section for source, (section, _meta) in zip(sources, results)}
+        meta = {source.name: item for source, (_section, item) in zip(sources, results)}
+        return sections, meta
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "inflight": sorted(name for name, task in self._inflight.items() if not task.done()),
+            "refreshing": sorted(name for name, task in self._refreshers.items() if not task.done()),
+            "snapshot_path": str(self.snapshot_path) if self.snapshot_path is not None else None,
+        }
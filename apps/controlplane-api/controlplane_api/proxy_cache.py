@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import time
+from typing import Any, Awaitable, Callable, Mapping
+from urllib.parse import parse_qsl, urlencode
+
+# Control-plane auth parameters never reach the cache key or the upstream query.
+_AUTH_QUERY_KEYS = frozenset({"token", "api_key", "access_token"})
+
+ProxyFetch = Callable[[str], Awaitable[tuple[int, dict[str, str], bytes]]]
+
+
+def normalize_query(query_string: str, *, exclude: frozenset[str] = frozenset()) -> str:
+    pairs = [
+        (key, value)
+        for key, value in parse_qsl(query_string, keep_blank_values=True)
+        if key not in _AUTH_QUERY_KEYS and key not in exclude
+    ]
+    return urlencode(sorted(pairs))
+
+
+def _normalize_path(path: str) -> str:
+    return path.strip().strip("/")
+
+
+def _is_storable(status_code: int, headers: Mapping[str, str]) -> bool:
+    if status_code != 200:
+        return False
+    cache_control = headers.get("cache-control", "").lower()
+    return "no-store" not in cache_control and "private" not in cache_control
+
+
+def _consume_task_result(task: asyncio.Task[Any]) -> None:
+    # Every waiter may have gone away; retrieving the exception keeps asyncio quiet.
+    if not task.cancelled():
+        task.exception()
+
+
+@dataclass(frozen=True)
+class CachedProxyResponse:
+    status_code: int
+    headers: dict[str, str]
+    content: bytes
+    stored_at: float
+    expires_at: float
+
+    def age_seconds(self, now: float | None = None) -> int:
+        current = time.monotonic() if now is None else now
+        return max(0, int(current - self.stored_at))
+
+
+class ProxyResponseCache:
+    """In-process TTL cache with single-flight misses for proxied deception GETs."""
+
+    def __init__(
+        self,
+        *,
+        ttl_rules: Mapping[str, float],
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        # Longest prefix first so "theater/live" wins over a broader "theater" rule.
+        self.ttl_rules = sorted(
+            ((_normalize_path(prefix), float(ttl)) for prefix, ttl in ttl_rules.items() if float(ttl) > 0),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self._entries: OrderedDict[str, CachedProxyResponse] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[CachedProxyResponse]] = {}
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "uncacheable": 0}
+
+    def ttl_for(self, path: str) -> float | None:
+        normalized = _normalize_path(path)
+        for prefix, ttl in self.ttl_rules:
+            if normalized == prefix or normalized.startswith(f"{prefix}/"):
+                return ttl
+        return None
+
+    @staticmethod
+    def cache_key(path: str, query_string: str) -> str:
+        normalized_query = normalize_query(query_string)
+        normalized_path = _normalize_path(path)
+        return f"{normalized_path}?{normalized_query}" if normalized_query else normalized_path
+
+    def _lookup(self, key: str, now: float) -> CachedProxyResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.content)
+
+    def _store(self, key: str, entry: CachedProxyResponse) -> None:
+        if len(entry.content) > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = entry
+        self._bytes += len(entry.content)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._counters["evictions"] += 1
+
+    async def get_or_fetch(
+        self,
+        *,
+        path: str,
+        query_string: str,
+        ttl_seconds: float,
+        fetch: ProxyFetch,
+    ) -> tuple[CachedProxyResponse, str]:
+        """Return ``(response, outcome)`` where outcome is hit, miss or coalesced.
+
+        ``fetch`` receives the normalized query string so that every coalesced
+        caller observes exactly the upstream request that populated the entry.
+        """
+        key = self.cache_key(path, query_string)
+        now = time.monotonic()
+        entry = self._lookup(key, now)
+        if entry is not None:
+            self._counters["hits"] += 1
+            return entry, "hit"
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._counters["coalesced"] += 1
+            return await asyncio.shield(pending), "coalesced"
+
+        self._counters["misses"] += 1
+        # The upstream fetch runs as its own task so a caller disconnecting does
+        # not cancel the request other coalesced callers are waiting on.
+        task = asyncio.ensure_future(self._fetch_and_store(key, query_string, ttl_seconds, fetch))
+        task.add_done_callback(_consume_task_result)
+        self._inflight[key] = task
+        return await asyncio.shield(task), "miss"
+
+    async def _fetch_and_store(
+        self,
+        key: str,
+        query_string: str,
+        ttl_seconds: float,
+        fetch: ProxyFetch,
+    ) -> CachedProxyResponse:
+        try:
+            status_code, headers, content = await fetch(normalize_query(query_string))
+            stored_at = time.monotonic()
+            entry = CachedProxyResponse(
+                status_code=status_code,
+                headers=headers,
+                content=content,
+                stored_at=stored_at,
+                expires_at=stored_at + ttl_seconds,
+            )
+            if _is_storable(status_code, headers):
+                self._store(key, entry)
+            else:
+                self._counters["uncacheable"] += 1
+            return entry
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._counters["hits"] + self._counters["misses"] + self._counters["coalesced"]
+        served_without_upstream = self._counters["hits"] + self._counters["coalesced"]
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "inflight": len(self._inflight),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round(served_without_upstream / lookups, 4) if lookups else 0.0,
+            "ttl_rules": {prefix: ttl for prefix, ttl in self.ttl_rules},
+        }
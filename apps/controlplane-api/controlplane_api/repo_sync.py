@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import re
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Any, Callable
+
+import yaml
+
+SYNC_MODES = ("bootstrap", "update")
+
+# Same URL forms accepted by scripts/lib/common.sh ``parse_repo_url``.
+_REPO_URL_PATTERNS = (
+    re.compile(r"^ssh://git@github\.com/([^/]+)/([^/]+)\.git$"),
+    re.compile(r"^git@github\.com:([^/]+)/([^/]+)\.git$"),
+    re.compile(r"^https://(?:[^@/]+@)?github\.com/([^/]+)/([^/]+)\.git$"),
+)
+# How often a running git command checks for cancellation.
+_POLL_SECONDS = 0.2
+_ASKPASS_SCRIPT = """#!/usr/bin/env bash
+case "$1" in
+  *Username*) printf '%s\\n' "x-access-token" ;;
+  *Password*) printf '%s\\n' "${GH_ACCESS_TOKEN:-${GITHUB_TOKEN:-}}" ;;
+  *) printf '\\n' ;;
+esac
+"""
+
+SyncLog = Callable[[str], None]
+
+
+class RepoSyncError(RuntimeError):
+    pass
+
+
+class RepoSyncCancelled(RepoSyncError):
+    pass
+
+
+@dataclass(frozen=True)
+class RepoSyncTarget:
+    name: str
+    repo_url: str
+    path: Path
+    # ``git clone --filter`` spec for partial clones, e.g. ``blob:none``.
+    clone_filter: str | None = None
+    # History depth for shallow clones; None clones full history.
+    depth: int | None = None
+
+
+@dataclass(frozen=True)
+class RepoSyncOptions:
+    protocol: str = "ssh"
+    allowed_orgs: tuple[str, ...] = ("rocketweb",)
+    clone_timeout_seconds: float = 300.0
+    fetch_timeout_seconds: float = 120.0
+    merge_timeout_seconds: float = 120.0
+    access_token: str = ""
+
+
+def parse_repo_url(repo_url: str) -> tuple[str, str]:
+    for pattern in _REPO_URL_PATTERNS:
+        match = pattern.match(repo_url.strip())
+        if match:
+            return match.group(1), match.group(2)
+    raise RepoSyncError(f"unsupported repository URL format: {repo_url}")
+
+
+def repo_url_for_protocol(repo_url: str, options: RepoSyncOptions) -> str:
+    owner, name = parse_repo_url(repo_url)
+    if owner not in options.allowed_orgs:
+        raise RepoSyncError(
+            f"repository owner '{owner}' is not in ALLOWED_GITHUB_ORGS='{','.join(options.allowed_orgs)}'"
+        )
+    if options.protocol == "https":
+        return f"https://github.com/{owner}/{name}.git"
+    return f"git@github.com:{owner}/{name}.git"
+
+
+def validate_base_dir(base_dir: Path, allowed_roots: list[str]) -> Path:
+    resolved = base_dir.expanduser()
+    resolved.mkdir(parents=True, exist_ok=True)
+    resolved = resolved.resolve()
+    for root in allowed_roots:
+        root_path = Path(root).expanduser().resolve()
+        if resolved == root_path or root_path in resolved.parents:
+            return resolved
+    raise RepoSyncError(f"base dir '{resolved}' is outside ALLOWED_BASE_ROOTS='{','.join(allowed_roots)}'")
+
+
+def load_sync_targets(
+    projects_config_path: Path,
+    base_dir: Path,
+    *,
+    default_filter: str | None = None,
+    default_depth: int | None = None,
+) -> list[RepoSyncTarget]:
+    """Runtime projects from ``projects.yaml``; an optional per-project ``sync`` block overrides the defaults."""
+    if not projects_config_path.is_file():
+        raise RepoSyncError(f"missing config file: {projects_config_path}")
+    payload = yaml.safe_load(projects_config_path.read_text(encoding="utf-8"))
+    raw_projects = payload.get("projects") if isinstance(payload, dict) else None
+    targets: list[RepoSyncTarget] = []
+    for entry in raw_projects if isinstance(raw_projects, list) else []:
+        if not isinstance(entry, dict) or entry.get("role") != "runtime":
+            continue
+        name = str(entry.get("name") or "").strip()
+        repo_url = str(entry.get("repo") or "").strip()
+        if not name or not repo_url:
+            raise RepoSyncError(f"invalid runtime project in {projects_config_path}")
+        sync = entry.get("sync") if isinstance(entry.get("sync"), dict) else {}
+        clone_filter = str(sync.get("filter") or default_filter or "").strip() or None
+        depth_raw = sync.get("depth", default_depth)
+        depth = int(depth_raw) if isinstance(depth_raw, int) and depth_raw > 0 else None
+        targets.append(
+            RepoSyncTarget(name=name, repo_url=repo_url, path=base_dir / name, clone_filter=clone_filter, depth=depth)
+        )
+    if not targets:
+        raise RepoSyncError(f"no runtime projects found in {projects_config_path}")
+    return targets
+
+
+class RepoSyncEngine:
+    """Clones or fast-forwards the workspace repos through a bounded worker pool.
+
+    At most ``max_workers`` repos sync at once. Each repo is fetched once and
+    fast-forwarded from the fetched upstream (no second network round trip
+    for ``pull``), and the merge is skipped when the upstream has not moved.
+    Targets with a clone filter are cloned as partial clones (blobs are
+    fetched on demand) and targets with a depth are cloned shallow. Every git phase is timed and
+    bounded by its timeout, and the run returns one structured result per
+    repo so the slow ones are easy to spot.
+    """
+
+    def __init__(self, *, options: RepoSyncOptions, max_workers: int = 4) -> None:
+        self.options = options
+        self.max_workers = max(1, max_workers)
+
+    def _git(
+        self,
+        args: list[str],
+        *,
+        phase: str,
+        timeout_seconds: float,
+        env: dict[str, str],
+        phases: list[dict[str, Any]],
+        cancelled: threading.Event,
+    ) -> str:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            ["git", *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            env=env,
+            start_new_session=True,
+        )
+        deadline = time.monotonic() + timeout_seconds
+        error: str | None = None
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=_POLL_SECONDS)
+                break
+            except subprocess.TimeoutExpired:
+                if cancelled.is_set():
+                    error = "cancelled"
+                elif time.monotonic() >= deadline:
+                    error = f"{phase} timed out after {timeout_seconds:g}s"
+                else:
+                    continue
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                process.communicate()
+                break
+        seconds = round(time.perf_counter() - started, 3)
+        if error is None and process.returncode != 0:
+            error = (stderr or stdout or f"git {phase} failed").strip()
+        phases.append({"phase": phase, "seconds": seconds, "ok": error is None})
+        if error == "cancelled":
+            raise RepoSyncCancelled(error)
+        if error is not None:
+            raise RepoSyncError(error)
+        return (stdout or "").strip()
+
+    def _sync_one(
+        self,
+        target: RepoSyncTarget,
+        *,
+        mode: str,
+        env: dict[str, str],
+        log: SyncLog,
+        cancelled: threading.Event,
+    ) -> dict[str, Any]:
+        started = time.perf_counter()
+        phases: list[dict[str, Any]] = []
+        result: dict[str, Any] = {
+            "name": target.name,
+            "path": str(target.path),
+            "operation": "update",
+            "status": "failed",
+            "ok": False,
+            "before": None,
+            "after": None,
+            "clone_filter": target.clone_filter,
+            "depth": target.depth,
+            "phases": phases,
+            "error": None,
+        }
+
+        def git(*args: str, phase: str, timeout_seconds: float) -> str:
+            return self._git(
+                list(args),
+                phase=phase,
+                timeout_seconds=timeout_seconds,
+                env=env,
+                phases=phases,
+                cancelled=cancelled,
+            )
+
+        try:
+            if cancelled.is_set():
+                raise RepoSyncCancelled("cancelled")
+            expected_url = repo_url_for_protocol(target.repo_url, self.options)
+            repo = str(target.path)
+            if not (target.path / ".git").is_dir():
+                if mode == "update":
+                    result.update(operation="skip", status="skipped", ok=True, error=f"missing at {target.path}")
+                    log(f"[skip] {target.name} (missing at {target.path})\n")
+                    return result
+                result["operation"] = "clone"
+                log(f"[clone] {target.name}\n")
+                clone_args = ["clone", "--quiet"]
+                if target.clone_filter:
+                    clone_args.append(f"--filter={target.clone_filter}")
+                if target.depth:
+                    clone_args.append(f"--depth={target.depth}")
+                existed = target.path.exists()
+                try:
+                    git(*clone_args, expected_url, repo, phase="clone", timeout_seconds=self.options.clone_timeout_seconds)
+                except RepoSyncError:
+                    # A killed clone leaves a half-written .git that would look like a repo next run.
+                    if not existed:
+                        shutil.rmtree(target.path, ignore_errors=True)
+                    raise
+                result["after"] = git("-C", repo, "rev-parse", "HEAD", phase="rev-parse", timeout_seconds=30)
+                result.update(status="cloned", ok=True)
+                return result
+
+            log(f"[update] {target.name}\n")
+            # The configured URL, before any ``insteadOf`` rewriting.
+            current_remote = git(
+                "-C", repo, "config", "--get", "remote.origin.url", phase="remote", timeout_seconds=30
+            )
+            if parse_repo_url(current_remote) != parse_repo_url(expected_url):
+                raise RepoSyncError(
+                    f"repository mismatch at {repo}; expected {'/'.join(parse_repo_url(expected_url))}, "
+                    f"found {'/'.join(parse_repo_url(current_remote))}"
+                )
+            # A shallow clone stays shallow: fetch only adds commits above its existing
+            # boundary, which keeps them connected so the fast-forward below works.
+            git(
+                "-C", repo, "fetch", "--quiet", "--prune", "origin",
+                phase="fetch",
+                timeout_seconds=self.options.fetch_timeout_seconds,
+            )
+            head, upstream = git(
+                "-C", repo, "rev-parse", "HEAD", "@{upstream}", phase="rev-parse", timeout_seconds=30
+            ).split()
+            result["before"] = head
+            if head == upstream:
+                result.update(status="up_to_date", ok=True, after=head)
+                return result
+            git(
+                "-C", repo, "merge", "--ff-only", "--quiet", "@{upstream}",
+                phase="merge",
+                timeout_seconds=self.options.merge_timeout_seconds,
+            )
+            result.update(status="updated", ok=True, after=upstream)
+            return result
+        except RepoSyncCancelled:
+            result.update(status="cancelled", error="cancelled")
+            return result
+        except (RepoSyncError, OSError, ValueError) as exc:
+            result["error"] = str(exc)
+            return result
+        finally:
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            timings = ", ".join(f"{phase['phase']} {phase['seconds']:.1f}s" for phase in phases)
+            if result["ok"] and result["operation"] != "skip":
+                log(f"[{result['status']}] {target.name} in {result['seconds']:.1f}s ({timings})\n")
+            elif not result["ok"]:
+                log(f"[fail] {target.name}: {result['error']}\n")
+
+    def run(
+        self,
+        targets: list[RepoSyncTarget],
+        *,
+        mode: str,
+        log: SyncLog = lambda _text: None,
+        cancelled: threading.Event | None = None,
+    ) -> dict[str, Any]:
+        if mode not in SYNC_MODES:
+            raise ValueError(f"invalid sync mode: {mode}")
+        cancelled = cancelled or threading.Event()
+        started = time.perf_counter()
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        askpass_path: str | None = None
+        if self.options.protocol == "https" and self.options.access_token:
+            handle, askpass_path = tempfile.mkstemp(prefix="controlplane-askpass-")
+            with os.fdopen(handle, "w", encoding="utf-8") as file:
+                file.write(_ASKPASS_SCRIPT)
+            os.chmod(askpass_path, 0o700)
+            env.update(GIT_ASKPASS=askpass_path, GH_ACCESS_TOKEN=self.options.access_token)
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets) or 1)) as pool:
+                repos = list(
+                    pool.map(
+                        lambda target: self._sync_one(target, mode=mode, env=env, log=log, cancelled=cancelled),
+                        targets,
+                    )
+                )
+        finally:
+            if askpass_path is not None:
+                os.unlink(askpass_path)
+        failed = [repo["name"] for repo in repos if not repo["ok"]]
+        slowest = max(repos, key=lambda repo: repo["seconds"], default=None)
+        seconds = round(time.perf_counter() - started, 3)
+        log(
+            f"{mode} {'complete' if not failed else f'failed ({len(failed)} of {len(repos)} repos)'} "
+            f"in {seconds:.1f}s\n"
+        )
+        return {
+            "ok": not failed,
+            "mode": mode,
+            "max_workers": self.max_workers,
+            "seconds": seconds,
+            "repos": repos,
+            "failed": failed,
+            "slowest": slowest["name"] if slowest is not None else None,
+        }
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import replace
+import json
+from pathlib import Path
+import sys
+import threading
+
+from .config import load_settings
+from .orchestration import sync_workspace
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Clone or fast-forward the workspace runtime repos.")
+    parser.add_argument("mode", choices=("bootstrap", "update"))
+    parser.add_argument("base_dir", nargs="?", help="workspace root (default: CONTROLPLANE_WORKSPACE_ROOT)")
+    parser.add_argument("--json", action="store_true", help="print the structured summary as JSON")
+    args = parser.parse_args(argv)
+
+    settings = load_settings()
+    if args.base_dir:
+        settings = replace(settings, workspace_root=Path(args.base_dir))
+    summary = sync_workspace(
+        settings,
+        mode=args.mode,
+        log=(lambda _text: None) if args.json else sys.stdout.write,
+        cancelled=threading.Event(),
+    )
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    return 0 if summary["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
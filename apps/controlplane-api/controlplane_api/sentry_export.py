@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Any, Iterable, Iterator
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+FINDING_EXPORT_FIELDS = (
+    "id",
+    "created_at",
+    "severity",
+    "agent",
+    "title",
+    "description",
+    "device_ip",
+    "device_mac",
+    "acknowledged",
+    "false_positive",
+    "during_learning",
+)
+AGENT_RUN_EXPORT_FIELDS = (
+    "id",
+    "agent",
+    "started_at",
+    "completed_at",
+    "status",
+    "findings_count",
+    "raw_data_summary",
+    "error_message",
+)
+
+# Rows encoded per yielded chunk; keeps chunks reasonably sized without buffering the export.
+_ROWS_PER_CHUNK = 200
+
+
+def _ndjson_chunks(rows: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+    buffer: list[str] = []
+    for row in rows:
+        buffer.append(json.dumps(row, separators=(",", ":")))
+        if len(buffer) >= _ROWS_PER_CHUNK:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer.clear()
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode("utf-8")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _csv_chunks(rows: Iterable[dict[str, Any]], fields: tuple[str, ...]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(row.get(field)) for field in fields])
+        pending += 1
+        if pending >= _ROWS_PER_CHUNK:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def export_chunks(rows: Iterable[dict[str, Any]], *, export_format: str, fields: tuple[str, ...]) -> Iterator[bytes]:
+    if export_format == "csv":
+        return _csv_chunks(rows, fields)
+    return _ndjson_chunks(rows)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from adapters.pingting import PingTingAdapter
+
+ROLLUP_DIMENSIONS = ("severity", "agent", "device")
+BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+
+# Source rows folded into the rollups per transaction.
+_INGEST_BATCH_SIZE = 5000
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS rollup_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS finding_rollups ("
+    "bucket_start INTEGER NOT NULL, severity TEXT NOT NULL, agent TEXT NOT NULL, device TEXT NOT NULL, "
+    "count INTEGER NOT NULL, PRIMARY KEY (bucket_start, severity, agent, device)"
+    ") WITHOUT ROWID",
+)
+
+
+def _hour_bucket(created_at: str) -> int | None:
+    try:
+        parsed = datetime.fromisoformat(created_at.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    epoch = int(parsed.timestamp())
+    return epoch - epoch % 3600
+
+
+class FindingsRollupStore:
+    """Hourly finding counts per severity, agent and device in a sidecar SQLite db.
+
+    The store advances incrementally from the last PingTing findings rowid it
+    folded in, so serving a trend only reads the hourly rows in the requested
+    window. Counts reflect findings as first seen: false positives are skipped
+    at ingestion, and later edits to an already-counted row are not replayed.
+    If PingTing's database is replaced (its max id drops below our mark) the
+    rollups are rebuilt from scratch. ``advance`` is meant for a background
+    task; it takes the store lock one batch at a time, so ``query`` keeps
+    answering from the rows folded in so far while a large backlog is ingested.
+    """
+
+    def __init__(self, *, path: Path, pingting: PingTingAdapter) -> None:
+        self.path = path
+        self.pingting = pingting
+        self._lock = threading.Lock()
+        self._advance_lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._counters = {"advances": 0, "rows_ingested": 0, "rebuilds": 0}
+        self._last_advance_ms = 0.0
+        self._last_advance_at: float | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _state(self, db: sqlite3.Connection, key: str, default: int = 0) -> int:
+        row = db.execute("SELECT value FROM rollup_state WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else default
+
+    def advance(self) -> int:
+        """Fold findings above the stored rowid into the rollups; return rows ingested."""
+        started = time.perf_counter()
+        ingested = 0
+        rebuilt = False
+        with self._advance_lock, self.pingting.db_pool.connection() as source:
+            with self._lock:
+                last_rowid = self._state(self._db(), "last_rowid")
+            top_id = int(source.execute("SELECT COALESCE(MAX(id), 0) FROM findings").fetchone()[0])
+            if top_id < last_rowid:
+                with self._lock:
+                    db = self._db()
+                    with db:
+                        db.execute("DELETE FROM finding_rollups")
+                        db.execute("DELETE FROM rollup_state")
+                last_rowid = 0
+                rebuilt = True
+            while last_rowid < top_id:
+                rows = source.execute(
+                    "SELECT id, created_at, severity, agent, device_ip, device_mac, false_positive "
+                    "FROM findings WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+                    (last_rowid, top_id, _INGEST_BATCH_SIZE),
+                ).fetchall()
+                if not rows:
+                    break
+                counts: Counter[tuple[int, str, str, str]] = Counter()
+                for row in rows:
+                    if row["false_positive"]:
+                        continue
+                    bucket = _hour_bucket(str(row["created_at"]))
+                    if bucket is None:
+                        continue
+                    device = str(row["device_ip"] or row["device_mac"] or "")
+                    counts[(bucket, str(row["severity"]), str(row["agent"]), device)] += 1
+                last_rowid = int(rows[-1]["id"])
+                with self._lock:
+                    db = self._db()
+                    with db:
+                        db.executemany(
+                            "INSERT INTO finding_rollups (bucket_start, severity, agent, device, count) "
+                            "VALUES (?, ?, ?, ?, ?) "
+                            "ON CONFLICT (bucket_start, severity, agent, device) "
+                            "DO UPDATE SET count = count + excluded.count",
+                            [(*key, count) for key, count in counts.items()],
+                        )
+                        db.execute(
+                            "INSERT OR REPLACE INTO rollup_state (key, value) VALUES ('last_rowid', ?)",
+                            (str(last_rowid),),
+                        )
+                ingested += len(rows)
+        with self._lock:
+            self._counters["advances"] += 1
+            self._counters["rows_ingested"] += ingested
+            self._counters["rebuilds"] += int(rebuilt)
+            self._last_advance_ms = (time.perf_counter() - started) * 1000
+            self._last_advance_at = time.time()
+        return ingested
+
+    def query(
+        self,
+        *,
+        bucket: str,
+        since_epoch: int,
+        group_by: tuple[str, ...],
+        filters: dict[str, str],
+    ) -> dict[str, Any]:
+        bucket_seconds = BUCKET_SECONDS[bucket]
+        where_clauses = ["bucket_start >= ?"]
+        params: list[Any] = [since_epoch - since_epoch % 3600]
+        for dimension, value in filters.items():
+            where_clauses.append(f"{dimension} = ?")
+            params.append(value)
+        dimensions = "".join(f", {dimension}" for dimension in group_by)
+        query = (
+            f"SELECT (bucket_start / {bucket_seconds}) * {bucket_seconds} AS bucket{dimensions}, SUM(count) "
+            f"FROM finding_rollups WHERE {' AND '.join(where_clauses)} "
+            f"GROUP BY bucket{dimensions} ORDER BY bucket{dimensions}"
+        )
+        with self._lock:
+            db = self._db()
+            rows = db.execute(query, tuple(params)).fetchall()
+            last_rowid = self._state(db, "last_rowid")
+        return {
+            "columns": ["bucket_start", *group_by, "count"],
+            "rows": [list(row) for row in rows],
+            "last_rowid": last_rowid,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "last_advance_ms": round(self._last_advance_ms, 3),
+            "last_advance_age_seconds": None
+            if self._last_advance_at is None
+            else round(max(0.0, time.time() - self._last_advance_at), 3),
+            "path": str(self.path),
+        }
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import signal
+import subprocess
+import threading
+import time
+from typing import Any, Callable
+
+import yaml
+
+from .git_status import RepoStatusReader
+
+SmokeLog = Callable[[str], None]
+
+# Bumped when the checks change so cached results from older code are re-verified.
+_CACHE_VERSION = 1
+# How often a running git check looks for cancellation.
+_POLL_SECONDS = 0.2
+_WORK_TREE_TIMEOUT_SECONDS = 30.0
+
+
+class SmokeCancelled(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class SmokeTarget:
+    name: str
+    path: Path
+    verification_key: str
+
+
+def load_smoke_targets(projects_config_path: Path, base_dir: Path) -> list[SmokeTarget]:
+    """Runtime projects from ``projects.yaml``, resolved under ``base_dir`` like ``harness/smoke.sh``."""
+    if not projects_config_path.is_file():
+        raise FileNotFoundError(f"missing config file: {projects_config_path}")
+    payload = yaml.safe_load(projects_config_path.read_text(encoding="utf-8"))
+    raw_projects = payload.get("projects") if isinstance(payload, dict) else None
+    targets: list[SmokeTarget] = []
+    for entry in raw_projects if isinstance(raw_projects, list) else []:
+        if not isinstance(entry, dict) or entry.get("role") != "runtime":
+            continue
+        name = str(entry.get("name") or "").strip()
+        if name:
+            targets.append(
+                SmokeTarget(
+                    name=name,
+                    path=base_dir / name,
+                    verification_key=str(entry.get("verification_key") or "").strip(),
+                )
+            )
+    return targets
+
+
+def _mtime_ns(path: Path) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class SmokeEngine:
+    """In-process version of ``harness/smoke.sh`` with per-project result caching.
+
+    Each project is checked for a git repo, its configured verification key
+    and a usable work tree, with every check timed. A project's result is
+    cached under its HEAD commit plus the verification key file's mtime, so a
+    run only re-verifies projects whose checkout moved or whose key file
+    changed; ``full=True`` re-verifies everything. Results are persisted to
+    ``cache_path`` so the cache also survives restarts and CLI runs. Setting
+    ``cancelled`` skips projects not yet started and kills running git checks;
+    those projects are reported as ``cancelled`` and never cached.
+    """
+
+    def __init__(
+        self,
+        *,
+        cache_path: Path | None = None,
+        max_workers: int = 8,
+        status_reader: RepoStatusReader | None = None,
+    ) -> None:
+        self.cache_path = cache_path
+        self.max_workers = max(1, max_workers)
+        self.status_reader = status_reader or RepoStatusReader()
+        self._lock = threading.Lock()
+        self._cache: dict[str, dict[str, Any]] = {}
+        self._cache_loaded = False
+        self._pool: ThreadPoolExecutor | None = None
+        self._counters = {"runs": 0, "checked": 0, "cached": 0, "cache_writes": 0}
+
+    def _load_cache(self) -> None:
+        if self._cache_loaded:
+            return
+        self._cache_loaded = True
+        if self.cache_path is None or not self.cache_path.is_file():
+            return
+        try:
+            payload = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if isinstance(payload, dict) and payload.get("version") == _CACHE_VERSION:
+            entries = payload.get("projects")
+            if isinstance(entries, dict):
+                self._cache.update({name: entry for name, entry in entries.items() if isinstance(entry, dict)})
+
+    def _write_cache(self) -> None:
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.cache_path.with_name(f".{self.cache_path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps({"version": _CACHE_VERSION, "projects": self._cache}), encoding="utf-8")
+        os.replace(temp_path, self.cache_path)
+        self._counters["cache_writes"] += 1
+
+    def _cache_key(self, target: SmokeTarget) -> list[Any]:
+        commit = self.status_reader.head_commit(target.path) if (target.path / ".git").exists() else None
+        key_mtime = _mtime_ns(target.path / target.verification_key) if target.verification_key else None
+        return [str(target.path), target.verification_key, commit, key_mtime]
+
+    @staticmethod
+    def _git(args: list[str], *, cancelled: threading.Event) -> subprocess.CompletedProcess[str]:
+        process = subprocess.Popen(
+            ["git", *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            start_new_session=True,
+        )
+        deadline = time.monotonic() + _WORK_TREE_TIMEOUT_SECONDS
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=_POLL_SECONDS)
+                return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+            except subprocess.TimeoutExpired:
+                if not cancelled.is_set() and time.monotonic() < deadline:
+                    continue
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                process.communicate()
+                if cancelled.is_set():
+                    raise SmokeCancelled("cancelled") from None
+                raise subprocess.TimeoutExpired(process.args, _WORK_TREE_TIMEOUT_SECONDS) from None
+
+    def _verify(self, target: SmokeTarget, cancelled: threading.Event) -> dict[str, Any]:
+        checks: list[dict[str, Any]] = []
+
+        def check(name: str, func: Callable[[], str | None]) -> bool:
+            started = time.perf_counter()
+            try:
+                error = func()
+            except (OSError, subprocess.SubprocessError) as exc:
+                error = str(exc)
+            checks.append(
+                {
+                    "check": name,
+                    "ok": error is None,
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "error": error,
+                }
+            )
+            return error is None
+
+        def git_repo() -> str | None:
+            return None if (target.path / ".git").exists() else f"missing git repo at {target.path}"
+
+        def verification_key() -> str | None:
+            if not target.verification_key:
+                return f"missing verification_key in config for {target.name}"
+            if not (target.path / target.verification_key).is_file():
+                return f"missing {target.verification_key}"
+            return None
+
+        def work_tree() -> str | None:
+            completed = self._git(["-C", str(target.path), "rev-parse", "--is-inside-work-tree"], cancelled=cancelled)
+            if completed.returncode != 0 or completed.stdout.strip() != "true":
+                return (completed.stderr or "not a git work tree").strip()
+            return None
+
+        started = time.perf_counter()
+        # Same order and short-circuiting as harness/smoke.sh.
+        ok = check("git_repo", git_repo) and check("verification_key", verification_key) and check("work_tree", work_tree)
+        return {
+            "name": target.name,
+            "path": str(target.path),
+            "ok": ok,
+            "checks": checks,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "checked_at": time.time(),
+        }
+
+    def _run_one(self, target: SmokeTarget, full: bool, cancelled: threading.Event) -> dict[str, Any]:
+        if cancelled.is_set():
+            return self._cancelled_result(target)
+        key = self._cache_key(target)
+        with self._lock:
+            cached = self._cache.get(target.name)
+        if not full and cached is not None and cached.get("key") == key:
+            return {**cached["result"], "commit": key[2], "cached": True}
+        try:
+            result = self._verify(target, cancelled)
+        except SmokeCancelled:
+            return self._cancelled_result(target)
+        with self._lock:
+            self._cache[target.name] = {"key": key, "result": result}
+        return {**result, "commit": key[2], "cached": False}
+
+    @staticmethod
+    def _cancelled_result(target: SmokeTarget) -> dict[str, Any]:
+        return {
+            "name": target.name,
+            "path": str(target.path),
+            "ok": False,
+            "checks": [],
+            "elapsed_ms": 0.0,
+            "commit": None,
+            "cached": False,
+            "cancelled": True,
+        }
+
+    def run(
+        self,
+        targets: list[SmokeTarget],
+        *,
+        full: bool = False,
+        log: SmokeLog | None = None,
+        cancelled: threading.Event | None = None,
+    ) -> dict[str, Any]:
+        cancelled = cancelled or threading.Event()
+        started = time.perf_counter()
+        with self._lock:
+            self._load_cache()
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="smoke")
+            pool = self._pool
+        projects = list(pool.map(lambda target: self._run_one(target, full, cancelled), targets))
+        skipped = sum(1 for project in projects if project.get("cancelled"))
+        checked = sum(1 for project in projects if not project["cached"]) - skipped
+        failed = [project["name"] for project in projects if not project["ok"] and not project.get("cancelled")]
+        with self._lock:
+            self._counters["runs"] += 1
+            self._counters["checked"] += checked
+            self._counters["cached"] += len(projects) - checked - skipped
+            if checked:
+                try:
+                    self._write_cache()
+                except OSError:
+                    pass
+        summary = {
+            "ok": bool(projects) and not failed and not skipped,
+            "full": full,
+            "project_count": len(projects),
+            "checked": checked,
+            "cached": len(projects) - checked - skipped,
+            "cancelled": skipped,
+            "failed": failed,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "projects": projects,
+        }
+        if log is not None:
+            for project in projects:
+                if project.get("cancelled"):
+                    continue
+                log(f"Checking {project['name']}...{' (cached)' if project['cached'] else ''}\n")
+                for item in project["checks"]:
+                    if not item["ok"]:
+                        log(f"  FAIL: {item['error']}\n")
+                if project["ok"]:
+                    log(f"  OK ({project['elapsed_ms']:.1f} ms)\n")
+            if not projects:
+                log("No runtime projects found.\n")
+            elif skipped:
+                log(f"Smoke check cancelled ({skipped} of {len(projects)} projects not checked).\n")
+            elif failed:
+                log(f"Smoke check failed ({len(failed)} issues).\n")
+            else:
+                log(f"Smoke check passed ({checked} checked, {len(projects) - checked - skipped} cached).\n")
+        return summary
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "projects_cached": len(self._cache),
+            "cache_path": str(self.cache_path) if self.cache_path is not None else None,
+        }
+
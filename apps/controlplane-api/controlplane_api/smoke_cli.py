@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import replace
+import json
+from pathlib import Path
+import sys
+
+from .config import load_settings
+from .orchestration import create_smoke_engine, smoke_workspace
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Smoke-check the workspace runtime repos.")
+    parser.add_argument("base_dir", nargs="?", help="workspace root (default: CONTROLPLANE_WORKSPACE_ROOT)")
+    parser.add_argument("--full", action="store_true", help="re-verify every project, ignoring cached results")
+    parser.add_argument("--json", action="store_true", help="print the structured summary as JSON")
+    args = parser.parse_args(argv)
+
+    settings = load_settings()
+    if args.base_dir:
+        settings = replace(settings, workspace_root=Path(args.base_dir))
+    # Resolves the base dir exactly like the API so both share cache entries.
+    summary = smoke_workspace(
+        settings,
+        create_smoke_engine(settings),
+        full=args.full,
+        log=(lambda _text: None) if args.json else sys.stdout.write,
+    )
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    return 0 if summary["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import json
+import secrets
+import threading
+from typing import Any
+
+# Session list fields that grow at the tail (and may be trimmed at the head once
+# events_per_session is reached); everything else in a session is replaced whole.
+APPENDABLE_SESSION_FIELDS = ("timeline", "events")
+
+# How many head positions to try when matching a trimmed sequence against the
+# previous one before giving up and replacing it.
+_MAX_TRIM_CANDIDATES = 8
+
+
+def _sequence_delta(old: list[Any], new: list[Any]) -> dict[str, Any] | None:
+    if old == new:
+        return None
+    if not new:
+        return {"trim": len(old), "append": []}
+    candidates = [index for index, item in enumerate(old) if item == new[0]][:_MAX_TRIM_CANDIDATES]
+    for trim in candidates:
+        overlap = len(old) - trim
+        if new[:overlap] == old[trim:]:
+            return {"trim": trim, "append": new[overlap:]}
+    return {"trim": len(old), "append": new}
+
+
+def _session_delta(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any] | None:
+    changed: dict[str, Any] = {}
+    sequences: dict[str, Any] = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if key in APPENDABLE_SESSION_FIELDS and isinstance(value, list) and isinstance(previous, list):
+            sequence = _sequence_delta(previous, value)
+            if sequence is not None:
+                sequences[key] = sequence
+        elif key not in old or previous != value:
+            changed[key] = value
+    removed = [key for key in old if key not in new]
+    if not changed and not sequences and not removed:
+        return None
+    delta: dict[str, Any] = {"session_id": new.get("session_id")}
+    if changed:
+        delta["fields"] = changed
+    if sequences:
+        delta["sequences"] = sequences
+    if removed:
+        delta["removed_fields"] = removed
+    return delta
+
+
+def _sessions_by_id(payload: dict[str, Any]) -> dict[str, dict[str, Any]] | None:
+    sessions = payload.get("sessions")
+    if not isinstance(sessions, list):
+        return None
+    indexed: dict[str, dict[str, Any]] = {}
+    for session in sessions:
+        if not isinstance(session, dict) or not session.get("session_id"):
+            return None
+        indexed[str(session["session_id"])] = session
+    return indexed
+
+
+def build_theater_delta(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any] | None:
+    """Describe how to turn ``old`` into ``new``, or return None when not diffable."""
+    old_sessions = _sessions_by_id(old)
+    new_sessions = _sessions_by_id(new)
+    if old_sessions is None or new_sessions is None:
+        return None
+
+    fields = {key: value for key, value in new.items() if key != "sessions" and old.get(key) != value}
+    removed_fields = [key for key in old if key not in new and key != "sessions"]
+
+    added = [session for session_id, session in new_sessions.items() if session_id not in old_sessions]
+    removed = [session_id for session_id in old_sessions if session_id not in new_sessions]
+    changed = []
+    for session_id, session in new_sessions.items():
+        previous = old_sessions.get(session_id)
+        if previous is None:
+            continue
+        session_delta = _session_delta(previous, session)
+        if session_delta is not None:
+            changed.append(session_delta)
+
+    return {
+        "fields": fields,
+        "removed_fields": removed_fields,
+        "sessions": {
+            "added": added,
+            "changed": changed,
+            "removed": removed,
+            "order": list(new_sessions),
+        },
+    }
+
+
+@dataclass(frozen=True)
+class _SnapshotVersion:
+    number: int
+    identity: str
+    payload: dict[str, Any]
+    content: bytes
+
+
+class _SnapshotHistory:
+    def __init__(self, max_versions: int) -> None:
+        self.max_versions = max_versions
+        self.versions: OrderedDict[int, _SnapshotVersion] = OrderedDict()
+        self.deltas: OrderedDict[tuple[int, int], bytes] = OrderedDict()
+
+    @property
+    def latest(self) -> _SnapshotVersion | None:
+        if not self.versions:
+            return None
+        return next(reversed(self.versions.values()))
+
+
+class TheaterSnapshotTracker:
+    """Versions theater/live snapshots per query and serves deltas between versions.
+
+    Version tokens are ``<epoch>.<n>`` where the epoch changes on every process
+    start, so a token from before a restart always falls back to a full snapshot.
+    ``n`` comes from one counter shared by every query, so a history that was
+    evicted and started again never reuses a number an old token still holds.
+    """
+
+    def __init__(self, *, max_versions: int = 8, max_queries: int = 16) -> None:
+        self.max_versions = max(1, max_versions)
+        self.max_queries = max(1, max_queries)
+        self.epoch = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._next_number = 1
+        self._histories: OrderedDict[str, _SnapshotHistory] = OrderedDict()
+        self._counters = {"full": 0, "delta": 0, "unchanged": 0, "versions": 0}
+
+    def _token(self, number: int) -> str:
+        return f"{self.epoch}.{number}"
+
+    def _parse_token(self, token: str | None) -> int | None:
+        if not token:
+            return None
+        epoch, _, raw_number = token.partition(".")
+        if epoch != self.epoch:
+            return None
+        try:
+            return int(raw_number)
+        except ValueError:
+            return None
+
+    def _history(self, query_key: str) -> _SnapshotHistory:
+        history = self._histories.get(query_key)
+        if history is None:
+            history = _SnapshotHistory(self.max_versions)
+            self._histories[query_key] = history
+            while len(self._histories) > self.max_queries:
+                self._histories.popitem(last=False)
+        else:
+            self._histories.move_to_end(query_key)
+        return history
+
+    def observe(self, query_key: str, *, identity: str, content: bytes) -> _SnapshotVersion | None:
+        """Record the snapshot identified by ``identity`` (e.g. its ETag).
+
+        The body is only parsed when the identity differs from the latest
+        version, so repeated polls of an unchanged cached snapshot cost nothing.
+        """
+        with self._lock:
+            history = self._history(query_key)
+            latest = history.latest
+        if latest is not None and latest.identity == identity:
+            return latest
+        try:
+            payload = json.loads(content)
+        except ValueError:
+            return None
+        if not isinstance(payload, dict):
+            return None
+        if latest is not None and latest.payload == payload:
+            return latest
+        with self._lock:
+            # Another request may have recorded the same snapshot meanwhile.
+            newest = history.latest
+            if newest is not None and newest is not latest and newest.payload == payload:
+                return newest
+            number = self._next_number
+            self._next_number += 1
+            version = _SnapshotVersion(number=number, identity=identity, payload=payload, content=content)
+            history.versions[number] = version
+            while len(history.versions) > history.max_versions:
+                history.versions.popitem(last=False)
+            self._counters["versions"] += 1
+        return version
+
+    def respond(self, query_key: str, current: _SnapshotVersion, since: str | None) -> bytes:
+        token = self._token(current.number)
+        base_number = self._parse_token(since)
+
+        if base_number == current.number:
+            self._count("unchanged")
+            return json.dumps({"mode": "unchanged", "version": token}, separators=(",", ":")).encode("utf-8")
+
+        with self._lock:
+            history = self._history(query_key)
+            base = history.versions.get(base_number) if base_number is not None else None
+            cache_key = (base.number, current.number) if base is not None else None
+            cached = history.deltas.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            self._count("delta")
+            return cached
+        if base is not None and base.number < current.number:
+            delta = build_theater_delta(base.payload, current.payload)
+            if delta is not None:
+                encoded = json.dumps(
+                    {"mode": "delta", "version": token, "base_version": self._token(base.number), **delta},
+                    separators=(",", ":"),
+                ).encode("utf-8")
+                with self._lock:
+                    history.deltas[cache_key] = encoded
+                    while len(history.deltas) > history.max_versions * 2:
+                        history.deltas.popitem(last=False)
+                self._count("delta")
+                return encoded
+
+        self._count("full")
+        # Embed the upstream bytes as-is rather than re-serializing the snapshot.
+        header = json.dumps({"mode": "full", "version": token}, separators=(",", ":")).encode("utf-8")
+        return header[:-1] + b',"snapshot":' + current.content + b"}"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "queries": len(self._histories),
+                "max_versions": self.max_versions,
+            }
@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import itertools
+import json
+import secrets
+import time
+from typing import Any
+
+from fastapi import WebSocket
+import websockets
+
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce_latest", "disconnect")
+SLOW_CONSUMER_CLOSE_CODE = 4408
+
+_subscriber_ids = itertools.count(1)
+
+
+def _tag_with_sequence(message: str | bytes, token: str) -> str | bytes:
+    # Splice the sequence token into JSON object frames without a full
+    # decode/encode round trip; anything else is relayed untouched.
+    if not isinstance(message, str):
+        return message
+    stripped = message.lstrip()
+    if not stripped.startswith("{"):
+        return message
+    body = stripped[1:].lstrip()
+    if body.startswith("}"):
+        return f'{{"relay_seq":"{token}"}}'
+    return f'{{"relay_seq":"{token}",{body}'
+
+
+class StreamSubscriber:
+    """One relay client with its own bounded outbound queue.
+
+    The hub only ever appends to the queue; a dedicated writer drains it to the
+    websocket, so a slow browser never blocks the upstream reader or other
+    clients. When the queue is full the overflow policy decides what happens:
+
+    - ``drop_oldest`` discards the oldest queued message.
+    - ``coalesce_latest`` discards everything queued and keeps only the newest
+      message, which suits full-snapshot streams such as theater live.
+    - ``disconnect`` closes the client with ``SLOW_CONSUMER_CLOSE_CODE``.
+    """
+
+    def __init__(self, websocket: WebSocket, *, max_queue: int, overflow_policy: str) -> None:
+        self.id = next(_subscriber_ids)
+        self.websocket = websocket
+        self.max_queue = max(1, max_queue)
+        self.overflow_policy = overflow_policy if overflow_policy in OVERFLOW_POLICIES else "drop_oldest"
+        self.dropped = 0
+        self.sent = 0
+        self.overflowed = False
+        self._queue: deque[tuple[str | bytes, float]] = deque()
+        self._catch_up: deque[str | bytes] = deque()
+        self._ready = asyncio.Event()
+
+    def preload(self, messages: list[str | bytes]) -> None:
+        """Queue buffered history that the writer sends before the live tail."""
+        self._catch_up.extend(messages)
+        if messages:
+            self._ready.set()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def offer(self, message: str | bytes, received_at: float) -> None:
+        if self.overflowed:
+            return
+        if len(self._queue) >= self.max_queue:
+            if self.overflow_policy == "disconnect":
+                self.overflowed = True
+                self._queue.clear()
+                self._ready.set()
+                return
+            if self.overflow_policy == "coalesce_latest":
+                self.dropped += len(self._queue)
+                self._queue.clear()
+            else:
+                self._queue.popleft()
+                self.dropped += 1
+        self._queue.append((message, received_at))
+        self._ready.set()
+
+    async def run_writer(self, hub: UpstreamStreamHub) -> None:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            if self.overflowed:
+                await self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason="slow consumer")
+                return
+            while self._catch_up:
+                message = self._catch_up.popleft()
+                if isinstance(message, bytes):
+                    await self.websocket.send_bytes(message)
+                else:
+                    await self.websocket.send_text(message)
+                self.sent += 1
+            while self._queue:
+                message, received_at = self._queue.popleft()
+                if isinstance(message, bytes):
+                    await self.websocket.send_bytes(message)
+                else:
+                    await self.websocket.send_text(message)
+                self.sent += 1
+                hub.record_delivery(received_at)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "queue_depth": len(self._queue),
+            "catch_up_pending": len(self._catch_up),
+            "max_queue": self.max_queue,
+            "overflow_policy": self.overflow_policy,
+            "sent": self.sent,
+            "dropped": self.dropped,
+        }
+
+
+class UpstreamStreamHub:
+    """Shares one upstream ClownPeanuts websocket between every subscribed client.
+
+    The upstream connection is opened when the first client subscribes, is
+    re-established with exponential backoff while clients stay attached, and is
+    torn down once the last client has been gone for ``linger_seconds``.
+
+    Every relayed message gets a ``relay_seq`` token ``<epoch>.<n>``, where
+    ``n`` increases monotonically and the epoch changes on every process
+    start, and is kept in a ring buffer bounded by message count and UTF-8
+    bytes, so late joiners and reconnecting clients can catch up from the
+    buffer instead of REST. A resume token from another epoch, or one older
+    than the buffer, is answered with a ``relay_gap`` frame ahead of the
+    replay so the client knows frames were missed.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        upstream_url: str,
+        upstream_headers: dict[str, str] | None = None,
+        client_queue_size: int = 256,
+        overflow_policy: str = "drop_oldest",
+        backlog_max_messages: int = 500,
+        backlog_max_bytes: int = 8 * 1024 * 1024,
+        linger_seconds: float = 5.0,
+        reconnect_initial_seconds: float = 0.5,
+        reconnect_max_seconds: float = 15.0,
+    ) -> None:
+        self.name = name
+        self.upstream_url = upstream_url
+        self.upstream_headers = upstream_headers or None
+        self.client_queue_size = client_queue_size
+        self.overflow_policy = overflow_policy
+        self.backlog_max_messages = max(0, backlog_max_messages)
+        self.backlog_max_bytes = max(0, backlog_max_bytes)
+        self.linger_seconds = max(0.0, linger_seconds)
+        self.reconnect_initial_seconds = reconnect_initial_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self._subscribers: dict[int, StreamSubscriber] = {}
+        self._backlog: deque[tuple[int, str | bytes, int]] = deque()
+        self._backlog_bytes = 0
+        self.epoch = secrets.token_hex(4)
+        self._seq = 0
+        self._upstream_task: asyncio.Task[None] | None = None
+        self._linger_task: asyncio.Task[None] | None = None
+        self._upstream_connected = False
+        self._counters = {
+            "messages_received": 0,
+            "messages_delivered": 0,
+            "messages_dropped": 0,
+            "slow_consumer_disconnects": 0,
+            "upstream_connects": 0,
+            "upstream_failures": 0,
+            "resume_gaps": 0,
+        }
+        self._fanout_last_ms = 0.0
+        self._fanout_max_ms = 0.0
+        self._fanout_total_ms = 0.0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def last_seq(self) -> str:
+        return self._token(self._seq)
+
+    def _token(self, seq: int) -> str:
+        return f"{self.epoch}.{seq}"
+
+    def _parse_token(self, token: str) -> int | None:
+        epoch, _, raw_seq = token.partition(".")
+        if epoch != self.epoch:
+            return None
+        try:
+            seq = int(raw_seq)
+        except ValueError:
+            return None
+        return seq if 0 <= seq <= self._seq else None
+
+    def _gap_frame(self, *, reason: str, since: str) -> str:
+        first_seq = self._backlog[0][0] if self._backlog else None
+        self._counters["resume_gaps"] += 1
+        return json.dumps(
+            {
+                "stream": "relay_gap",
+                "reason": reason,
+                "since": since,
+                "resume_from": self._token(first_seq) if first_seq is not None else None,
+                "last_seq": self.last_seq,
+            },
+            separators=(",", ":"),
+        )
+
+    def backlog_after(self, *, since: str | None = None, limit: int | None = None) -> list[str | bytes]:
+        if since is not None:
+            seq = self._parse_token(since)
+            if seq is None:
+                # A token from another process (or garbage): replay everything kept.
+                entries = [message for _seq, message, _size in self._backlog]
+                if limit:
+                    entries = entries[-limit:]
+                return [self._gap_frame(reason="epoch_changed", since=since), *entries]
+            first_seq = self._backlog[0][0] if self._backlog else self._seq + 1
+            entries = [message for entry_seq, message, _size in self._backlog if entry_seq > seq]
+            if limit:
+                entries = entries[-limit:]
+            if seq < first_seq - 1:
+                # Frames between the client's token and the buffer were dropped.
+                return [self._gap_frame(reason="backlog_overrun", since=since), *entries]
+            return entries
+        if not limit:
+            return []
+        return [message for _seq, message, _size in self._backlog][-limit:]
+
+    def subscribe(
+        self,
+        websocket: WebSocket,
+        *,
+        since: str | None = None,
+        backlog: int | None = None,
+    ) -> StreamSubscriber:
+        subscriber = StreamSubscriber(
+            websocket,
+            max_queue=self.client_queue_size,
+            overflow_policy=self.overflow_policy,
+        )
+        # Snapshotting the buffer and registering happen without an await in
+        # between, so the catch-up and the live tail neither overlap nor gap.
+        subscriber.preload(self.backlog_after(since=since, limit=backlog))
+        self._subscribers[subscriber.id] = subscriber
+        self._cancel_linger()
+        if self._upstream_task is None or self._upstream_task.done():
+            self._upstream_task = asyncio.create_task(self._run_upstream(), name=f"ws-hub-{self.name}")
+        return subscriber
+
+    async def unsubscribe(self, subscriber: StreamSubscriber) -> None:
+        if self._subscribers.pop(subscriber.id, None) is not None:
+            self._counters["messages_dropped"] += subscriber.dropped
+            if subscriber.overflowed:
+                self._counters["slow_consumer_disconnects"] += 1
+        if self._subscribers:
+            return
+        if self.linger_seconds <= 0:
+            await self._stop_upstream()
+        elif self._linger_task is None or self._linger_task.done():
+            self._linger_task = asyncio.create_task(self._linger_then_stop(), name=f"ws-hub-{self.name}-linger")
+
+    async def aclose(self) -> None:
+        self._subscribers.clear()
+        self._cancel_linger()
+        await self._stop_upstream()
+
+    def _cancel_linger(self) -> None:
+        task = self._linger_task
+        self._linger_task = None
+        if task is not None and not task.done():
+            task.cancel()
+
+    async def _linger_then_stop(self) -> None:
+        # Keeping the upstream briefly absorbs reconnect storms after a network blip.
+        await asyncio.sleep(self.linger_seconds)
+        if not self._subscribers:
+            self._linger_task = None
+            await self._stop_upstream()
+
+    async def _stop_upstream(self) -> None:
+        task = self._upstream_task
+        self._upstream_task = None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run_upstream(self) -> None:
+        delay = self.reconnect_initial_seconds
+        while self._subscribers:
+            try:
+                async with websockets.connect(
+                    self.upstream_url,
+                    additional_headers=self.upstream_headers,
+                ) as upstream:
+                    self._upstream_connected = True
+                    self._counters["upstream_connects"] += 1
+                    delay = self.reconnect_initial_seconds
+                    async for message in upstream:
+                        self._broadcast(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._counters["upstream_failures"] += 1
+            finally:
+                self._upstream_connected = False
+
+            if not self._subscribers:
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.reconnect_max_seconds)
+
+    def _broadcast(self, message: str | bytes) -> None:
+        self._counters["messages_received"] += 1
+        received_at = time.perf_counter()
+        self._seq += 1
+        message = _tag_with_sequence(message, self._token(self._seq))
+        self._remember(self._seq, message)
+        for subscriber in self._subscribers.values():
+            subscriber.offer(message, received_at)
+
+    def _remember(self, seq: int, message: str | bytes) -> None:
+        if self.backlog_max_messages <= 0:
+            return
+        # Text frames are measured as the UTF-8 bytes they occupy on the wire.
+        size = len(message.encode("utf-8")) if isinstance(message, str) else len(message)
+        if size > self.backlog_max_bytes:
+            return
+        self._backlog.append((seq, message, size))
+        self._backlog_bytes += size
+        while self._backlog and (
+            len(self._backlog) > self.backlog_max_messages or self._backlog_bytes > self.backlog_max_bytes
+        ):
+            _old_seq, _old_message, old_size = self._backlog.popleft()
+            self._backlog_bytes -= old_size
+
+    def record_delivery(self, received_at: float) -> None:
+        elapsed_ms = (time.perf_counter() - received_at) * 1000
+        self._counters["messages_delivered"] += 1
+        self._fanout_last_ms = elapsed_ms
+        self._fanout_max_ms = max(self._fanout_max_ms, elapsed_ms)
+        self._fanout_total_ms += elapsed_ms
+
+    def stats(self) -> dict[str, Any]:
+        delivered = self._counters["messages_delivered"]
+        subscribers = [subscriber.stats() for subscriber in self._subscribers.values()]
+        return {
+            "subscribers": len(subscribers),
+            "upstream_connected": self._upstream_connected,
+            "overflow_policy": self.overflow_policy,
+            "client_queue_size": self.client_queue_size,
+            **self._counters,
+            "messages_dropped": self._counters["messages_dropped"] + sum(item["dropped"] for item in subscribers),
+            "queue_depth_max": max((item["queue_depth"] for item in subscribers), default=0),
+            "last_seq": self.last_seq,
+            "backlog": {
+                "messages": len(self._backlog),
+                "bytes": self._backlog_bytes,
+                "first_seq": self._token(self._backlog[0][0]) if self._backlog else None,
+                "max_messages": self.backlog_max_messages,
+                "max_bytes": self.backlog_max_bytes,
+            },
+            "fanout_latency_ms": {
+                "last": round(self._fanout_last_ms, 3),
+                "max": round(self._fanout_max_ms, 3),
+                "avg": round(self._fanout_total_ms / delivered, 3) if delivered else 0.0,
+            },
+            "clients": subscribers,
+        }
@@ -2,7 +2,7 @@
 
 import { scaleLinear } from "d3-scale"
 import { useCallback, useEffect, useMemo, useRef, useState } from "react"
-import { API_BASE, WS_BASE, cpFetch, withApiTokenQuery, withQueryParams } from "../lib/api"
+import { API_BASE, WS_BASE, cpBatch, cpFetch, withApiTokenQuery, withQueryParams } from "../lib/api"
 import { formatAge, levelToPillClass, type HealthLevel } from "../lib/format"
 
 type StatusPayload = {
@@ -243,6 +243,13 @@ type AnalystQueueItem = {
   timestamp: string
 }
 
+const TEMPLATE_DIAGNOSTICS_PARAMS: Record<string, string> = {
+  include_templates: "true",
+  include_doctor: "true",
+  include_alert_routes: "false",
+  include_handoff: "true",
+}
+
 export default function DashboardPage() {
   const [status, setStatus] = useState<StatusPayload>({})
   const [intel, setIntel] = useState<IntelPayload>({})
@@ -284,9 +291,10 @@ export default function DashboardPage() {
   const [operatorMessage, setOperatorMessage] = useState("")
   const [handoffMessage, setHandoffMessage] = useState("")
   const streamCursorRef = useRef(0)
+  const relaySeqRef = useRef("")
 
-  const loadDashboard = useCallback(async () => {
-    const params = new URLSearchParams({
+  const dashboardParams = useMemo(
+    () => ({
       report_limit: "200",
       report_events_per_session: "200",
       map_limit: "200",
@@ -298,12 +306,11 @@ export default function DashboardPage() {
       route_severity: routeSeverity,
       route_service: routeService,
       route_action: routeAction,
-    })
-    const response = await cpFetch(`${API_BASE}/dashboard/summary?${params.toString()}`, { cache: "no-store" })
-    if (!response.ok) {
-      return
-    }
-    const payload = (await response.json()) as DashboardSummaryPayload
+    }),
+    [routeAction, routeService, routeSeverity],
+  )
+
+  const applyDashboard = useCallback((payload: DashboardSummaryPayload) => {
     setStatus(payload.status ?? {})
     setIntel(payload.intel ?? {})
     setMap(payload.map ?? {})
@@ -323,20 +330,9 @@ export default function DashboardPage() {
     setAlerts(payload.alerts ?? {})
     if (payload.alert_routes !== undefined) setAlertRoutes(payload.alert_routes ?? {})
     setLastSnapshotAtMs(Date.now())
-  }, [routeAction, routeService, routeSeverity])
+  }, [])
 
-  const loadTemplateDiagnostics = useCallback(async () => {
-    const params = new URLSearchParams({
-      include_templates: "true",
-      include_doctor: "true",
-      include_alert_routes: "false",
-      include_handoff: "true",
-    })
-    const response = await cpFetch(`${API_BASE}/dashboard/summary?${params.toString()}`, { cache: "no-store" })
-    if (!response.ok) {
-      return
-    }
-    const payload = (await response.json()) as DashboardSummaryPayload
+  const applyTemplateDiagnostics = useCallback((payload: DashboardSummaryPayload) => {
     if (payload.template_inventory !== undefined) setTemplateInventory(payload.template_inventory ?? {})
     if (payload.template_plan !== undefined) setTemplatePlan(payload.template_plan ?? {})
     if (payload.template_plan_all !== undefined) setTemplatePlanAll(payload.template_plan_all ?? {})
@@ -348,6 +344,44 @@ export default function DashboardPage() {
     if (payload.handoff !== undefined) setHandoff(payload.handoff ?? {})
   }, [])
 
+  const loadDashboard = useCallback(async () => {
+    const params = new URLSearchParams(dashboardParams)
+    const response = await cpFetch(`${API_BASE}/dashboard/summary?${params.toString()}`, { cache: "no-cache" })
+    if (!response.ok) {
+      return
+    }
+    applyDashboard((await response.json()) as DashboardSummaryPayload)
+  }, [applyDashboard, dashboardParams])
+
+  const loadTemplateDiagnostics = useCallback(async () => {
+    const params = new URLSearchParams(TEMPLATE_DIAGNOSTICS_PARAMS)
+    const response = await cpFetch(`${API_BASE}/dashboard/summary?${params.toString()}`, { cache: "no-cache" })
+    if (!response.ok) {
+      return
+    }
+    applyTemplateDiagnostics((await response.json()) as DashboardSummaryPayload)
+  }, [applyTemplateDiagnostics])
+
+  // First paint fetches the dashboard and template diagnostics in one batched round trip.
+  const loadDashboardWithDiagnostics = useCallback(async () => {
+    const results = await cpBatch([
+      { id: "dashboard", path: "dashboard/summary", query: dashboardParams },
+      { id: "diagnostics", path: "dashboard/summary", query: TEMPLATE_DIAGNOSTICS_PARAMS },
+    ])
+    if (results === null) {
+      await Promise.all([loadDashboard(), loadTemplateDiagnostics()])
+      return
+    }
+    const dashboard = results.get("dashboard")
+    if (dashboard?.ok) {
+      applyDashboard(dashboard.body as DashboardSummaryPayload)
+    }
+    const diagnostics = results.get("diagnostics")
+    if (diagnostics?.ok) {
+      applyTemplateDiagnostics(diagnostics.body as DashboardSummaryPayload)
+    }
+  }, [applyDashboard, applyTemplateDiagnostics, dashboardParams, loadDashboard, loadTemplateDiagnostics])
+
   useEffect(() => {
     const timer = setInterval(() => {
       setClockMs(Date.now())
@@ -356,26 +390,21 @@ export default function DashboardPage() {
   }, [])
 
   useEffect(() => {
-    loadDashboard().catch(() => undefined)
+    loadDashboardWithDiagnostics().catch(() => undefined)
     if (!autoRefreshEnabled) {
       return () => undefined
     }
-    const timer = setInterval(() => {
+    const dashboardTimer = setInterval(() => {
       loadDashboard().catch(() => undefined)
     }, refreshIntervalMs)
-    return () => clearInterval(timer)
-  }, [autoRefreshEnabled, loadDashboard, refreshIntervalMs])
-
-  useEffect(() => {
-    loadTemplateDiagnostics().catch(() => undefined)
-    if (!autoRefreshEnabled) {
-      return () => undefined
-    }
-    const timer = setInterval(() => {
+    const diagnosticsTimer = setInterval(() => {
       loadTemplateDiagnostics().catch(() => undefined)
     }, 60000)
-    return () => clearInterval(timer)
-  }, [autoRefreshEnabled, loadTemplateDiagnostics])
+    return () => {
+      clearInterval(dashboardTimer)
+      clearInterval(diagnosticsTimer)
+    }
+  }, [autoRefreshEnabled, loadDashboard, loadDashboardWithDiagnostics, loadTemplateDiagnostics, refreshIntervalMs])
 
   useEffect(() => {
     let closed = false
@@ -422,6 +451,7 @@ export default function DashboardPage() {
           batch_limit: "160",
           interval_ms: "350",
           cursor: String(streamCursorRef.current),
+          ...(relaySeqRef.current ? { since: relaySeqRef.current } : {}),
         })
       )
       ws = new WebSocket(wsUrl)
@@ -446,6 +476,19 @@ export default function DashboardPage() {
       ws.onmessage = (event) => {
         try {
           const parsed = JSON.parse(event.data) as LiveEvent | LiveEventBatch
+          if (
+            typeof parsed === "object" &&
+            parsed !== null &&
+            "relay_seq" in parsed &&
+            typeof parsed.relay_seq === "string"
+          ) {
+            relaySeqRef.current = parsed.relay_seq
+          }
+          if (typeof parsed === "object" && parsed !== null && "stream" in parsed && parsed.stream === "relay_gap") {
+            // The relay could not replay everything since our last frame; the
+            // frames that follow resume from the oldest one it still has.
+            return
+          }
           const batchEvents =
             typeof parsed === "object" &&
             parsed !== null &&
@@ -41,6 +41,40 @@ const cpFetch = (url: string, init?: RequestInit): Promise<Response> => {
   return fetch(url, nextInit)
 }
 
+type BatchSubRequest = {
+  id: string
+  path: string
+  query?: Record<string, string>
+}
+
+type BatchResult = {
+  id: string
+  status: number
+  ok: boolean
+  body?: unknown
+  error?: string
+}
+
+// Fetches several deception GETs in one round trip through the control plane's
+// batch endpoint. Resolves to null when batching is unavailable (for example when
+// API_BASE points straight at ClownPeanuts) so callers can fall back to per-call fetches.
+const cpBatch = async (requests: BatchSubRequest[]): Promise<Map<string, BatchResult> | null> => {
+  try {
+    const response = await cpFetch(`${API_BASE}/_batch`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ requests }),
+    })
+    if (!response.ok) {
+      return null
+    }
+    const payload = (await response.json()) as { results?: BatchResult[] }
+    return new Map((payload.results ?? []).map((result) => [result.id, result]))
+  } catch {
+    return null
+  }
+}
+
 const withApiTokenQuery = (url: string): string => {
   if (!WS_AUTH_TOKEN) {
     return url
@@ -68,4 +102,5 @@ const withQueryParams = (url: string, params: Record<string, string>): string =>
   }
 }
 
-export { API_BASE, WS_BASE, WS_THEATER_BASE, cpFetch, withApiTokenQuery, withQueryParams }
+export { API_BASE, WS_BASE, WS_THEATER_BASE, cpBatch, cpFetch, withApiTokenQuery, withQueryParams }
+export type { BatchResult, BatchSubRequest }
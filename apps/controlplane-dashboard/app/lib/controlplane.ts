@@ -16,4 +16,15 @@ const controlplaneFetch = (path: string, init?: RequestInit): Promise<Response>
   return fetch(`${CONTROLPLANE_API_BASE}${normalizedPath}`, nextInit)
 }
 
-export { CONTROLPLANE_API_BASE, controlplaneFetch }
+// For plain links (downloads) that cannot carry an Authorization header.
+const controlplaneUrl = (path: string, params?: URLSearchParams): string => {
+  const normalizedPath = path.startsWith("/") ? path : `/${path}`
+  const query = new URLSearchParams(params)
+  if (CONTROLPLANE_API_TOKEN && !query.has("token")) {
+    query.set("token", CONTROLPLANE_API_TOKEN)
+  }
+  const queryString = query.toString()
+  return `${CONTROLPLANE_API_BASE}${normalizedPath}${queryString ? `?${queryString}` : ""}`
+}
+
+export { CONTROLPLANE_API_BASE, controlplaneFetch, controlplaneUrl }
@@ -1,7 +1,7 @@
 "use client"
 
 import { useCallback, useEffect, useMemo, useState } from "react"
-import { controlplaneFetch } from "../lib/controlplane"
+import { controlplaneFetch, controlplaneUrl } from "../lib/controlplane"
 import { formatAge } from "../lib/format"
 
 type ActionResult = {
@@ -11,6 +11,25 @@ type ActionResult = {
   exit_code?: number
 }
 
+type ActionName = "bootstrap" | "smoke" | "update"
+
+type JobSummary = {
+  id: string
+  action: ActionName
+  state: "queued" | "running" | "succeeded" | "failed" | "cancelled" | "timed_out"
+  exit_code?: number | null
+}
+
+type JobStartPayload = {
+  ok?: boolean
+  job?: JobSummary
+  attached?: boolean
+}
+
+type ActiveJob = JobSummary & { output: string }
+
+const ACTIVE_JOB_STATES = new Set(["queued", "running"])
+
 type ProjectRow = {
   name?: string
   role?: string
@@ -26,6 +45,14 @@ type ProjectRow = {
   }
 }
 
+type SmokeSummary = {
+  ok?: boolean
+  project_count?: number
+  checked?: number
+  cached?: number
+  failed?: string[]
+}
+
 type OrchestrationPayload = {
   generated_at?: string
   project_count?: number
@@ -37,6 +64,7 @@ type OrchestrationPayload = {
     smoke?: ActionResult | null
     update?: ActionResult | null
   }
+  smoke?: SmokeSummary | null
 }
 
 const asAgeLabel = (value: string | undefined): string => {
@@ -52,12 +80,12 @@ const asAgeLabel = (value: string | undefined): string => {
 
 export default function OrchestrationPage() {
   const [payload, setPayload] = useState<OrchestrationPayload>({})
-  const [busyAction, setBusyAction] = useState<"bootstrap" | "smoke" | "update" | null>(null)
+  const [activeJob, setActiveJob] = useState<ActiveJob | null>(null)
   const [operatorMessage, setOperatorMessage] = useState("")
   const [lastSyncAt, setLastSyncAt] = useState<number | null>(null)
 
   const load = useCallback(async () => {
-    const response = await controlplaneFetch("/orchestration/summary", { cache: "no-store" })
+    const response = await controlplaneFetch("/orchestration/summary", { cache: "no-cache" })
     if (!response.ok) {
       return
     }
@@ -74,30 +102,76 @@ export default function OrchestrationPage() {
     return () => clearInterval(timer)
   }, [load])
 
-  const runAction = useCallback(
-    async (action: "bootstrap" | "smoke" | "update") => {
-      setBusyAction(action)
-      setOperatorMessage("")
-      try {
-        const response = await controlplaneFetch(`/orchestration/actions/${action}`, {
-          method: "POST",
-          cache: "no-store",
-        })
-        if (!response.ok) {
-          setOperatorMessage(`${action} failed (${response.status})`)
-          return
-        }
-        const result = (await response.json()) as ActionResult
-        setOperatorMessage(result.ok ? `${action} completed` : `${action} failed`)
-      } catch {
-        setOperatorMessage(`${action} failed`)
-      } finally {
-        setBusyAction(null)
+  const activeJobId = activeJob?.id ?? null
+  const busyAction = activeJob && ACTIVE_JOB_STATES.has(activeJob.state) ? activeJob.action : null
+
+  useEffect(() => {
+    if (!activeJobId || typeof EventSource === "undefined") {
+      return () => undefined
+    }
+    // The stream replays the retained log, then follows it until the job finishes.
+    const source = new EventSource(controlplaneUrl(`/orchestration/jobs/${activeJobId}/stream`))
+    source.addEventListener("log", (event) => {
+      const chunk = JSON.parse((event as MessageEvent<string>).data) as { text?: string; truncated?: boolean }
+      setActiveJob((current) =>
+        current && current.id === activeJobId
+          ? { ...current, output: `${current.output}${chunk.truncated ? "... (truncated)\n" : ""}${chunk.text ?? ""}` }
+          : current
+      )
+    })
+    source.addEventListener("status", (event) => {
+      const job = JSON.parse((event as MessageEvent<string>).data) as JobSummary
+      setActiveJob((current) => (current && current.id === job.id ? { ...current, ...job } : current))
+      if (!ACTIVE_JOB_STATES.has(job.state)) {
+        source.close()
+        setOperatorMessage(`${job.action} ${job.state.replace("_", " ")}`)
         load().catch(() => undefined)
       }
-    },
-    [load]
-  )
+    })
+    return () => source.close()
+  }, [activeJobId, load])
+
+  const runAction = useCallback(async (action: ActionName) => {
+    setOperatorMessage("")
+    try {
+      const response = await controlplaneFetch(`/orchestration/actions/${action}`, {
+        method: "POST",
+        cache: "no-store",
+      })
+      if (!response.ok) {
+        setOperatorMessage(`${action} failed to start (${response.status})`)
+        return
+      }
+      const result = (await response.json()) as JobStartPayload
+      if (!result.job) {
+        setOperatorMessage(`${action} failed to start`)
+        return
+      }
+      const job = result.job
+      setActiveJob((current) => (current && current.id === job.id ? current : { ...job, output: "" }))
+      setOperatorMessage(result.attached ? `${action} already running; following it` : `${action} started`)
+    } catch {
+      setOperatorMessage(`${action} failed to start`)
+    }
+  }, [])
+
+  const cancelJob = useCallback(async () => {
+    if (!activeJobId) {
+      return
+    }
+    try {
+      await controlplaneFetch(`/orchestration/jobs/${activeJobId}/cancel`, { method: "POST", cache: "no-store" })
+    } catch {
+      setOperatorMessage("cancel failed")
+    }
+  }, [activeJobId])
+
+  const actionOutput = (action: ActionName, fallback: string): string => {
+    if (activeJob?.action === action) {
+      return activeJob.output || (ACTIVE_JOB_STATES.has(activeJob.state) ? `${action} ${activeJob.state}...` : fallback)
+    }
+    return payload.last_actions?.[action]?.output || fallback
+  }
 
   const projects = useMemo(() => payload.projects ?? [], [payload.projects])
 
@@ -123,6 +197,11 @@ export default function OrchestrationPage() {
             <button className="cp-link-pill cp-link-pill-button" onClick={() => runAction("update")} disabled={busyAction !== null}>
               {busyAction === "update" ? "Running update" : "Run update"}
             </button>
+            {busyAction !== null ? (
+              <button className="cp-link-pill cp-link-pill-button" onClick={() => cancelJob()}>
+                Cancel {busyAction}
+              </button>
+            ) : null}
           </div>
           <small>
             {operatorMessage ||
@@ -148,9 +227,13 @@ export default function OrchestrationPage() {
           <span>Age: {asAgeLabel(payload.last_actions?.bootstrap?.finished_at ?? undefined)}</span>
         </article>
         <article>
-          <h2>Last smoke</h2>
-          <p>{payload.last_actions?.smoke?.ok ? "pass" : "n/a"}</p>
-          <span>Age: {asAgeLabel(payload.last_actions?.smoke?.finished_at ?? undefined)}</span>
+          <h2>Smoke</h2>
+          <p>{payload.smoke ? (payload.smoke.ok ? "pass" : "fail") : payload.last_actions?.smoke?.ok ? "pass" : "n/a"}</p>
+          <span>
+            {payload.smoke?.failed?.length
+              ? `Failing: ${payload.smoke.failed.join(", ")}`
+              : `Last run: ${asAgeLabel(payload.last_actions?.smoke?.finished_at ?? undefined)}`}
+          </span>
         </article>
         <article>
           <h2>Last update</h2>
@@ -180,17 +263,17 @@ export default function OrchestrationPage() {
 
         <article className="cp-card">
           <h3>Bootstrap output</h3>
-          <pre className="cp-handoff-markdown">{payload.last_actions?.bootstrap?.output || "No bootstrap run yet."}</pre>
+          <pre className="cp-handoff-markdown">{actionOutput("bootstrap", "No bootstrap run yet.")}</pre>
         </article>
 
         <article className="cp-card">
           <h3>Smoke output</h3>
-          <pre className="cp-handoff-markdown">{payload.last_actions?.smoke?.output || "No smoke run yet."}</pre>
+          <pre className="cp-handoff-markdown">{actionOutput("smoke", "No smoke run yet.")}</pre>
         </article>
 
         <article className="cp-card">
           <h3>Update output</h3>
-          <pre className="cp-handoff-markdown">{payload.last_actions?.update?.output || "No update run yet."}</pre>
+          <pre className="cp-handoff-markdown">{actionOutput("update", "No update run yet.")}</pre>
         </article>
       </section>
     </main>
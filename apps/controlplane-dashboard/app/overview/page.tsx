@@ -68,9 +68,17 @@ type SentryFinding = {
   device_mac?: string
 }
 
+type OverviewSourceMeta = {
+  freshness?: "fresh" | "cached" | "timed_out" | "error"
+  elapsed_ms?: number
+  age_seconds?: number
+  error?: string
+}
+
 type OverviewPayload = {
   generated_at?: string
   overall_ok?: boolean
+  partial?: boolean
   deception?: DeceptionStatus
   sentry?: SentrySummary
   sentry_findings?: {
@@ -79,6 +87,7 @@ type OverviewPayload = {
     findings?: SentryFinding[]
   }
   orchestration?: OrchestrationSummary
+  sources?: Record<string, OverviewSourceMeta>
 }
 
 const asAgeLabel = (value: string | undefined): string => {
@@ -99,7 +108,7 @@ export default function OverviewPage() {
 
   const load = useCallback(async () => {
     try {
-      const response = await controlplaneFetch("/overview/summary", { cache: "no-store" })
+      const response = await controlplaneFetch("/overview/summary", { cache: "no-cache" })
       if (!response.ok) {
         setError(`overview unavailable (${response.status})`)
         return
@@ -148,6 +157,15 @@ export default function OverviewPage() {
             </span>
           </div>
           <small>Last sync: {formatAge(lastSyncAt === null ? null : Math.max(0, Date.now() - lastSyncAt))}</small>
+          {payload.partial ? (
+            <small>
+              Partial:{" "}
+              {Object.entries(payload.sources ?? {})
+                .filter(([, meta]) => meta.freshness !== "fresh")
+                .map(([name, meta]) => `${name} ${meta.freshness?.replace("_", " ") ?? "unknown"}`)
+                .join(", ")}
+            </small>
+          ) : null}
         </div>
       </header>
 
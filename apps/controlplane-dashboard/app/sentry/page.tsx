@@ -1,12 +1,13 @@
 "use client"
 
-import { useCallback, useEffect, useState } from "react"
-import { controlplaneFetch } from "../lib/controlplane"
+import { useCallback, useEffect, useRef, useState } from "react"
+import { controlplaneFetch, controlplaneUrl } from "../lib/controlplane"
 import { formatAge } from "../lib/format"
 
 type SentrySummaryPayload = {
   ok?: boolean
   stale?: boolean
+  refreshing?: boolean
   source?: string
   status_age_seconds?: number | null
   errors?: string[]
@@ -26,6 +27,7 @@ type SentrySummaryPayload = {
 type SentryFindingsPayload = {
   ok?: boolean
   count?: number
+  next_cursor?: string | null
   findings?: Array<{
     id?: number
     created_at?: string
@@ -42,6 +44,7 @@ type SentryFindingsPayload = {
 type SentryRunsPayload = {
   ok?: boolean
   count?: number
+  next_cursor?: string | null
   runs?: Array<{
     id?: number
     agent?: string
@@ -53,10 +56,23 @@ type SentryRunsPayload = {
   }>
 }
 
+type SentryRollupsPayload = {
+  ok?: boolean
+  bucket_seconds?: number
+  columns?: string[]
+  rows?: Array<Array<string | number>>
+}
+
+const withExportFormat = (params: URLSearchParams, format: string): URLSearchParams => {
+  params.set("format", format)
+  return params
+}
+
 export default function SentryPage() {
   const [payload, setPayload] = useState<SentrySummaryPayload>({})
   const [findings, setFindings] = useState<SentryFindingsPayload>({})
   const [runs, setRuns] = useState<SentryRunsPayload>({})
+  const [dailyRollups, setDailyRollups] = useState<SentryRollupsPayload>({})
   const [findingSeverity, setFindingSeverity] = useState("all")
   const [includeAcknowledged, setIncludeAcknowledged] = useState(false)
   const [includeLearning, setIncludeLearning] = useState(true)
@@ -65,10 +81,11 @@ export default function SentryPage() {
   const [lastSyncAt, setLastSyncAt] = useState<number | null>(null)
   const [refreshBusy, setRefreshBusy] = useState(false)
   const [operatorMessage, setOperatorMessage] = useState("")
+  const findingsStreamLiveRef = useRef(false)
 
   const load = useCallback(async (forceRefresh = false) => {
     const response = await controlplaneFetch(forceRefresh ? "/sentry/summary?refresh=true" : "/sentry/summary", {
-      cache: "no-store",
+      cache: "no-cache",
     })
     if (!response.ok) {
       return
@@ -77,48 +94,137 @@ export default function SentryPage() {
     setLastSyncAt(Date.now())
   }, [])
 
-  const loadFindings = useCallback(async () => {
+  const findingsFilterParams = useCallback(() => {
     const params = new URLSearchParams({
-      limit: "25",
       include_acknowledged: includeAcknowledged ? "true" : "false",
       include_learning: includeLearning ? "true" : "false",
     })
     if (findingSeverity !== "all") {
       params.set("severity", findingSeverity)
     }
-    const response = await controlplaneFetch(`/sentry/findings?${params.toString()}`, { cache: "no-store" })
-    if (!response.ok) {
-      return
-    }
-    setFindings((await response.json()) as SentryFindingsPayload)
+    return params
   }, [findingSeverity, includeAcknowledged, includeLearning])
 
-  const loadRuns = useCallback(async () => {
-    const params = new URLSearchParams({ limit: "25" })
+  const runsFilterParams = useCallback(() => {
+    const params = new URLSearchParams()
     if (runsAgent !== "all") {
       params.set("agent", runsAgent)
     }
     if (runsStatus !== "all") {
       params.set("status", runsStatus)
     }
-    const response = await controlplaneFetch(`/sentry/runs?${params.toString()}`, { cache: "no-store" })
+    return params
+  }, [runsAgent, runsStatus])
+
+  const loadFindings = useCallback(async () => {
+    const params = findingsFilterParams()
+    params.set("limit", "25")
+    const response = await controlplaneFetch(`/sentry/findings?${params.toString()}`, { cache: "no-cache" })
+    if (!response.ok) {
+      return
+    }
+    setFindings((await response.json()) as SentryFindingsPayload)
+  }, [findingsFilterParams])
+
+  const loadOlderFindings = useCallback(async () => {
+    if (!findings.next_cursor) {
+      return
+    }
+    const params = findingsFilterParams()
+    params.set("limit", "25")
+    params.set("cursor", findings.next_cursor)
+    const response = await controlplaneFetch(`/sentry/findings?${params.toString()}`, { cache: "no-cache" })
+    if (!response.ok) {
+      return
+    }
+    const older = (await response.json()) as SentryFindingsPayload
+    setFindings((current) => ({
+      ...older,
+      count: (current.findings ?? []).length + (older.findings ?? []).length,
+      findings: [...(current.findings ?? []), ...(older.findings ?? [])],
+    }))
+  }, [findings.next_cursor, findingsFilterParams])
+
+  const loadRuns = useCallback(async () => {
+    const params = runsFilterParams()
+    params.set("limit", "25")
+    const response = await controlplaneFetch(`/sentry/runs?${params.toString()}`, { cache: "no-cache" })
     if (!response.ok) {
       return
     }
     setRuns((await response.json()) as SentryRunsPayload)
-  }, [runsAgent, runsStatus])
+  }, [runsFilterParams])
+
+  const loadOlderRuns = useCallback(async () => {
+    if (!runs.next_cursor) {
+      return
+    }
+    const params = runsFilterParams()
+    params.set("limit", "25")
+    params.set("cursor", runs.next_cursor)
+    const response = await controlplaneFetch(`/sentry/runs?${params.toString()}`, { cache: "no-cache" })
+    if (!response.ok) {
+      return
+    }
+    const older = (await response.json()) as SentryRunsPayload
+    setRuns((current) => ({
+      ...older,
+      count: (current.runs ?? []).length + (older.runs ?? []).length,
+      runs: [...(current.runs ?? []), ...(older.runs ?? [])],
+    }))
+  }, [runs.next_cursor, runsFilterParams])
+
+  const loadRollups = useCallback(async () => {
+    const response = await controlplaneFetch("/sentry/rollups?bucket=day&days=14&group_by=", { cache: "no-cache" })
+    if (!response.ok) {
+      return
+    }
+    setDailyRollups((await response.json()) as SentryRollupsPayload)
+  }, [])
 
   useEffect(() => {
     load(false).catch(() => undefined)
-    loadFindings().catch(() => undefined)
     loadRuns().catch(() => undefined)
+    loadRollups().catch(() => undefined)
     const timer = setInterval(() => {
       load(false).catch(() => undefined)
-      loadFindings().catch(() => undefined)
+      if (!findingsStreamLiveRef.current) {
+        loadFindings().catch(() => undefined)
+      }
       loadRuns().catch(() => undefined)
+      loadRollups().catch(() => undefined)
     }, 20000)
     return () => clearInterval(timer)
-  }, [load, loadFindings, loadRuns])
+  }, [load, loadFindings, loadRollups, loadRuns])
+
+  // New findings are pushed over SSE as soon as PingTing commits them; the
+  // timer above only reloads findings while the stream is down.
+  useEffect(() => {
+    if (typeof EventSource === "undefined") {
+      loadFindings().catch(() => undefined)
+      return () => undefined
+    }
+    const source = new EventSource(controlplaneUrl("/sentry/findings/stream", findingsFilterParams()))
+    source.addEventListener("ready", () => {
+      findingsStreamLiveRef.current = true
+      loadFindings().catch(() => undefined)
+    })
+    source.addEventListener("findings", (event) => {
+      const batch = JSON.parse((event as MessageEvent<string>).data) as SentryFindingsPayload
+      const incoming = [...(batch.findings ?? [])].reverse()
+      setFindings((current) => {
+        const merged = [...incoming, ...(current.findings ?? [])].slice(0, 200)
+        return { ...current, count: merged.length, findings: merged }
+      })
+    })
+    source.onerror = () => {
+      findingsStreamLiveRef.current = false
+    }
+    return () => {
+      findingsStreamLiveRef.current = false
+      source.close()
+    }
+  }, [findingsFilterParams, loadFindings])
 
   const forceRefresh = useCallback(async () => {
     setRefreshBusy(true)
@@ -230,7 +336,9 @@ export default function SentryPage() {
         <article>
           <h2>Learning</h2>
           <p>{payload.highlights?.learning_status ?? "unknown"}</p>
-          <span>Status age: {payload.status_age_seconds ?? "n/a"}s</span>
+          <span>
+            Status age: {payload.status_age_seconds ?? "n/a"}s{payload.refreshing ? " (refreshing)" : ""}
+          </span>
         </article>
         <article>
           <h2>Channels</h2>
@@ -264,6 +372,20 @@ export default function SentryPage() {
               )
             })}
           </ul>
+          <div className="cp-controls-actions">
+            {findings.next_cursor ? (
+              <button onClick={() => loadOlderFindings().catch(() => undefined)}>Load older findings</button>
+            ) : null}
+            <a className="cp-link-pill" href={controlplaneUrl("/sentry/findings/export", findingsFilterParams())}>
+              Export NDJSON
+            </a>
+            <a
+              className="cp-link-pill"
+              href={controlplaneUrl("/sentry/findings/export", withExportFormat(findingsFilterParams(), "csv"))}
+            >
+              Export CSV
+            </a>
+          </div>
         </article>
 
         <article className="cp-card">
@@ -292,6 +414,33 @@ export default function SentryPage() {
               )
             })}
           </ul>
+          <div className="cp-controls-actions">
+            {runs.next_cursor ? (
+              <button onClick={() => loadOlderRuns().catch(() => undefined)}>Load older runs</button>
+            ) : null}
+            <a className="cp-link-pill" href={controlplaneUrl("/sentry/runs/export", runsFilterParams())}>
+              Export NDJSON
+            </a>
+            <a
+              className="cp-link-pill"
+              href={controlplaneUrl("/sentry/runs/export", withExportFormat(runsFilterParams(), "csv"))}
+            >
+              Export CSV
+            </a>
+          </div>
+        </article>
+
+        <article className="cp-card">
+          <h3>Findings per day (14d)</h3>
+          <ul className="cp-list cp-list-small">
+            {(dailyRollups.rows ?? []).length === 0 ? <li><strong>No findings in window</strong></li> : null}
+            {[...(dailyRollups.rows ?? [])].reverse().map(([bucketStart, count]) => (
+              <li key={String(bucketStart)}>
+                <span>{new Date(Number(bucketStart) * 1000).toISOString().slice(0, 10)}</span>
+                <strong>{Number(count)}</strong>
+              </li>
+            ))}
+          </ul>
         </article>
 
         <article className="cp-card">
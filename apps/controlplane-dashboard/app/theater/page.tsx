@@ -1,6 +1,6 @@
 "use client"
 
-import { useCallback, useEffect, useMemo, useState } from "react"
+import { useCallback, useEffect, useMemo, useRef, useState } from "react"
 import { API_BASE, WS_THEATER_BASE, cpFetch, withApiTokenQuery } from "../lib/api"
 import { formatAge, levelToPillClass, type HealthLevel } from "../lib/format"
 
@@ -78,6 +78,27 @@ type TheaterLivePayload = {
   within_latency_budget?: boolean
 }
 
+type TheaterSessionDelta = {
+  session_id?: string
+  fields?: Record<string, unknown>
+  sequences?: Record<string, { trim?: number; append?: unknown[] }>
+  removed_fields?: string[]
+}
+
+type TheaterLiveDeltaPayload = {
+  mode?: "full" | "delta" | "unchanged"
+  version?: string
+  snapshot?: TheaterLivePayload
+  fields?: Record<string, unknown>
+  removed_fields?: string[]
+  sessions?: {
+    added?: TheaterSession[]
+    changed?: TheaterSessionDelta[]
+    removed?: string[]
+    order?: string[]
+  }
+}
+
 type TheaterActionsPayload = {
   actions?: Array<{
     row_id?: number
@@ -124,6 +145,42 @@ const THEATER_FALLBACK_POLL_INTERVAL_MS = 15000
 const THEATER_ACTIONS_REFRESH_INTERVAL_MS = 15000
 const THEATER_STREAM_INTERVAL_MS = 1500
 
+const applySessionDelta = (session: TheaterSession, delta: TheaterSessionDelta): TheaterSession => {
+  const next: Record<string, unknown> = { ...session, ...(delta.fields ?? {}) }
+  for (const key of delta.removed_fields ?? []) {
+    delete next[key]
+  }
+  for (const [key, sequence] of Object.entries(delta.sequences ?? {})) {
+    const previous = Array.isArray(next[key]) ? (next[key] as unknown[]) : []
+    next[key] = [...previous.slice(sequence.trim ?? 0), ...(sequence.append ?? [])]
+  }
+  return next as TheaterSession
+}
+
+const applyTheaterDelta = (current: TheaterLivePayload, delta: TheaterLiveDeltaPayload): TheaterLivePayload => {
+  const next: Record<string, unknown> = { ...current, ...(delta.fields ?? {}) }
+  for (const key of delta.removed_fields ?? []) {
+    delete next[key]
+  }
+  const byId = new Map((current.sessions ?? []).map((session) => [String(session.session_id ?? ""), session]))
+  for (const sessionId of delta.sessions?.removed ?? []) {
+    byId.delete(sessionId)
+  }
+  for (const change of delta.sessions?.changed ?? []) {
+    const sessionId = String(change.session_id ?? "")
+    const existing = byId.get(sessionId)
+    if (existing) {
+      byId.set(sessionId, applySessionDelta(existing, change))
+    }
+  }
+  for (const session of delta.sessions?.added ?? []) {
+    byId.set(String(session.session_id ?? ""), session)
+  }
+  const order = delta.sessions?.order ?? Array.from(byId.keys())
+  next.sessions = order.map((sessionId) => byId.get(sessionId)).filter((session): session is TheaterSession => !!session)
+  return next as TheaterLivePayload
+}
+
 const STAGE_ORDER = [
   "reconnaissance",
   "initial_access",
@@ -158,18 +215,39 @@ export default function TheaterPage() {
   const [labelConfidence, setLabelConfidence] = useState(0.75)
   const [operatorMessage, setOperatorMessage] = useState("")
 
+  const liveVersionRef = useRef("")
+
   const loadLive = useCallback(async () => {
-    const response = await cpFetch(`${API_BASE}/theater/live?limit=120&events_per_session=250`, { cache: "no-store" })
+    const deltaParams = new URLSearchParams({ limit: "120", events_per_session: "250" })
+    if (liveVersionRef.current) {
+      deltaParams.set("since", liveVersionRef.current)
+    }
+    const deltaResponse = await cpFetch(`${API_BASE}/_delta/theater/live?${deltaParams.toString()}`, {
+      cache: "no-store",
+    })
+    if (deltaResponse.ok) {
+      const delta = (await deltaResponse.json()) as TheaterLiveDeltaPayload
+      if (delta.mode === "full" && delta.snapshot) {
+        setLive(delta.snapshot)
+      } else if (delta.mode === "delta") {
+        setLive((current) => applyTheaterDelta(current, delta))
+      }
+      liveVersionRef.current = delta.version ?? ""
+      setLastLiveUpdateAtMs(Date.now())
+      return
+    }
+    const response = await cpFetch(`${API_BASE}/theater/live?limit=120&events_per_session=250`, { cache: "no-cache" })
     if (!response.ok) {
       return
     }
     const payload = (await response.json()) as TheaterLivePayload
+    liveVersionRef.current = ""
     setLive(payload)
     setLastLiveUpdateAtMs(Date.now())
   }, [])
 
   const loadActions = useCallback(async () => {
-    const response = await cpFetch(`${API_BASE}/theater/actions?limit=30`, { cache: "no-store" })
+    const response = await cpFetch(`${API_BASE}/theater/actions?limit=30`, { cache: "no-cache" })
     if (!response.ok) {
       return
     }
@@ -263,7 +341,7 @@ export default function TheaterPage() {
       }
       ws = new WebSocket(
         withApiTokenQuery(
-          `${WS_THEATER_BASE}?limit=120&events_per_session=250&interval_ms=${THEATER_STREAM_INTERVAL_MS}`
+          `${WS_THEATER_BASE}?limit=120&events_per_session=250&interval_ms=${THEATER_STREAM_INTERVAL_MS}&backlog=1`
         )
       )
       ws.onopen = () => {
@@ -288,6 +366,7 @@ export default function TheaterPage() {
         try {
           const parsed = JSON.parse(event.data) as { payload?: TheaterLivePayload }
           if (parsed.payload) {
+            liveVersionRef.current = ""
             setLive(parsed.payload)
             setLastLiveUpdateAtMs(Date.now())
           }
@@ -455,7 +534,7 @@ export default function TheaterPage() {
     const loadReplay = async () => {
       try {
         const response = await cpFetch(`${API_BASE}/sessions/${encodeURIComponent(sessionId)}/replay?events_limit=120`, {
-          cache: "no-store",
+          cache: "no-cache",
         })
         if (!response.ok) {
           if (!closed) {
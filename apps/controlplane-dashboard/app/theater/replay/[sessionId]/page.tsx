@@ -130,7 +130,7 @@ export default function TheaterReplayPage() {
     setErrorMessage("")
     try {
       const bundleUrl = `${API_BASE}/theater/sessions/${encodeURIComponent(sessionId)}/bundle?events_limit=${eventsLimit}`
-      const response = await cpFetch(bundleUrl, { cache: "no-store" })
+      const response = await cpFetch(bundleUrl, { cache: "no-cache" })
       if (!response.ok) {
         setReplay(null)
         setTheaterSession(null)